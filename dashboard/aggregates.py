@@ -0,0 +1,157 @@
+"""
+Materialized player aggregates for the IPL analytics database.
+
+Ball-by-ball ``deliveries`` are rolled up once into one row per
+match / innings / player so that leaderboard pages (Home, Player Records,
+Hall of Fame) read a few thousand pre-grouped rows instead of re-grouping
+200k+ deliveries on every rerun.
+"""
+
+import sqlite3
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Dismissals that are not credited to the bowler
+NON_BOWLER_DISMISSALS = ('run out', 'retired hurt', 'obstructing the field')
+
+_NON_BOWLER_SQL = ", ".join(f"'{kind}'" for kind in NON_BOWLER_DISMISSALS)
+
+# ==================== TABLE DEFINITIONS ====================
+
+PLAYER_INNINGS_DDL = """
+CREATE TABLE IF NOT EXISTS batter_innings (
+    match_id     INTEGER NOT NULL,
+    innings      INTEGER NOT NULL,
+    batter       TEXT    NOT NULL,
+    season       INTEGER,
+    runs         INTEGER NOT NULL DEFAULT 0,
+    balls        INTEGER NOT NULL DEFAULT 0,
+    fours        INTEGER NOT NULL DEFAULT 0,
+    sixes        INTEGER NOT NULL DEFAULT 0,
+    dismissals   INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (match_id, innings, batter)
+);
+
+CREATE TABLE IF NOT EXISTS bowler_innings (
+    match_id       INTEGER NOT NULL,
+    innings        INTEGER NOT NULL,
+    bowler         TEXT    NOT NULL,
+    season         INTEGER,
+    balls          INTEGER NOT NULL DEFAULT 0,
+    legal_balls    INTEGER NOT NULL DEFAULT 0,
+    runs_conceded  INTEGER NOT NULL DEFAULT 0,
+    wickets        INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (match_id, innings, bowler)
+);
+
+CREATE INDEX IF NOT EXISTS idx_batter_innings_batter ON batter_innings (batter);
+CREATE INDEX IF NOT EXISTS idx_batter_innings_season_batter ON batter_innings (season, batter);
+CREATE INDEX IF NOT EXISTS idx_batter_innings_runs ON batter_innings (runs DESC);
+CREATE INDEX IF NOT EXISTS idx_bowler_innings_bowler ON bowler_innings (bowler);
+CREATE INDEX IF NOT EXISTS idx_bowler_innings_season_bowler ON bowler_innings (season, bowler);
+CREATE INDEX IF NOT EXISTS idx_bowler_innings_figures ON bowler_innings (wickets DESC, runs_conceded ASC);
+"""
+
+# Restricts an insert to the matches listed in temp.refresh_matches (incremental refresh)
+_REFRESH_FILTER = "AND d.match_id IN (SELECT match_id FROM temp.refresh_matches)"
+
+BATTER_INNINGS_INSERT = """
+INSERT INTO batter_innings (match_id, innings, batter, season, runs, balls, fours, sixes, dismissals)
+SELECT d.match_id,
+       d.innings,
+       d.batter,
+       m.season,
+       SUM(d.batter_runs),
+       SUM(CASE WHEN d.is_wide_ball = 0 THEN 1 ELSE 0 END),
+       SUM(CASE WHEN d.batter_runs = 4 THEN 1 ELSE 0 END),
+       SUM(CASE WHEN d.batter_runs = 6 THEN 1 ELSE 0 END),
+       COALESCE(outs.dismissals, 0)
+FROM deliveries d
+JOIN matches m ON d.match_id = m.match_id
+LEFT JOIN (
+    SELECT match_id, innings, player_out, COUNT(*) as dismissals
+    FROM deliveries
+    WHERE is_wicket = 1 AND player_out IS NOT NULL AND wicket_kind != 'retired hurt'
+    {outs_filter}
+    GROUP BY match_id, innings, player_out
+) outs ON outs.match_id = d.match_id
+      AND outs.innings = d.innings
+      AND outs.player_out = d.batter
+WHERE d.batter IS NOT NULL {match_filter}
+GROUP BY d.match_id, d.innings, d.batter
+"""
+
+BOWLER_INNINGS_INSERT = f"""
+INSERT INTO bowler_innings (match_id, innings, bowler, season, balls, legal_balls, runs_conceded, wickets)
+SELECT d.match_id,
+       d.innings,
+       d.bowler,
+       m.season,
+       COUNT(*),
+       SUM(CASE WHEN d.is_wide_ball = 0 AND d.is_no_ball = 0 THEN 1 ELSE 0 END),
+       SUM(d.batter_runs + d.wide_ball_runs + d.no_ball_runs),
+       SUM(CASE WHEN d.is_wicket = 1 AND d.wicket_kind NOT IN ({_NON_BOWLER_SQL}) THEN 1 ELSE 0 END)
+FROM deliveries d
+JOIN matches m ON d.match_id = m.match_id
+WHERE d.bowler IS NOT NULL {{match_filter}}
+GROUP BY d.match_id, d.innings, d.bowler
+"""
+
+# ==================== BUILD FUNCTIONS ====================
+
+def _split_statements(script: str) -> list:
+    """Split a DDL script into individual statements (executescript would auto-commit)"""
+    return [stmt.strip() for stmt in script.split(';') if stmt.strip()]
+
+
+def has_player_innings(conn: sqlite3.Connection) -> bool:
+    """Check whether the batter/bowler innings tables have been materialized"""
+    rows = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('batter_innings', 'bowler_innings')"
+    ).fetchall()
+    return len(rows) == 2
+
+
+def build_player_innings(conn: sqlite3.Connection) -> dict:
+    """Rebuild batter_innings and bowler_innings from deliveries in one transaction"""
+    conn.execute("BEGIN")
+    try:
+        conn.execute("DROP TABLE IF EXISTS batter_innings")
+        conn.execute("DROP TABLE IF EXISTS bowler_innings")
+        for statement in _split_statements(PLAYER_INNINGS_DDL):
+            conn.execute(statement)
+        conn.execute(BATTER_INNINGS_INSERT.format(match_filter="", outs_filter=""))
+        conn.execute(BOWLER_INNINGS_INSERT.format(match_filter=""))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    counts = {
+        'batter_innings': conn.execute("SELECT COUNT(*) FROM batter_innings").fetchone()[0],
+        'bowler_innings': conn.execute("SELECT COUNT(*) FROM bowler_innings").fetchone()[0],
+    }
+    logger.info(f"Materialized player innings: {counts}")
+    return counts
+
+
+def refresh_player_innings(conn: sqlite3.Connection, match_ids) -> int:
+    """Recompute aggregate rows for the given matches inside the caller's transaction"""
+    match_ids = sorted(set(match_ids))
+    if not match_ids:
+        return 0
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS refresh_matches (match_id INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM temp.refresh_matches")
+    conn.executemany("INSERT INTO temp.refresh_matches (match_id) VALUES (?)", ((m,) for m in match_ids))
+
+    for table in ('batter_innings', 'bowler_innings'):
+        conn.execute(f"DELETE FROM {table} WHERE match_id IN (SELECT match_id FROM temp.refresh_matches)")
+    conn.execute(BATTER_INNINGS_INSERT.format(
+        match_filter=_REFRESH_FILTER,
+        outs_filter="AND match_id IN (SELECT match_id FROM temp.refresh_matches)",
+    ))
+    conn.execute(BOWLER_INNINGS_INSERT.format(match_filter=_REFRESH_FILTER))
+    conn.execute("DELETE FROM temp.refresh_matches")
+    logger.info(f"Refreshed player innings for {len(match_ids)} matches")
+    return len(match_ids)
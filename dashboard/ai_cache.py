@@ -0,0 +1,211 @@
+"""
+Persistent cache of AI Dashboard answers keyed on the normalized question.
+
+Each entry holds the generated SQL, the result frame (Parquet bytes, or a
+pickle when pyarrow is not installed) and the insight text. Entries live in
+a small SQLite file shared by every session and process, expire after a TTL
+or once the data version they were answered from changes (see
+``db_schema.get_data_version``), and are evicted least-recently-used once the
+entry or byte budget is exceeded, so repeat questions skip both Gemini
+round-trips. Hit/miss counters are kept per process.
+"""
+
+import io
+import re
+import sqlite3
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+import pandas as pd
+
+from parquet_store import PYARROW_AVAILABLE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path("data/ai_cache.db")
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 500
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ai_results (
+    cache_key TEXT PRIMARY KEY,
+    question TEXT NOT NULL,
+    sql TEXT NOT NULL,
+    result BLOB NOT NULL,
+    result_format TEXT NOT NULL,
+    insight TEXT,
+    truncated INTEGER NOT NULL DEFAULT 0,
+    data_version TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_ai_results_last_used ON ai_results(last_used);
+"""
+
+# Columns added after the first release, created on open in older cache files
+ADDED_COLUMNS = (
+    ('data_version', "TEXT NOT NULL DEFAULT ''"),
+    ('truncated', "INTEGER NOT NULL DEFAULT 0"),
+)
+
+_WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+class CachedAnswer(NamedTuple):
+    question: str
+    sql: str
+    data: pd.DataFrame
+    insight: Optional[str]
+    created_at: float
+    truncated: bool = False
+
+
+def normalize_question(question: str) -> str:
+    """Cache key: lower-cased words, punctuation and extra whitespace dropped"""
+    return ' '.join(_WORD_PATTERN.findall(question.lower()))
+
+
+def _encode_frame(df: pd.DataFrame) -> tuple:
+    buffer = io.BytesIO()
+    if PYARROW_AVAILABLE:
+        df.to_parquet(buffer, index=False)
+        return buffer.getvalue(), 'parquet'
+    df.to_pickle(buffer)
+    return buffer.getvalue(), 'pickle'
+
+
+def _decode_frame(payload: bytes, result_format: str) -> pd.DataFrame:
+    if result_format == 'parquet':
+        return pd.read_parquet(io.BytesIO(payload))
+    return pd.read_pickle(io.BytesIO(payload))
+
+
+class ResultCache:
+    """SQLite-backed LRU + TTL cache of AI answers (``version`` returns the current data version)"""
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES,
+                 version: Callable[[], str] = lambda: ''):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version = version
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(CACHE_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(ai_results)")}
+        with self._conn:
+            for column, definition in ADDED_COLUMNS:
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE ai_results ADD COLUMN {column} {definition}")
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evictions = 0
+        self._stores = 0
+
+    def get(self, question: str) -> Optional[CachedAnswer]:
+        """Cached answer for ``question``, or None on a miss or an expired / older-data entry"""
+        key = normalize_question(question)
+        version = self.version()
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT question, sql, result, result_format, insight, created_at, data_version, truncated "
+                "FROM ai_results WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            if now - row[5] > self.ttl_seconds or row[6] != version:
+                with self._conn:
+                    self._conn.execute("DELETE FROM ai_results WHERE cache_key = ?", (key,))
+                self._misses += 1
+                self._expired += 1
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE ai_results SET last_used = ?, hits = hits + 1 WHERE cache_key = ?",
+                                   (now, key))
+            self._hits += 1
+        try:
+            data = _decode_frame(row[2], row[3])
+        except Exception as e:
+            logger.error(f"Unreadable cached result for '{key}': {e}")
+            return None
+        return CachedAnswer(row[0], row[1], data, row[4], row[5], bool(row[7]))
+
+    def put(self, question: str, sql: str, data: pd.DataFrame, insight: Optional[str] = None,
+            truncated: bool = False) -> None:
+        """Store (or replace) the answer to ``question`` and evict over budget; ``truncated`` marks a cut-off result"""
+        key = normalize_question(question)
+        payload, result_format = _encode_frame(data)
+        version = self.version()
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ai_results (cache_key, question, sql, result, result_format, insight, "
+                "truncated, data_version, created_at, last_used, hits) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, question, sql, payload, result_format, insight, int(truncated), version, now, now)
+            )
+            self._stores += 1
+            self._evict(version)
+
+    def set_insight(self, question: str, insight: str) -> None:
+        """Attach the generated insight to an existing entry"""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE ai_results SET insight = ? WHERE cache_key = ?",
+                               (insight, normalize_question(question)))
+
+    def _evict(self, version: str) -> None:
+        """Drop expired and older-data entries, then least recently used ones beyond the entry/byte budget"""
+        cursor = self._conn.execute("DELETE FROM ai_results WHERE created_at < ? OR data_version != ?",
+                                    (time.time() - self.ttl_seconds, version))
+        evicted = cursor.rowcount
+        cursor = self._conn.execute("""
+            DELETE FROM ai_results WHERE cache_key IN (
+                SELECT cache_key FROM (
+                    SELECT cache_key,
+                           ROW_NUMBER() OVER (ORDER BY last_used DESC) as position,
+                           SUM(LENGTH(result)) OVER (ORDER BY last_used DESC) as running_bytes
+                    FROM ai_results
+                )
+                WHERE position > ? OR running_bytes > ?
+            )
+        """, (self.max_entries, self.max_bytes))
+        evicted += cursor.rowcount
+        self._evictions += evicted
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM ai_results")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus the current cache size"""
+        with self._lock:
+            entries, size_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(result)), 0) FROM ai_results"
+            ).fetchone()
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0,
+                'expired': self._expired,
+                'evictions': self._evictions,
+                'stores': self._stores,
+                'entries': entries,
+                'size_bytes': size_bytes,
+            }
+
+    def close(self) -> None:
+        self._conn.close()
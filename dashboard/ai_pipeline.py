@@ -0,0 +1,191 @@
+"""
+Concurrent model pipeline for the AI Dashboard.
+
+Once a question's data is fetched, the insight text, the Plotly chart and the
+infographic image don't depend on each other. ``stream_tasks`` starts them
+together on an asyncio event loop and hands each ``PipelineEvent`` to a
+callback as soon as it lands, so the page renders partial results while the
+slower model calls are still in flight. Blocking model calls run in worker
+threads (``in_thread=True``); quick UI-bound work such as building a chart
+runs on the loop thread, i.e. the Streamlit script thread. Every task has its
+own timeout and the run has an overall deadline; unfinished tasks are
+cancelled when the deadline passes or the callback returns False. A thread
+that is already inside a model call can't be interrupted - its result is
+discarded - so the same timeout is also passed to the API request.
+
+Model access goes through a ``ModelClient``. ``GeminiClient`` wraps
+google-generativeai; ``StubModelClient`` answers locally after a configurable
+delay so the pipeline and page can be exercised without the real API
+(``AI_MODEL_BACKEND=stub``).
+"""
+
+import asyncio
+import io
+import logging
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional
+
+try:
+    import google.generativeai as genai
+    GEMINI_AVAILABLE = True
+except ImportError:
+    GEMINI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+TEXT_MODEL = 'gemini-3-pro-preview'
+IMAGE_MODEL = 'gemini-3-pro-image-preview'
+TEXT_TIMEOUT = 30.0    # seconds
+IMAGE_TIMEOUT = 60.0
+PIPELINE_DEADLINE = 90.0
+
+# Own executor: asyncio.run() waits for the default one, which would block on abandoned calls
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='ai-pipeline')
+
+# ==================== MODEL CLIENTS ====================
+
+class ModelClient(ABC):
+    """Text and image generation used by the AI Dashboard"""
+
+    name = 'base'
+
+    @abstractmethod
+    def generate_text(self, prompt: str, model: str = TEXT_MODEL, timeout: float = TEXT_TIMEOUT) -> str:
+        """Model response text for ``prompt``"""
+
+    @abstractmethod
+    def generate_image(self, prompt: str, model: str = IMAGE_MODEL,
+                       timeout: float = IMAGE_TIMEOUT) -> Optional[bytes]:
+        """Image bytes for ``prompt``, or None if the model returned no image"""
+
+
+class GeminiClient(ModelClient):
+    """google-generativeai backed client"""
+
+    name = 'gemini'
+
+    def __init__(self, api_key: str):
+        if not GEMINI_AVAILABLE:
+            raise ImportError("google-generativeai is required: pip install google-generativeai")
+        genai.configure(api_key=api_key)
+
+    def generate_text(self, prompt: str, model: str = TEXT_MODEL, timeout: float = TEXT_TIMEOUT) -> str:
+        response = genai.GenerativeModel(model).generate_content(prompt, request_options={'timeout': timeout})
+        return response.text.strip()
+
+    def generate_image(self, prompt: str, model: str = IMAGE_MODEL,
+                       timeout: float = IMAGE_TIMEOUT) -> Optional[bytes]:
+        response = genai.GenerativeModel(model).generate_content(
+            prompt,
+            generation_config=genai.GenerationConfig(temperature=0.4),
+            request_options={'timeout': timeout}
+        )
+        for part in getattr(response, 'parts', None) or []:
+            if getattr(part, 'inline_data', None):
+                return part.inline_data.data
+        return None
+
+
+class StubModelClient(ModelClient):
+    """Local stand-in for the model API with fixed latency and canned answers"""
+
+    name = 'stub'
+    STUB_SQL = "SELECT season, COUNT(*) as matches FROM matches GROUP BY season ORDER BY season"
+
+    def __init__(self, latency: float = 1.0, image_latency: Optional[float] = None):
+        self.latency = latency
+        self.image_latency = latency * 2 if image_latency is None else image_latency
+        self.calls: List[str] = []
+
+    def generate_text(self, prompt: str, model: str = TEXT_MODEL, timeout: float = TEXT_TIMEOUT) -> str:
+        self.calls.append('text')
+        time.sleep(min(self.latency, timeout))
+        if self.latency > timeout:
+            raise TimeoutError(f"Stub text model exceeded {timeout:.0f}s")
+        if 'SQL' in prompt:
+            return self.STUB_SQL
+        return "Stub insight: the model backend is stubbed, so this text is a placeholder for the analysis."
+
+    def generate_image(self, prompt: str, model: str = IMAGE_MODEL,
+                       timeout: float = IMAGE_TIMEOUT) -> Optional[bytes]:
+        from PIL import Image
+
+        self.calls.append('image')
+        time.sleep(min(self.image_latency, timeout))
+        if self.image_latency > timeout:
+            raise TimeoutError(f"Stub image model exceeded {timeout:.0f}s")
+        output = io.BytesIO()
+        Image.new('RGB', (960, 540), (20, 24, 40)).save(output, format='PNG')
+        return output.getvalue()
+
+# ==================== ORCHESTRATION ====================
+
+class PipelineTask(NamedTuple):
+    name: str
+    func: Callable[[], Any]
+    timeout: float
+    in_thread: bool = True  # False: run on the loop thread (may touch Streamlit state)
+
+
+class PipelineEvent(NamedTuple):
+    name: str
+    status: str  # 'ok', 'error', 'timeout' or 'cancelled'
+    result: Any
+    elapsed_ms: float
+
+
+async def _run_task(task: PipelineTask, started: float) -> PipelineEvent:
+    try:
+        if task.in_thread:
+            loop = asyncio.get_running_loop()
+            result = await asyncio.wait_for(loop.run_in_executor(_executor, task.func), task.timeout)
+        else:
+            result = task.func()
+        return PipelineEvent(task.name, 'ok', result, (time.perf_counter() - started) * 1000)
+    except asyncio.TimeoutError:
+        return PipelineEvent(task.name, 'timeout', f"timed out after {task.timeout:g}s",
+                             (time.perf_counter() - started) * 1000)
+    except Exception as e:
+        logger.error(f"AI pipeline task {task.name} failed: {e}")
+        return PipelineEvent(task.name, 'error', str(e), (time.perf_counter() - started) * 1000)
+
+
+async def run_tasks(tasks: Iterable[PipelineTask], on_event: Callable[[PipelineEvent], Optional[bool]],
+                    deadline: float = PIPELINE_DEADLINE) -> List[PipelineEvent]:
+    """Run tasks concurrently, calling ``on_event`` in completion order"""
+    started = time.perf_counter()
+    tasks = list(tasks)
+    # Loop-thread tasks are started last so the thread-pool calls are already in flight
+    ordered = sorted(tasks, key=lambda task: not task.in_thread)
+    pending = {asyncio.ensure_future(_run_task(task, started)): task for task in ordered}
+    events: List[PipelineEvent] = []
+    stopped = False
+    try:
+        while pending and not stopped:
+            remaining = deadline - (time.perf_counter() - started)
+            if remaining <= 0:
+                break
+            done, _ = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                pending.pop(future)
+                event = future.result()
+                events.append(event)
+                if on_event(event) is False:
+                    stopped = True
+    finally:
+        status = 'cancelled' if stopped else 'timeout'
+        for future, task in pending.items():
+            future.cancel()
+            message = "cancelled" if stopped else f"not finished within the {deadline:g}s deadline"
+            event = PipelineEvent(task.name, status, message, (time.perf_counter() - started) * 1000)
+            events.append(event)
+            on_event(event)
+    return events
+
+
+def stream_tasks(tasks: Iterable[PipelineTask], on_event: Callable[[PipelineEvent], Optional[bool]],
+                 deadline: float = PIPELINE_DEADLINE) -> List[PipelineEvent]:
+    """Blocking entry point for the Streamlit script thread"""
+    return asyncio.run(run_tasks(tasks, on_event, deadline))
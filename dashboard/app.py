@@ -5,6 +5,8 @@ Professional-grade data analytics dashboard with comprehensive features
 """
 
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
+from streamlit.runtime.scriptrunner import add_script_run_ctx
 import sqlite3
 import pandas as pd
 import plotly.express as px
@@ -12,13 +14,32 @@ import plotly.graph_objects as go
 from pathlib import Path
 import os
 from dotenv import load_dotenv
-from PIL import Image, ImageDraw, ImageFont
-import io
+import mimetypes
 from datetime import datetime
 import logging
 from typing import Optional, Dict, Any, Tuple
 import traceback
 
+from db_schema import SCHEMA_VERSION, get_data_version, get_schema_version
+from db_pool import DEFAULT_POOL_SIZE, ConnectionPool
+from columnar_store import PHASES, DeliveriesStore
+from parquet_store import export_is_current, read_frame
+from shared_cache import DEFAULT_MAX_BYTES as DEFAULT_SHARED_CACHE_BYTES, DataVersionWatch, SharedCache, \
+    create_shared_cache, shared_cached
+from home_snapshot import build_home_datasets, load_snapshot
+from phase_cube import PhaseCube, PhaseStats
+from team_profiles import TeamProfile, build_team_profiles
+from player_index import PlayerIndex, PlayerProfile
+from ai_cache import DEFAULT_TTL_SECONDS, ResultCache
+from watermark import watermark_bytes
+from image_gallery import GalleryIndex, save_image
+from chart_export import DEFAULT_WORKERS as DEFAULT_EXPORT_WORKERS, KALEIDO_AVAILABLE, ChartExporter
+from ai_pipeline import (IMAGE_TIMEOUT, TEXT_TIMEOUT, GeminiClient, ModelClient, PipelineEvent, PipelineTask,
+                         StubModelClient, stream_tasks)
+from intent_engine import EntityIndex, resolve_question, summarize
+from sql_guard import MAX_ROWS, SqlGuardError, run_guarded
+from queries import QUERIES, STATEMENT_CACHE_SIZE, query_stats, run_query, run_scalar, season_query
+
 # ==================== CONFIGURATION CONSTANTS ====================
 
 CHART_CONFIG = {
@@ -28,7 +49,7 @@ CHART_CONFIG = {
     'top_n_records': 10,
     'top_n_hall_of_fame': 5,
     'max_table_rows': 100,
-    'cache_ttl': 3600,  # 1 hour
+    'cache_ttl': None,  # no expiry: caches are dropped when the data version changes
     'min_matches_threshold': 10,
     'min_matches_all_time': 10,
     'min_matches_season': 1,
@@ -250,6 +271,8 @@ except ImportError:
     GEMINI_AVAILABLE = False
 
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+# 'stub' answers locally without the Gemini API (development / testing)
+AI_MODEL_BACKEND = os.getenv('AI_MODEL_BACKEND', 'gemini')
 
 # Initialize session state
 if 'messages' not in st.session_state:
@@ -268,55 +291,132 @@ st.set_page_config(
 # Create directory for generated images
 GENERATED_IMAGES_DIR = Path("generated_images")
 GENERATED_IMAGES_DIR.mkdir(exist_ok=True)
+GALLERY_PAGE_SIZE = 12
+
+DB_PATH = Path("data/cricket_analytics.db")
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', DEFAULT_POOL_SIZE))
+# Cross-process result cache: 'sqlite' (data/shared_cache.db), a redis:// URL, or 'off'
+SHARED_CACHE = os.getenv('SHARED_CACHE', 'sqlite')
+SHARED_CACHE_MAX_BYTES = int(float(os.getenv('SHARED_CACHE_MAX_MB', DEFAULT_SHARED_CACHE_BYTES / 2**20)) * 2**20)
 
 # ==================== DATABASE FUNCTIONS ====================
 
 @st.cache_resource
-def get_database_connection():
-    """Get database connection"""
-    db_path = Path("data/cricket_analytics.db")
+def get_connection_pool() -> ConnectionPool:
+    """Pool of read-only connections shared by all sessions"""
+    db_path = DB_PATH
     if not db_path.exists():
         st.error("❌ Database not found! Run `python scripts/create_database.py` first.")
         st.stop()
-    return sqlite3.connect(db_path, check_same_thread=False)
+    # Registry SQL text is constant, so each query is prepared once per connection
+    pool = ConnectionPool(db_path, size=DB_POOL_SIZE, cached_statements=STATEMENT_CACHE_SIZE)
+    with pool.connection() as conn:
+        schema_version = get_schema_version(conn)
+    if schema_version < SCHEMA_VERSION:
+        # Pages rely on the indexes and aggregate tables added by migrations
+        st.error(f"❌ Database schema is out of date (v{schema_version}, dashboard needs v{SCHEMA_VERSION}). "
+                 "Run `python scripts/create_database.py` to upgrade it.")
+        st.stop()
+    return pool
+
+def db_connection():
+    """Check out a pooled connection: ``with db_connection() as conn: ...``"""
+    return get_connection_pool().connection()
+
+def current_data_version() -> str:
+    """Data version stamp from the meta table (bumped by every ingest and rebuild)"""
+    with db_connection() as conn:
+        return get_data_version(conn)
+
+@st.cache_resource
+def get_data_version_watch() -> DataVersionWatch:
+    """Data version this process's caches were built from (shared by all sessions)"""
+    return DataVersionWatch()
+
+@st.cache_resource
+def get_shared_cache() -> SharedCache:
+    """Result tier shared by worker processes and restarts - warmed once per process"""
+    get_connection_pool()
+    cache = create_shared_cache(SHARED_CACHE, current_data_version, max_bytes=SHARED_CACHE_MAX_BYTES)
+    cache.start_warm_up(add_script_run_ctx)
+    return cache
+
+def sync_data_version():
+    """Drop this process's cached data once the data version changes - one indexed lookup per run"""
+    version = current_data_version()
+    if get_data_version_watch().update(version):
+        logger.info(f"Data version changed to {version}; clearing cached data")
+        st.cache_data.clear()
+        for resource in (get_deliveries_store, get_phase_cube, get_player_index, get_entity_index):
+            resource.clear()
+        # Recompute the common results for the new version before users ask for them
+        get_shared_cache().start_warm_up(add_script_run_ctx)
+
+def shared(namespace: str, *warm: Dict[str, Any]):
+    """Decorator: keep a loader's results in the shared tier (below st.cache_data); ``warm`` calls run on start"""
+    return shared_cached(namespace, get_shared_cache, warm)
+
+@st.cache_resource(ttl=CHART_CONFIG['cache_ttl'], show_spinner=False)
+def get_deliveries_store() -> DeliveriesStore:
+    """Columnar deliveries store - loaded once and shared by all sessions"""
+    get_connection_pool()
+    if export_is_current(DB_PATH):
+        try:
+            return DeliveriesStore.from_export()
+        except Exception as e:
+            logger.error(f"Columnar export unreadable, falling back to SQLite: {e}")
+    with db_connection() as conn:
+        return DeliveriesStore.from_connection(conn)
+
+@st.cache_resource(ttl=CHART_CONFIG['cache_ttl'], show_spinner=False)
+def get_phase_cube() -> PhaseCube:
+    """Phase-split cube over the deliveries store - built once and shared by all sessions"""
+    return PhaseCube.from_store(get_deliveries_store())
 
 @st.cache_data(ttl=CHART_CONFIG['cache_ttl'], show_spinner=False)
+@shared('query')
+def cached_query(query_id: str, **params) -> pd.DataFrame:
+    """Result of a registered query (see queries.py) - cached per (query_id, params)"""
+    with db_connection() as conn:
+        return run_query(conn, query_id, params)
+
+def has_deliveries() -> bool:
+    """Check whether ball-by-ball data is loaded (index lookup, no table scan)"""
+    with db_connection() as conn:
+        return run_scalar(conn, 'has_deliveries') is not None
+
+@st.cache_data(ttl=CHART_CONFIG['cache_ttl'], show_spinner=False)
+@shared('teams', {})
 def load_teams():
     """Load teams data - cached for performance"""
-    conn = get_database_connection()
-    return pd.read_sql_query("SELECT * FROM teams ORDER BY team_name", conn)
+    get_connection_pool()
+    if export_is_current(DB_PATH):
+        # Memory-mapped Parquet/Arrow export (scripts/export_parquet.py)
+        return read_frame('teams').sort_values('team_name', ignore_index=True)
+    with db_connection() as conn:
+        return run_query(conn, 'teams_all')
 
 @st.cache_data(ttl=CHART_CONFIG['cache_ttl'], show_spinner=False)
+@shared('matches', {})
 def load_matches():
     """Load all matches - cached for performance"""
-    conn = get_database_connection()
-    return pd.read_sql_query("SELECT * FROM matches ORDER BY match_date DESC", conn)
+    get_connection_pool()
+    if export_is_current(DB_PATH):
+        return read_frame('matches').sort_values('match_date', ascending=False, ignore_index=True)
+    with db_connection() as conn:
+        return run_query(conn, 'matches_all')
 
 @st.cache_data(ttl=CHART_CONFIG['cache_ttl'], show_spinner=False)
-def get_team_stats():
-    """Get overall team statistics"""
-    conn = get_database_connection()
-    return pd.read_sql_query("""
-        WITH team_matches AS (
-            SELECT team1_name as team FROM matches
-            UNION ALL SELECT team2_name as team FROM matches
-        ),
-        team_wins AS (
-            SELECT match_winner_name as team FROM matches WHERE match_winner_name IS NOT NULL
-        )
-        SELECT 
-            tm.team,
-            COUNT(*) as matches_played,
-            COALESCE(tw.wins, 0) as wins,
-            COUNT(*) - COALESCE(tw.wins, 0) as losses,
-            ROUND(100.0 * COALESCE(tw.wins, 0) / COUNT(*), 1) as win_percentage
-        FROM team_matches tm
-        LEFT JOIN (SELECT team, COUNT(*) as wins FROM team_wins GROUP BY team) tw 
-        ON tm.team = tw.team
-        WHERE tm.team IS NOT NULL
-        GROUP BY tm.team
-        ORDER BY win_percentage DESC
-    """, conn)
+@shared('home', {})
+def get_home_datasets() -> Dict[str, Any]:
+    """Home page datasets from the precomputed snapshot, rebuilt live when stale"""
+    get_connection_pool()
+    datasets = load_snapshot(DB_PATH)
+    if datasets is None:
+        logger.info("Home snapshot missing or stale; computing Home datasets live")
+        with db_connection() as conn:
+            datasets = build_home_datasets(conn, CHART_CONFIG['top_n_records'])
+    return datasets
 
 # ==================== DATA QUALITY & VALIDATION ====================
 
@@ -324,18 +424,13 @@ def get_team_stats():
 def get_data_quality_report() -> Dict[str, Any]:
     """Generate comprehensive data quality metrics"""
     try:
-        conn = get_database_connection()
         matches = load_matches()
         
         # Check deliveries data
         try:
-            deliveries_match_ids = pd.read_sql_query(
-                "SELECT DISTINCT match_id FROM deliveries", conn
-            )['match_id'].tolist()
-            matches_with_deliveries = len(matches[matches['match_id'].isin(deliveries_match_ids)])
+            matches_with_deliveries = get_home_datasets()['matches_with_deliveries']
         except:
             matches_with_deliveries = 0
-            deliveries_match_ids = []
         
         return {
             'total_matches': len(matches),
@@ -457,139 +552,96 @@ def add_export_buttons(df: pd.DataFrame, key_prefix: str = "export"):
 
 # ==================== ADVANCED METRICS ====================
 
-@st.cache_data(ttl=CHART_CONFIG['cache_ttl'])
-def calculate_net_run_rate(team_name: str, season: Optional[int] = None) -> float:
-    """Calculate Net Run Rate (NRR) for a team"""
-    try:
-        conn = get_database_connection()
-        season_filter = f"AND season = {season}" if season else ""
-        
-        query = f"""
-        WITH team_matches AS (
-            SELECT match_id, team1_name, team2_name, match_winner_name
-            FROM matches
-            WHERE (team1_name = '{team_name}' OR team2_name = '{team_name}')
-            {season_filter}
-        ),
-        team_runs AS (
-            SELECT 
-                d.match_id,
-                CASE 
-                    WHEN m.team1_name = '{team_name}' AND d.innings = 1 THEN SUM(d.total_runs)
-                    WHEN m.team2_name = '{team_name}' AND d.innings = 2 THEN SUM(d.total_runs)
-                    ELSE 0
-                END as runs_scored,
-                CASE 
-                    WHEN m.team1_name = '{team_name}' AND d.innings = 2 THEN SUM(d.total_runs)
-                    WHEN m.team2_name = '{team_name}' AND d.innings = 1 THEN SUM(d.total_runs)
-                    ELSE 0
-                END as runs_conceded
-            FROM deliveries d
-            JOIN team_matches m ON d.match_id = m.match_id
-            GROUP BY d.match_id, d.innings
-        )
-        SELECT 
-            SUM(runs_scored) as total_runs_scored,
-            SUM(runs_conceded) as total_runs_conceded,
-            COUNT(DISTINCT match_id) as matches_played
-        FROM team_runs
-        """
-        result = safe_query_execution(query, conn, "Unable to calculate NRR")
-        if result.empty or result.iloc[0]['matches_played'] == 0:
-            return 0.0
-        
-        runs_scored = result.iloc[0]['total_runs_scored'] or 0
-        runs_conceded = result.iloc[0]['total_runs_conceded'] or 0
-        matches = result.iloc[0]['matches_played']
-        
-        if matches == 0:
-            return 0.0
-        
-        # NRR = (Total Runs Scored / Total Overs Faced) - (Total Runs Conceded / Total Overs Bowled)
-        # Simplified: (Runs Scored - Runs Conceded) / Matches (approximation)
-        nrr = (runs_scored - runs_conceded) / matches / 20.0  # Divide by 20 for overs approximation
-        return round(nrr, 3)
-    except Exception as e:
-        logger.error(f"Error calculating NRR: {e}")
-        return 0.0
+@shared('team_profiles', {'season': None})
+def compute_team_profiles(season: Optional[int] = None) -> Dict[str, TeamProfile]:
+    """Team profiles through the shared tier (errors are raised, so they are never stored)"""
+    return build_team_profiles(get_phase_cube(), load_matches(), season)
 
 @st.cache_data(ttl=CHART_CONFIG['cache_ttl'], show_spinner=False)
-def get_powerplay_stats(team_name: str, season: Optional[int] = None) -> Dict[str, Any]:
-    """Get powerplay (overs 1-6) statistics"""
+def get_team_profiles(season: Optional[int] = None) -> Dict[str, TeamProfile]:
+    """Metrics for every team in one pass - cached so switching teams is a lookup"""
     try:
-        conn = get_database_connection()
-        season_filter = f"AND m.season = {season}" if season else ""
-        
-        query = f"""
-        SELECT 
-            AVG(CASE WHEN d.over_number <= 6 THEN d.total_runs ELSE 0 END) as avg_powerplay_runs,
-            AVG(CASE WHEN d.over_number > 15 THEN d.total_runs ELSE 0 END) as avg_death_runs,
-            SUM(CASE WHEN d.over_number <= 6 AND d.is_wicket = 1 THEN 1 ELSE 0 END) as powerplay_wickets,
-            SUM(CASE WHEN d.over_number > 15 AND d.is_wicket = 1 THEN 1 ELSE 0 END) as death_wickets
-        FROM deliveries d
-        JOIN matches m ON d.match_id = m.match_id
-        WHERE (m.team1_name = '{team_name}' OR m.team2_name = '{team_name}')
-        {season_filter}
-        """
-        result = safe_query_execution(query, conn, "Unable to fetch powerplay stats")
-        if result.empty:
-            return {'avg_powerplay_runs': 0, 'avg_death_runs': 0, 'powerplay_wickets': 0, 'death_wickets': 0}
-        return result.iloc[0].to_dict()
+        return compute_team_profiles(season)
     except Exception as e:
-        logger.error(f"Error calculating powerplay stats: {e}")
-        return {'avg_powerplay_runs': 0, 'avg_death_runs': 0, 'powerplay_wickets': 0, 'death_wickets': 0}
+        logger.error(f"Error building team profiles: {e}")
+        return {}
 
-@st.cache_data(ttl=CHART_CONFIG['cache_ttl'], show_spinner=False)
-def get_chase_vs_defend_stats(team_name: str) -> Dict[str, Any]:
-    """Get chase vs defend success rates"""
+@st.cache_resource(ttl=CHART_CONFIG['cache_ttl'], show_spinner=False)
+def get_player_index() -> PlayerIndex:
+    """Per-player season rows + phase cube - one grouped query, shared by all sessions"""
+    with db_connection() as conn:
+        return PlayerIndex.from_connection(conn, get_phase_cube(), get_deliveries_store())
+
+def get_player_profile(name: str) -> Optional[PlayerProfile]:
+    """Career profile for one player - a lookup in the shared player index"""
+    return get_player_index().profile(name)
+
+def get_phase_split(role: str, by: Tuple[str, ...] = ('phase',), **filters) -> pd.DataFrame:
+    """Phase cube slice (role 'batting' or 'bowling') - a group-by over the precomputed cube"""
     try:
-        conn = get_database_connection()
-        query = f"""
-        WITH team_matches AS (
-            SELECT match_id, team1_name, team2_name, toss_winner_name, toss_decision, match_winner_name
-            FROM matches
-            WHERE team1_name = '{team_name}' OR team2_name = '{team_name}'
-        )
-        SELECT 
-            SUM(CASE 
-                WHEN (team1_name = '{team_name}' AND toss_decision = 'bat' AND match_winner_name = '{team_name}') OR
-                     (team2_name = '{team_name}' AND toss_decision = 'field' AND match_winner_name = '{team_name}')
-                THEN 1 ELSE 0 END) as defend_wins,
-            SUM(CASE 
-                WHEN (team1_name = '{team_name}' AND toss_decision = 'bat') OR
-                     (team2_name = '{team_name}' AND toss_decision = 'field')
-                THEN 1 ELSE 0 END) as defend_matches,
-            SUM(CASE 
-                WHEN (team1_name = '{team_name}' AND toss_decision = 'field' AND match_winner_name = '{team_name}') OR
-                     (team2_name = '{team_name}' AND toss_decision = 'bat' AND match_winner_name = '{team_name}')
-                THEN 1 ELSE 0 END) as chase_wins,
-            SUM(CASE 
-                WHEN (team1_name = '{team_name}' AND toss_decision = 'field') OR
-                     (team2_name = '{team_name}' AND toss_decision = 'bat')
-                THEN 1 ELSE 0 END) as chase_matches
-        FROM team_matches
-        """
-        result = safe_query_execution(query, conn, "Unable to fetch chase/defend stats")
-        if result.empty:
-            return {'defend_win_rate': 0, 'chase_win_rate': 0}
-        
-        row = result.iloc[0]
-        defend_wins = row['defend_wins'] or 0
-        defend_matches = row['defend_matches'] or 1
-        chase_wins = row['chase_wins'] or 0
-        chase_matches = row['chase_matches'] or 1
-        
-        return {
-            'defend_win_rate': round(100.0 * defend_wins / defend_matches, 1) if defend_matches > 0 else 0,
-            'chase_win_rate': round(100.0 * chase_wins / chase_matches, 1) if chase_matches > 0 else 0,
-            'defend_wins': int(defend_wins),
-            'defend_matches': int(defend_matches),
-            'chase_wins': int(chase_wins),
-            'chase_matches': int(chase_matches)
-        }
+        return get_phase_cube().slice(role, by, **filters)
     except Exception as e:
-        logger.error(f"Error calculating chase/defend stats: {e}")
-        return {'defend_win_rate': 0, 'chase_win_rate': 0}
+        logger.error(f"Error slicing phase cube: {e}")
+        return pd.DataFrame()
+
+# ==================== PLAYER LEADERBOARDS ====================
+# All leaderboards read the pre-aggregated batter_innings / bowler_innings
+# tables (see aggregates.py) through registered queries (see queries.py).
+
+@st.cache_data(ttl=CHART_CONFIG['cache_ttl'], show_spinner=False)
+@shared('batting_leaders', {'season': None, 'min_matches': 10})
+def get_batting_leaders(season: Optional[int] = None, min_matches: int = 1, limit: int = 15) -> pd.DataFrame:
+    """Top run scorers for a season (or all time)"""
+    query_id, params = season_query('batting_leaders', season)
+    with db_connection() as conn:
+        return run_query(conn, query_id, dict(params, min_matches=min_matches, limit=limit))
+
+@st.cache_data(ttl=CHART_CONFIG['cache_ttl'], show_spinner=False)
+@shared('strike_rate_leaders', {'season': None, 'min_matches': 10, 'min_runs': 200})
+def get_strike_rate_leaders(season: Optional[int] = None, min_matches: int = 1,
+                            min_runs: int = 0, limit: int = 15) -> pd.DataFrame:
+    """Best batting strike rates above a runs threshold"""
+    query_id, params = season_query('strike_rate_leaders', season)
+    with db_connection() as conn:
+        return run_query(conn, query_id, dict(params, min_matches=min_matches, min_runs=min_runs, limit=limit))
+
+@st.cache_data(ttl=CHART_CONFIG['cache_ttl'], show_spinner=False)
+@shared('bowling_leaders', {'season': None, 'min_matches': 10})
+def get_bowling_leaders(season: Optional[int] = None, min_matches: int = 1, limit: int = 15) -> pd.DataFrame:
+    """Top wicket takers for a season (or all time)"""
+    query_id, params = season_query('bowling_leaders', season)
+    with db_connection() as conn:
+        return run_query(conn, query_id, dict(params, min_matches=min_matches, limit=limit))
+
+@st.cache_data(ttl=CHART_CONFIG['cache_ttl'], show_spinner=False)
+@shared('economy_leaders', {'season': None, 'min_matches': 10, 'min_balls': 100})
+def get_economy_leaders(season: Optional[int] = None, min_matches: int = 1,
+                        min_balls: int = 0, limit: int = 15) -> pd.DataFrame:
+    """Best bowling economy rates above a balls-bowled threshold"""
+    query_id, params = season_query('economy_leaders', season)
+    with db_connection() as conn:
+        return run_query(conn, query_id, dict(params, min_matches=min_matches, min_balls=min_balls, limit=limit))
+
+@st.cache_data(ttl=CHART_CONFIG['cache_ttl'], show_spinner=False)
+@shared('highest_scores', {'limit': CHART_CONFIG['top_n_hall_of_fame']})
+def get_highest_scores(limit: int = 5) -> pd.DataFrame:
+    """Highest individual innings scores"""
+    with db_connection() as conn:
+        return run_query(conn, 'highest_scores', {'limit': limit})
+
+@st.cache_data(ttl=CHART_CONFIG['cache_ttl'], show_spinner=False)
+@shared('best_bowling_figures', {'limit': CHART_CONFIG['top_n_hall_of_fame']})
+def get_best_bowling_figures(limit: int = 5) -> pd.DataFrame:
+    """Best bowling figures in a single innings"""
+    with db_connection() as conn:
+        return run_query(conn, 'best_bowling_figures', {'limit': limit})
+
+@st.cache_data(ttl=CHART_CONFIG['cache_ttl'], show_spinner=False)
+@shared('most_sixes', {'limit': CHART_CONFIG['top_n_hall_of_fame']})
+def get_most_sixes(limit: int = 5) -> pd.DataFrame:
+    """Players with the most sixes"""
+    with db_connection() as conn:
+        return run_query(conn, 'most_sixes', {'limit': limit})
 
 # ==================== IMAGE HELPER FUNCTIONS ====================
 
@@ -615,51 +667,20 @@ def plotly_to_image_bytes(fig, width=1200, height=675):
 def add_watermark_to_image(image_bytes, text="@rkjat65"):
     """Add watermark to image"""
     try:
-        img = Image.open(io.BytesIO(image_bytes))
-        if img.mode != 'RGBA':
-            img = img.convert('RGBA')
-        
-        overlay = Image.new('RGBA', img.size, (255, 255, 255, 0))
-        draw = ImageDraw.Draw(overlay)
-        
-        try:
-            font = ImageFont.truetype("arial.ttf", 18)
-        except:
-            try:
-                font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 18)
-            except:
-                font = ImageFont.load_default()
-        
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-        
-        margin = 20
-        x = img.width - text_width - margin
-        y = img.height - text_height - margin
-        
-        draw.text((x + 2, y + 2), text, fill=(0, 0, 0, 128), font=font)
-        draw.text((x, y), text, fill=(255, 255, 255, 200), font=font)
-        
-        watermarked = Image.alpha_composite(img, overlay).convert('RGB')
-        
-        output = io.BytesIO()
-        watermarked.save(output, format='PNG', quality=95)
-        output.seek(0)
-        return output.getvalue()
+        return watermark_bytes(image_bytes, text)
     except Exception as e:
         st.warning(f"Watermark warning: {e}")
         return image_bytes
 
-def save_image_to_folder(image_bytes, prefix="ai_generated"):
-    """Save image locally"""
+@st.cache_resource
+def get_gallery_index() -> GalleryIndex:
+    """Index + thumbnails of generated_images/ shared by all sessions"""
+    return GalleryIndex(GENERATED_IMAGES_DIR)
+
+def save_image_to_folder(image_bytes, prefix="ai_generated", prompt=None):
+    """Save image locally and add it to the gallery index"""
     try:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{prefix}_{timestamp}.png"
-        filepath = GENERATED_IMAGES_DIR / filename
-        with open(filepath, 'wb') as f:
-            f.write(image_bytes)
-        return str(filepath)
+        return str(save_image(GENERATED_IMAGES_DIR, image_bytes, prefix, get_gallery_index(), prompt=prompt))
     except Exception as e:
         st.warning(f"Could not save: {e}")
         return None
@@ -915,51 +936,49 @@ def show_metric_with_tooltip(label: str, value: Any, tooltip: str = "",
     else:
         st.metric(label, value, delta=delta)
 
-def export_chart_as_image(fig, filename: str = "chart") -> bytes:
-    """Export Plotly chart as PNG image"""
+@st.cache_resource
+def get_chart_exporter() -> ChartExporter:
+    """Chart export worker pool and PNG/HTML cache shared by all sessions"""
+    exporter = ChartExporter(workers=int(os.getenv('CHART_EXPORT_WORKERS', DEFAULT_EXPORT_WORKERS)))
+    exporter.warm()
+    return exporter
+
+def deferred_download_button(label: str, make_data, file_name: str, mime: str, key: str):
+    """Download button whose file is only built when clicked"""
     try:
-        import plotly.io as pio
-        try:
-            pio.kaleido.scope.mathjax = None
-        except:
-            pass
-        return pio.to_image(fig, format='png', width=1200, height=675, engine='kaleido')
-    except ImportError:
-        return None
-    except Exception as e:
-        logger.warning(f"Could not export chart: {e}")
-        return None
+        st.download_button(label, make_data, file_name, mime, key=key, use_container_width=True)
+    except StreamlitAPIException:
+        # Streamlit without callable download data: build the file on a first click
+        if st.button(label, key=f"{key}_prepare", use_container_width=True) or st.session_state.get(f"{key}_ready"):
+            st.session_state[f"{key}_ready"] = True
+            st.download_button(f"{label} ✓", make_data(), file_name, mime, key=f"{key}_file",
+                               use_container_width=True)
 
 def add_chart_export_button(fig, chart_title: str, key_prefix: str = "chart"):
     """Add export button below a chart - compact single line layout"""
     if fig is None:
         return
-    
+
+    # Rendering happens on click in the export pool; a page render only serializes the figure
+    exporter = get_chart_exporter()
+    fig_json = fig.to_json()
+    file_stem = chart_title.replace(' ', '_')
+
     # Use a more compact layout with smaller buttons
     col1, col2 = st.columns([1, 1])
     with col1:
-        # Export as PNG
-        img_bytes = export_chart_as_image(fig, chart_title)
-        if img_bytes:
-            st.download_button(
-                "📥 PNG",
-                img_bytes,
-                f"{chart_title.replace(' ', '_')}.png",
-                "image/png",
-                key=f"{key_prefix}_png",
-                use_container_width=True
-            )
+        # Export as PNG - hidden when Kaleido or its browser can't render (the warm-up logs why)
+        png_state = exporter.png_state() if KALEIDO_AVAILABLE else 'unavailable'
+        if png_state == 'ready':
+            deferred_download_button("📥 PNG", lambda: exporter.image(fig_json, 'png'),
+                                     f"{file_stem}.png", "image/png", key=f"{key_prefix}_png")
+        elif png_state == 'starting':
+            st.button("📥 PNG", key=f"{key_prefix}_png_starting", disabled=True, use_container_width=True,
+                      help="Image export is starting up - available on the next refresh")
     with col2:
         # Export as HTML
-        html_str = fig.to_html(include_plotlyjs='cdn')
-        st.download_button(
-            "📥 HTML",
-            html_str.encode('utf-8'),
-            f"{chart_title.replace(' ', '_')}.html",
-            "text/html",
-            key=f"{key_prefix}_html",
-            use_container_width=True
-        )
+        deferred_download_button("📥 HTML", lambda: exporter.html(fig_json),
+                                 f"{file_stem}.html", "text/html", key=f"{key_prefix}_html")
 
 # ==================== GEMINI AI FUNCTIONS ====================
 
@@ -973,104 +992,29 @@ def initialize_gemini():
     except:
         return False
 
+@st.cache_resource
+def get_ai_cache() -> ResultCache:
+    """Persistent AI answer cache shared by all sessions"""
+    return ResultCache(ttl_seconds=float(os.getenv('AI_CACHE_TTL', DEFAULT_TTL_SECONDS)),
+                       version=current_data_version)
+
+@st.cache_resource
+def get_model_client() -> ModelClient:
+    """Gemini client, or the local stub when AI_MODEL_BACKEND=stub"""
+    if AI_MODEL_BACKEND == 'stub':
+        return StubModelClient(latency=float(os.getenv('AI_STUB_LATENCY', 1.0)))
+    return GeminiClient(GEMINI_API_KEY)
+
+@st.cache_resource(ttl=CHART_CONFIG['cache_ttl'], show_spinner=False)
+def get_entity_index() -> EntityIndex:
+    """Team / player / venue / season index for the local intent engine"""
+    with db_connection() as conn:
+        return EntityIndex.from_connection(conn)
+
 def generate_sql_from_question(question):
-    """Generate SQL from natural language with smart preprocessing"""
+    """Generate SQL from natural language with Gemini"""
     try:
-        # Check for common patterns and provide better SQL directly
-        question_lower = question.lower()
-        
-        # Pattern: "Compare Team A vs Team B"
-        if 'compare' in question_lower and ' vs ' in question_lower:
-            # Extract team names
-            parts = question_lower.split(' vs ')
-            if len(parts) == 2:
-                team1 = parts[0].replace('compare', '').strip()
-                team2 = parts[1].strip()
-                
-                # Map common abbreviations to full names
-                team_map = {
-                    'mi': 'Mumbai Indians',
-                    'mumbai': 'Mumbai Indians',
-                    'mumbai indians': 'Mumbai Indians',
-                    'csk': 'Chennai Super Kings',
-                    'chennai': 'Chennai Super Kings',
-                    'chennai super kings': 'Chennai Super Kings',
-                    'rcb': 'Royal Challengers Bangalore',
-                    'bangalore': 'Royal Challengers Bangalore',
-                    'kkr': 'Kolkata Knight Riders',
-                    'kolkata': 'Kolkata Knight Riders',
-                    'dc': 'Delhi Capitals',
-                    'delhi': 'Delhi Capitals',
-                    'pbks': 'Punjab Kings',
-                    'punjab': 'Punjab Kings',
-                    'rr': 'Rajasthan Royals',
-                    'rajasthan': 'Rajasthan Royals',
-                    'srh': 'Sunrisers Hyderabad',
-                    'hyderabad': 'Sunrisers Hyderabad',
-                    'gt': 'Gujarat Titans',
-                    'gujarat': 'Gujarat Titans',
-                    'lsg': 'Lucknow Super Giants',
-                    'lucknow': 'Lucknow Super Giants'
-                }
-                
-                team1_full = team_map.get(team1, team1.title())
-                team2_full = team_map.get(team2, team2.title())
-                
-                # Return proper comparison SQL
-                return f"""
-SELECT 
-    '{team1_full}' as team,
-    COUNT(*) as total_matches,
-    SUM(CASE WHEN match_winner_name = '{team1_full}' THEN 1 ELSE 0 END) as wins,
-    ROUND(100.0 * SUM(CASE WHEN match_winner_name = '{team1_full}' THEN 1 ELSE 0 END) / COUNT(*), 1) as win_percentage
-FROM matches
-WHERE team1_name = '{team1_full}' OR team2_name = '{team1_full}'
-UNION ALL
-SELECT 
-    '{team2_full}' as team,
-    COUNT(*) as total_matches,
-    SUM(CASE WHEN match_winner_name = '{team2_full}' THEN 1 ELSE 0 END) as wins,
-    ROUND(100.0 * SUM(CASE WHEN match_winner_name = '{team2_full}' THEN 1 ELSE 0 END) / COUNT(*), 1) as win_percentage
-FROM matches
-WHERE team1_name = '{team2_full}' OR team2_name = '{team2_full}'
-                """.strip()
-        
-        # Pattern: "Head to head Team A vs Team B"
-        if ('head' in question_lower or 'h2h' in question_lower) and ' vs ' in question_lower:
-            parts = question_lower.replace('head to head', '').replace('h2h', '').split(' vs ')
-            if len(parts) == 2:
-                team1 = parts[0].strip()
-                team2 = parts[1].strip()
-                
-                team_map = {
-                    'mi': 'Mumbai Indians', 'mumbai': 'Mumbai Indians', 'mumbai indians': 'Mumbai Indians',
-                    'csk': 'Chennai Super Kings', 'chennai': 'Chennai Super Kings', 'chennai super kings': 'Chennai Super Kings',
-                    'rcb': 'Royal Challengers Bangalore', 'kkr': 'Kolkata Knight Riders',
-                    'dc': 'Delhi Capitals', 'pbks': 'Punjab Kings', 'rr': 'Rajasthan Royals',
-                    'srh': 'Sunrisers Hyderabad', 'gt': 'Gujarat Titans', 'lsg': 'Lucknow Super Giants'
-                }
-                
-                team1_full = team_map.get(team1, team1.title())
-                team2_full = team_map.get(team2, team2.title())
-                
-                return f"""
-SELECT 
-    '{team1_full}' as team,
-    SUM(CASE WHEN match_winner_name = '{team1_full}' THEN 1 ELSE 0 END) as wins
-FROM matches
-WHERE (team1_name = '{team1_full}' AND team2_name = '{team2_full}')
-   OR (team1_name = '{team2_full}' AND team2_name = '{team1_full}')
-UNION ALL
-SELECT 
-    '{team2_full}' as team,
-    SUM(CASE WHEN match_winner_name = '{team2_full}' THEN 1 ELSE 0 END) as wins
-FROM matches
-WHERE (team1_name = '{team1_full}' AND team2_name = '{team2_full}')
-   OR (team1_name = '{team2_full}' AND team2_name = '{team1_full}')
-                """.strip()
-        
-        # Otherwise use Gemini for SQL generation
-        model = genai.GenerativeModel('gemini-3-pro-preview')  # Use latest text model for SQL
+        # Common question shapes are answered by the local intent engine before this is called
         schema = """Database Schema:
 
 Table: teams (team_id, team_name, short_name, is_active)
@@ -1117,8 +1061,7 @@ Examples of WRONG queries:
 
 Generate the SQL now:"""
         
-        response = model.generate_content(prompt)
-        sql = response.text.strip()
+        sql = get_model_client().generate_text(prompt, timeout=TEXT_TIMEOUT)
         
         # Remove ALL markdown artifacts
         sql = sql.replace('```sql', '')
@@ -1135,9 +1078,9 @@ Generate the SQL now:"""
         # Clean up whitespace
         sql = sql.strip()
         
-        # Ensure it starts with SELECT, WITH, INSERT, UPDATE, or DELETE
-        if not any(sql.upper().startswith(kw) for kw in ['SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE']):
-            for keyword in ['SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE']:
+        # Ensure it starts with SELECT or WITH (run_guarded rejects anything else)
+        if not any(sql.upper().startswith(kw) for kw in ['SELECT', 'WITH']):
+            for keyword in ['SELECT', 'WITH']:
                 if keyword in sql.upper():
                     idx = sql.upper().index(keyword)
                     sql = sql[idx:]
@@ -1150,15 +1093,13 @@ Generate the SQL now:"""
 def generate_insight_from_data(question, data):
     """Generate insights from data"""
     try:
-        model = genai.GenerativeModel('gemini-3-pro-preview')  # Use text model for analysis
         prompt = f"""You are a cricket analyst.
 
 User asked: {question}
 Data: {data.head(10).to_string() if len(data) > 0 else "No results"}
 
 Provide a 2-3 sentence analysis with the answer and one interesting insight."""
-        response = model.generate_content(prompt)
-        return response.text
+        return get_model_client().generate_text(prompt, timeout=TEXT_TIMEOUT)
     except Exception as e:
         return f"Analysis unavailable: {e}"
 
@@ -1815,6 +1756,7 @@ def create_h2h_donut(team1, team2, matches_df):
 def main():
     """Main dashboard"""
     load_css()
+    sync_data_version()
 
     # Sidebar
     with st.sidebar:
@@ -1828,7 +1770,8 @@ def main():
         st.markdown("---")
         
         page = st.radio("Navigate to:",
-            ["Home", "AI Dashboard", "Team Analysis", "Season Insights", "Player Records"],
+            ["Home", "AI Dashboard", "Team Analysis", "Season Insights", "Player Records", "Player Profile",
+             "Image Gallery"],
             label_visibility="visible")
         
         # Track page changes and scroll to top
@@ -1883,6 +1826,10 @@ def main():
         show_season_insights()
     elif page == "Player Records":
         show_player_records()
+    elif page == "Player Profile":
+        show_player_profile()
+    elif page == "Image Gallery":
+        show_generated_gallery()
 
 # ==================== PAGE FUNCTIONS ====================
 
@@ -1899,8 +1846,9 @@ def show_home_page():
     try:
         matches = load_matches()
         teams = load_teams()
-        team_stats = get_team_stats()
-        conn = get_database_connection()
+        # Precomputed at data-load time: first paint never queries deliveries
+        home = get_home_datasets()
+        team_stats = home['team_stats']
         
         if matches.empty:
             st.warning("⚠️ No data loaded")
@@ -1954,7 +1902,24 @@ def show_home_page():
                     st.caption(f"⚠️ {quality_report['null_venues']} matches missing venue data")
                 if quality_report['null_winners'] > 0:
                     st.caption(f"⚠️ {quality_report['null_winners']} matches missing winner data")
-        
+
+            # Query timings recorded by the query registry (cache misses only)
+            timings = query_stats()
+            if not timings.empty:
+                st.caption(f"🕒 {int(timings['calls'].sum())} queries executed, "
+                           f"{timings['total_ms'].sum():.0f} ms total")
+                st.dataframe(timings, hide_index=True, width='stretch')
+            pool_stats = get_connection_pool().stats()
+            st.caption(f"🔌 Connection pool: {pool_stats['in_use']}/{pool_stats['size']} in use "
+                       f"(peak {pool_stats['peak_in_use']}), {pool_stats['checkouts']:,} checkouts, "
+                       f"{pool_stats['saturation']:.1%} waited (avg {pool_stats['avg_wait_ms']} ms, "
+                       f"max {pool_stats['max_wait_ms']} ms)")
+            cache_stats = get_shared_cache().stats()
+            st.caption(f"🗄️ Data version {get_data_version_watch().version}. "
+                       f"Shared cache ({cache_stats['backend']}): {cache_stats['hits']:,} hits, "
+                       f"{cache_stats['misses']:,} misses in this worker, {cache_stats['entries']:,} entries "
+                       f"({cache_stats['size_bytes'] / 2**20:.1f} MB), {cache_stats['evictions']:,} evicted")
+
         # ============ SECTION 1: KEY METRICS ============
         col1, col2, col3, col4 = st.columns(4)
         
@@ -2120,8 +2085,8 @@ def show_home_page():
         
         with col2:
             # WIN METHODS DISTRIBUTION
-            win_by_runs = matches[matches['win_by_runs'] > 0]['win_by_runs'].count()
-            win_by_wickets = matches[matches['win_by_wickets'] > 0]['win_by_wickets'].count()
+            win_by_runs = home['win_methods']['runs']
+            win_by_wickets = home['win_methods']['wickets']
             theme = get_chart_theme_colors()
 
             fig = go.Figure(data=[go.Pie(
@@ -2151,29 +2116,12 @@ def show_home_page():
         st.markdown("## 🌟 Player Spotlight")
         
         try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM deliveries")
-            deliveries_count = cursor.fetchone()[0]
-            
-            if deliveries_count > 0:
+            if home['has_deliveries']:
                 col1, col2 = st.columns(2)
                 
                 with col1:
                     # TOP 10 RUN SCORERS - cached
-                    @st.cache_data(ttl=CHART_CONFIG['cache_ttl'], show_spinner=False)
-                    def get_top_scorers_cached(conn):
-                        return pd.read_sql_query("""
-                            SELECT batter as player, 
-                                   SUM(batter_runs) as total_runs,
-                                   COUNT(DISTINCT match_id) as matches,
-                                   ROUND(SUM(batter_runs) * 1.0 / COUNT(DISTINCT match_id), 1) as avg_per_match
-                            FROM deliveries
-                            WHERE batter IS NOT NULL
-                            GROUP BY batter
-                            ORDER BY total_runs DESC
-                            LIMIT 10
-                        """, conn)
-                    top_scorers = get_top_scorers_cached(conn)
+                    top_scorers = home['top_scorers']
                     
                     theme = get_chart_theme_colors()
                     fig = go.Figure(data=[go.Bar(
@@ -2203,20 +2151,7 @@ def show_home_page():
                 
                 with col2:
                     # TOP 10 WICKET TAKERS - cached
-                    @st.cache_data(ttl=CHART_CONFIG['cache_ttl'], show_spinner=False)
-                    def get_top_bowlers_cached(conn):
-                        return pd.read_sql_query("""
-                            SELECT bowler as player,
-                                   SUM(CASE WHEN is_wicket = 1 AND wicket_kind NOT IN ('run out', 'retired hurt', 'obstructing the field') THEN 1 ELSE 0 END) as total_wickets,
-                                   COUNT(DISTINCT match_id) as matches,
-                                   ROUND(SUM(CASE WHEN is_wicket = 1 AND wicket_kind NOT IN ('run out', 'retired hurt', 'obstructing the field') THEN 1 ELSE 0 END) * 1.0 / COUNT(DISTINCT match_id), 2) as avg_per_match
-                            FROM deliveries
-                            WHERE bowler IS NOT NULL
-                            GROUP BY bowler
-                            ORDER BY total_wickets DESC
-                            LIMIT 10
-                        """, conn)
-                    top_bowlers = get_top_bowlers_cached(conn)
+                    top_bowlers = home['top_bowlers']
                     
                     theme = get_chart_theme_colors()
                     fig = go.Figure(data=[go.Bar(
@@ -2268,15 +2203,7 @@ def show_home_page():
         with col1:
             # AVERAGE RUNS PER SEASON (Scoring trends)
             try:
-                scoring_trends = pd.read_sql_query("""
-                    SELECT m.season,
-                           AVG(d.total_runs) as avg_runs_per_ball,
-                           COUNT(DISTINCT m.match_id) as matches
-                    FROM matches m
-                    JOIN deliveries d ON m.match_id = d.match_id
-                    GROUP BY m.season
-                    ORDER BY m.season
-                """, conn)
+                scoring_trends = home['scoring_trends']
                 
                 if len(scoring_trends) > 0:
                     # Calculate runs per match
@@ -2306,7 +2233,7 @@ def show_home_page():
                     raise Exception("No data")
             except:
                 # Fallback: Matches per season (simple version)
-                season_counts = matches.groupby('season').size().reset_index(name='matches')
+                season_counts = home['matches_per_season']
                 fig = px.bar(season_counts, x='season', y='matches',
                             title='📊 Matches Played Per Season',
                             color='matches',
@@ -2316,8 +2243,7 @@ def show_home_page():
         
         with col2:
             # TOP VENUES BY MATCHES
-            venue_counts = matches['venue'].value_counts().head(10).reset_index()
-            venue_counts.columns = ['venue', 'matches']
+            venue_counts = home['venue_counts']
             
             fig = px.bar(venue_counts,
                          x='matches',
@@ -2356,80 +2282,71 @@ def show_team_analysis():
         
         if selected:
             st.markdown(f"## {selected}")
-            conn = get_database_connection()
             
-            stats = pd.read_sql_query(f"""
-                WITH team_matches AS (
-                    SELECT * FROM matches 
-                    WHERE team1_name = '{selected}' OR team2_name = '{selected}'
-                )
-                SELECT 
-                    COUNT(*) as total_matches,
-                    SUM(CASE WHEN match_winner_name = '{selected}' THEN 1 ELSE 0 END) as wins,
-                    ROUND(100.0 * SUM(CASE WHEN match_winner_name = '{selected}' THEN 1 ELSE 0 END) / COUNT(*), 1) as win_pct
-                FROM team_matches
-            """, conn)
+            profile = get_team_profiles().get(selected, TeamProfile(selected))
+            team_nrr = cached_query('team_nrr', team=selected)
+            net_run_rate = float(team_nrr['nrr'].iloc[0]) if not team_nrr.empty else 0.0
             
             col1, col2, col3, col4 = st.columns(4)
             with col1:
                 show_metric_with_tooltip(
                     "Matches",
-                    int(stats['total_matches'].iloc[0]),
+                    profile.matches,
                     help_text="Total number of matches played by this team"
                 )
             with col2:
                 show_metric_with_tooltip(
                     "Wins",
-                    int(stats['wins'].iloc[0]),
+                    profile.wins,
                     help_text="Total number of matches won by this team"
                 )
             with col3:
                 show_metric_with_tooltip(
                     "Win %",
-                    f"{stats['win_pct'].iloc[0]}%",
+                    f"{profile.win_pct}%",
                     help_text="Percentage of matches won (Wins / Total Matches × 100)"
                 )
             with col4:
-                # Calculate NRR
-                nrr = calculate_net_run_rate(selected)
                 show_metric_with_tooltip(
                     "Net Run Rate",
-                    f"{nrr:+.3f}",
-                    help_text="Net Run Rate: Average run difference per match. Positive NRR indicates better scoring rate."
+                    f"{net_run_rate:+.3f}",
+                    help_text="Net Run Rate: runs per over scored minus runs per over conceded, with overs "
+                              "counted in legal balls. A side bowled out is charged its full quota of overs "
+                              "(the revised quota in rain-reduced matches); league matches only, and no-result "
+                              "matches are excluded."
                 )
             
             # Advanced Metrics Section
             st.markdown("### 📊 Advanced Performance Metrics")
-            chase_defend = get_chase_vs_defend_stats(selected)
-            powerplay_stats = get_powerplay_stats(selected)
+            batting_phases = profile.batting_phases or {}
+            powerplay = batting_phases.get('powerplay', PhaseStats())
+            death = batting_phases.get('death', PhaseStats())
             
             col1, col2, col3, col4 = st.columns(4)
             with col1:
                 show_metric_with_tooltip(
                     "Chase Win Rate",
-                    f"{chase_defend['chase_win_rate']:.1f}%",
-                    delta=f"{chase_defend['chase_wins']}/{chase_defend['chase_matches']} matches",
+                    f"{profile.chase_win_rate:.1f}%",
+                    delta=f"{profile.chase_wins}/{profile.chase_matches} matches",
                     help_text="Win percentage when chasing a target (batting second)"
                 )
             with col2:
                 show_metric_with_tooltip(
                     "Defend Win Rate",
-                    f"{chase_defend['defend_win_rate']:.1f}%",
-                    delta=f"{chase_defend['defend_wins']}/{chase_defend['defend_matches']} matches",
+                    f"{profile.defend_win_rate:.1f}%",
+                    delta=f"{profile.defend_wins}/{profile.defend_matches} matches",
                     help_text="Win percentage when defending a total (batting first)"
                 )
             with col3:
-                avg_pp_runs = powerplay_stats.get('avg_powerplay_runs', 0)
                 show_metric_with_tooltip(
                     "Avg Powerplay Runs",
-                    f"{avg_pp_runs:.1f}",
+                    f"{powerplay.run_rate:.1f}",
                     help_text="Average runs scored per over in powerplay (overs 1-6)"
                 )
             with col4:
-                avg_death_runs = powerplay_stats.get('avg_death_runs', 0)
                 show_metric_with_tooltip(
                     "Avg Death Overs Runs",
-                    f"{avg_death_runs:.1f}",
+                    f"{death.run_rate:.1f}",
                     help_text="Average runs scored per over in death overs (overs 16-20)"
                 )
             
@@ -2443,6 +2360,36 @@ def show_team_analysis():
                 st.plotly_chart(pie_fig)
                 add_chart_export_button(pie_fig, f"{selected}_Win_Loss", f"{selected}_pie")
             
+            # Phase Breakdown: overs the team batted vs overs it bowled (phase cube slices)
+            st.markdown("### ⏱️ Phase Breakdown")
+            batting_split = get_phase_split('batting', batting_team=selected)
+            bowling_split = get_phase_split('bowling', bowling_team=selected)
+            if not batting_split.empty and not bowling_split.empty:
+                phase_df = batting_split[['phase', 'run_rate', 'wickets', 'dot_pct', 'boundary_pct']].merge(
+                    bowling_split[['phase', 'run_rate', 'wickets', 'dot_pct']], on='phase',
+                    suffixes=('_bat', '_bowl'), how='outer')
+                phase_df['phase'] = phase_df['phase'].astype(str).str.title()
+                phase_df.columns = ['Phase', 'Run Rate', 'Wickets Lost', 'Dot %', 'Boundary %',
+                                    'Run Rate Conceded', 'Wickets Taken', 'Dot % (Bowling)']
+                
+                col1, col2 = st.columns([3, 2])
+                with col1:
+                    st.dataframe(phase_df, width='stretch', hide_index=True)
+                    st.caption("Powerplay: overs 1-6 · Middle: 7-15 · Death: 16-20. Super overs excluded.")
+                with col2:
+                    theme = get_chart_theme_colors()
+                    fig = go.Figure(data=[
+                        go.Bar(name='Scored', x=phase_df['Phase'], y=phase_df['Run Rate'],
+                               marker_color=theme['accent_primary']),
+                        go.Bar(name='Conceded', x=phase_df['Phase'], y=phase_df['Run Rate Conceded'],
+                               marker_color=theme['accent_secondary']),
+                    ])
+                    fig.update_layout(barmode='group', yaxis_title='Runs per Over')
+                    fig = apply_chart_theme(fig, title=f'Run Rate by Phase - {selected}',
+                                           height=CHART_CONFIG['small_height'])
+                    st.plotly_chart(fig, width='stretch')
+                    add_chart_export_button(fig, f"{selected}_Phase_Run_Rates", f"{selected}_phases")
+            
             # New: Wins by Venue for Selected Team
             st.markdown("### 🏟️ Success by Venue")
             venue_stats = matches[matches['match_winner_name'] == selected]['venue'].value_counts().head(10).reset_index()
@@ -2474,14 +2421,7 @@ def show_team_analysis():
                     
                     with col1:
                         # H2H Statistics
-                        h2h = safe_query_execution(f"""
-                            SELECT COUNT(*) as total,
-                                SUM(CASE WHEN match_winner_name = '{selected}' THEN 1 ELSE 0 END) as team1_wins,
-                                SUM(CASE WHEN match_winner_name = '{compare_team}' THEN 1 ELSE 0 END) as team2_wins
-                            FROM matches
-                            WHERE (team1_name = '{selected}' AND team2_name = '{compare_team}')
-                               OR (team1_name = '{compare_team}' AND team2_name = '{selected}')
-                        """, conn, "Unable to fetch H2H data")
+                        h2h = cached_query('head_to_head', team1=selected, team2=compare_team)
                         
                         if not h2h.empty:
                             total = int(h2h['total'].iloc[0])
@@ -2637,12 +2577,6 @@ def show_team_analysis():
 #     except Exception as e:
 #         st.error(f"❌ Error: {e}")
 
-@st.cache_data(ttl=CHART_CONFIG['cache_ttl'], show_spinner=False)
-@st.cache_data(ttl=CHART_CONFIG['cache_ttl'], show_spinner=False)
-def get_season_stats(season: int, matches: pd.DataFrame):
-    """Get cached season statistics - optimized"""
-    return matches[matches['season'] == season].copy()
-
 def show_season_insights():
     """Enhanced Season Insights with comprehensive analysis"""
     st.title("📊 Season Insights")
@@ -2657,14 +2591,19 @@ def show_season_insights():
         selected = st.selectbox("Select Season", seasons)
         
         if selected:
-            season_matches = get_season_stats(selected, matches)
+            season_matches = matches[matches['season'] == selected].copy()
+            # League leader, champion and playoffs are precomputed per season (see season_engine.py)
+            season_result = cached_query('season_result', season=int(selected))
+            result = season_result.iloc[0] if not season_result.empty else None
             st.markdown(f"## 🏏 IPL {selected} - Complete Analysis")
             
             # Key Metrics with tooltips
             col1, col2, col3, col4 = st.columns(4)
             with col1:
+                playoff_note = (f" ({int(result['league_matches'])} league, {int(result['playoff_matches'])} playoff)"
+                                if result is not None else "")
                 show_metric_with_tooltip("Matches", len(season_matches), 
-                                       help_text="Total matches played in this season")
+                                       help_text=f"Total matches played in this season{playoff_note}")
             with col2:
                 show_metric_with_tooltip("Teams", season_matches['team1_name'].nunique(),
                                        help_text="Number of teams that participated")
@@ -2672,9 +2611,14 @@ def show_season_insights():
                 show_metric_with_tooltip("Venues", season_matches['venue'].nunique(),
                                        help_text="Number of venues used")
             with col4:
-                winner = season_matches['match_winner_name'].value_counts().index[0] if len(season_matches) > 0 else "N/A"
-                show_metric_with_tooltip("Champion", winner,
-                                       help_text="Team with most wins in the season")
+                if result is not None and result['champion']:
+                    show_metric_with_tooltip("Champion", result['champion'],
+                                           help_text=f"Won the final against {result['runner_up']}")
+                elif result is not None and result['league_leader']:
+                    show_metric_with_tooltip("League Leader", result['league_leader'],
+                                           help_text="Top of the points table (no final on record)")
+                else:
+                    show_metric_with_tooltip("Champion", "N/A", help_text="No results on record for this season")
             
             st.markdown("<br>", unsafe_allow_html=True)
             
@@ -2743,30 +2687,76 @@ def show_season_insights():
             
             st.markdown("<br>", unsafe_allow_html=True)
             
-            # Row 3: Team Performance Table
-            st.markdown("### 📋 Complete Team Standings")
-            team_standings = []
-            for team in season_matches['team1_name'].unique():
-                if pd.notna(team):
-                    team_season_matches = season_matches[
-                        (season_matches['team1_name'] == team) | (season_matches['team2_name'] == team)
-                    ]
-                    wins = (team_season_matches['match_winner_name'] == team).sum()
-                    total = len(team_season_matches)
-                    team_standings.append({
-                        'Team': team,
-                        'Matches': total,
-                        'Wins': wins,
-                        'Losses': total - wins,
-                        'Win %': round(100 * wins / total, 1) if total > 0 else 0
-                    })
+            # Row 3: Batting run rate per phase for every team
+            phase_rates = get_phase_split('batting', ('batting_team', 'phase'), season=int(selected))
+            if not phase_rates.empty:
+                phase_rates['phase'] = phase_rates['phase'].astype(str).str.title()
+                fig = px.bar(phase_rates, x='batting_team', y='run_rate', color='phase', barmode='group',
+                             title=f'⏱️ Run Rate by Phase - IPL {selected}',
+                             labels={'batting_team': 'Team', 'run_rate': 'Runs per Over', 'phase': 'Phase'})
+                fig = apply_chart_theme(fig, height=CHART_CONFIG['default_height'])
+                st.plotly_chart(fig, width='stretch')
+                add_chart_export_button(fig, f"Phase_Run_Rates_{selected}", f"phases_{selected}")
+            
+            st.markdown("<br>", unsafe_allow_html=True)
+            
+            # Row 4: Standings race - position after every league match (precomputed snapshots)
+            standings_race = cached_query('season_standings_race', season=int(selected))
+            if not standings_race.empty:
+                st.markdown("### 🏁 Standings Race")
+                race_metric = st.radio("Show", ["Position", "Points"], horizontal=True,
+                                       key=f"race_metric_{selected}")
+                y_column = race_metric.lower()
+                fig = px.line(standings_race, x='match_number', y=y_column, color='team',
+                              line_shape='hv', hover_data={'played': True, 'points': True, 'nrr': ':+.3f'},
+                              labels={'match_number': 'League Match', 'position': 'Position',
+                                      'points': 'Points', 'team': 'Team', 'played': 'Played', 'nrr': 'NRR'})
+                if y_column == 'position':
+                    fig.update_yaxes(autorange='reversed', dtick=1)
+                fig = apply_chart_theme(fig, title=f'🏁 Standings Race - IPL {selected}',
+                                        height=CHART_CONFIG['default_height'] + 100)
+                st.plotly_chart(fig, width='stretch')
+                add_chart_export_button(fig, f"Standings_Race_{selected}", f"race_{selected}")
+                st.markdown("<br>", unsafe_allow_html=True)
             
-            if team_standings:
-                standings_df = pd.DataFrame(team_standings).sort_values('Win %', ascending=False)
-                standings_df = format_columns(standings_df)
+            # Row 5: Points Table (league stage, precomputed per season) and playoffs
+            st.markdown("### 📋 Points Table")
+            points_table = cached_query('season_points_table', season=int(selected))
+            if not points_table.empty:
+                standings_df = pd.DataFrame({
+                    'Pos': range(1, len(points_table) + 1),
+                    'Team': points_table['team'],
+                    'M': points_table['matches'],
+                    'W': points_table['wins'],
+                    'L': points_table['losses'],
+                    'NR': points_table['no_results'],
+                    'Pts': points_table['points'],
+                    'NRR': points_table['nrr'].map(lambda value: f"{value:+.3f}"),
+                })
                 st.dataframe(standings_df, width='stretch', hide_index=True, height=400)
+                st.caption("League stage only: 2 points per win, 1 per no result; ties go to the super over "
+                           "winner. NRR charges a side bowled out its full quota of overs.")
                 add_export_buttons(standings_df, key_prefix=f"standings_{selected}")
                 
+                playoffs = cached_query('season_playoffs', season=int(selected))
+                if not playoffs.empty:
+                    st.markdown("### 🏆 Playoffs")
+                    by_wickets = (playoffs['win_by_wickets'].astype(str) + ' wickets').where(
+                        playoffs['win_by_wickets'] > 0, '-')
+                    margin = (playoffs['win_by_runs'].astype(str) + ' runs').where(
+                        playoffs['win_by_runs'] > 0, by_wickets)
+                    playoffs_df = pd.DataFrame({
+                        'Stage': playoffs['stage'],
+                        'Date': playoffs['match_date'],
+                        'Match': playoffs['team1_name'] + ' vs ' + playoffs['team2_name'],
+                        'Winner': playoffs['match_winner_name'].fillna('No result'),
+                        'Margin': margin,
+                        'Venue': playoffs['venue'],
+                    })
+                    st.dataframe(playoffs_df, width='stretch', hide_index=True)
+            else:
+                st.info("💡 No points table for this season - run `python scripts/build_aggregates.py` after loading data.")
+                
     except Exception as e:
         error_msg = f"❌ Error loading season insights: {str(e)}"
         st.error(error_msg)
@@ -2795,16 +2785,8 @@ def show_head_to_head():
         
         if team1 and team2:
             st.markdown(f"## {team1} vs {team2}")
-            conn = get_database_connection()
             
-            h2h = pd.read_sql_query(f"""
-                SELECT COUNT(*) as total,
-                    SUM(CASE WHEN match_winner_name = '{team1}' THEN 1 ELSE 0 END) as team1_wins,
-                    SUM(CASE WHEN match_winner_name = '{team2}' THEN 1 ELSE 0 END) as team2_wins
-                FROM matches
-                WHERE (team1_name = '{team1}' AND team2_name = '{team2}')
-                   OR (team1_name = '{team2}' AND team2_name = '{team1}')
-            """, conn)
+            h2h = cached_query('head_to_head', team1=team1, team2=team2)
             
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -2825,15 +2807,10 @@ def show_player_records():
     st.markdown("### IPL's Greatest Performers")
     
     try:
-        conn = get_database_connection()
         matches = load_matches()
         
         # Check if deliveries data exists
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM deliveries")
-        deliveries_count = cursor.fetchone()[0]
-        
-        if deliveries_count == 0:
+        if not has_deliveries():
             st.warning("⚠️ Player statistics require ball-by-ball data")
             st.info("💡 Load deliveries data to see player records")
             return
@@ -2852,8 +2829,8 @@ def show_player_records():
         with col3:
             min_matches = st.number_input("Min Matches", min_value=1, value=10, step=5)
         
-        # Build season filter
-        season_filter = f"AND m.season = {selected_season}" if selected_season != 'All Time' else ""
+        # Season filter (None = all time)
+        season = None if selected_season == 'All Time' else int(selected_season)
         
         # ============ BATTING RECORDS ============
         if stat_type in ["Batting", "All-Round"]:
@@ -2864,31 +2841,7 @@ def show_player_records():
             
             with col1:
                 # Top Run Scorers
-                query = f"""
-                    SELECT d.batter as player,
-                           COUNT(DISTINCT d.match_id) as matches,
-                           SUM(d.batter_runs) as total_runs,
-                           MAX(innings_runs.runs) as highest_score,
-                           ROUND(AVG(innings_runs.runs), 1) as average,
-                           ROUND(SUM(d.batter_runs) * 100.0 / NULLIF(SUM(CASE WHEN d.is_wide_ball = 0 THEN 1 ELSE 0 END), 0), 1) as strike_rate,
-                           SUM(CASE WHEN d.batter_runs = 6 THEN 1 ELSE 0 END) as sixes,
-                           SUM(CASE WHEN d.batter_runs = 4 THEN 1 ELSE 0 END) as fours
-                    FROM deliveries d
-                    JOIN matches m ON d.match_id = m.match_id
-                    LEFT JOIN (
-                        SELECT match_id, innings, batter, SUM(batter_runs) as runs
-                        FROM deliveries
-                        GROUP BY match_id, innings, batter
-                    ) innings_runs ON d.match_id = innings_runs.match_id 
-                                   AND d.innings = innings_runs.innings 
-                                   AND d.batter = innings_runs.batter
-                    WHERE d.batter IS NOT NULL {season_filter}
-                    GROUP BY d.batter
-                    HAVING COUNT(DISTINCT d.match_id) >= {min_matches if selected_season == 'All Time' else 1}
-                    ORDER BY total_runs DESC
-                    LIMIT 15
-                """
-                top_scorers = pd.read_sql_query(query, conn)
+                top_scorers = get_batting_leaders(season, min_matches if season is None else 1)
                 top_scorers = format_columns(top_scorers)
                 
                 st.markdown("### 👑 Top Run Scorers")
@@ -2909,22 +2862,7 @@ def show_player_records():
                 run_threshold = 200 if selected_season == 'All Time' else 50
                 match_threshold = min_matches if selected_season == 'All Time' else 1
                 
-                query = f"""
-                    SELECT d.batter as player,
-                           COUNT(DISTINCT d.match_id) as matches,
-                           SUM(d.batter_runs) as total_runs,
-                           SUM(CASE WHEN d.is_wide_ball = 0 THEN 1 ELSE 0 END) as balls_faced,
-                           ROUND(SUM(d.batter_runs) * 100.0 / NULLIF(SUM(CASE WHEN d.is_wide_ball = 0 THEN 1 ELSE 0 END), 0), 1) as strike_rate,
-                           SUM(CASE WHEN d.batter_runs = 6 THEN 1 ELSE 0 END) as sixes
-                    FROM deliveries d
-                    JOIN matches m ON d.match_id = m.match_id
-                    WHERE d.batter IS NOT NULL {season_filter}
-                    GROUP BY d.batter
-                    HAVING COUNT(DISTINCT d.match_id) >= {match_threshold} AND SUM(d.batter_runs) >= {run_threshold}
-                    ORDER BY strike_rate DESC
-                    LIMIT 15
-                """
-                best_sr = pd.read_sql_query(query, conn)
+                best_sr = get_strike_rate_leaders(season, match_threshold, run_threshold)
                 best_sr = format_columns(best_sr)
                 
                 st.markdown("### ⚡ Best Strike Rates")
@@ -2948,24 +2886,7 @@ def show_player_records():
             
             with col1:
                 # Top Wicket Takers
-                query = f"""
-                    SELECT d.bowler as player,
-                           COUNT(DISTINCT d.match_id) as matches,
-                           SUM(CASE WHEN d.is_wicket = 1 AND d.wicket_kind NOT IN ('run out', 'retired hurt', 'obstructing the field') THEN 1 ELSE 0 END) as total_wickets,
-                           SUM(CASE WHEN d.is_wide_ball = 0 AND d.is_no_ball = 0 THEN 1 ELSE 0 END) as balls_bowled,
-                           SUM(d.batter_runs + d.wide_ball_runs + d.no_ball_runs) as runs_conceded,
-                           ROUND(SUM(d.batter_runs + d.wide_ball_runs + d.no_ball_runs) * 6.0 / NULLIF(SUM(CASE WHEN d.is_wide_ball = 0 AND d.is_no_ball = 0 THEN 1 ELSE 0 END), 0), 2) as economy,
-                           ROUND(SUM(d.batter_runs + d.wide_ball_runs + d.no_ball_runs) * 1.0 / NULLIF(SUM(CASE WHEN d.is_wicket = 1 AND d.wicket_kind NOT IN ('run out', 'retired hurt', 'obstructing the field') THEN 1 ELSE 0 END), 0), 1) as average,
-                           ROUND(SUM(CASE WHEN d.is_wide_ball = 0 AND d.is_no_ball = 0 THEN 1 ELSE 0 END) * 1.0 / NULLIF(SUM(CASE WHEN d.is_wicket = 1 AND d.wicket_kind NOT IN ('run out', 'retired hurt', 'obstructing the field') THEN 1 ELSE 0 END), 0), 1) as strike_rate
-                    FROM deliveries d
-                    JOIN matches m ON d.match_id = m.match_id
-                    WHERE d.bowler IS NOT NULL {season_filter}
-                    GROUP BY d.bowler
-                    HAVING COUNT(DISTINCT d.match_id) >= {min_matches if selected_season == 'All Time' else 1}
-                    ORDER BY total_wickets DESC
-                    LIMIT 15
-                """
-                top_bowlers = pd.read_sql_query(query, conn)
+                top_bowlers = get_bowling_leaders(season, min_matches if season is None else 1)
                 top_bowlers = format_columns(top_bowlers)
                 
                 st.markdown("### 🎯 Top Wicket Takers")
@@ -2988,22 +2909,7 @@ def show_player_records():
                 run_threshold_bowling = 100 if selected_season == 'All Time' else 24
                 match_threshold_bowling = min_matches if selected_season == 'All Time' else 1
 
-                query = f"""
-                    SELECT d.bowler as player,
-                           COUNT(DISTINCT d.match_id) as matches,
-                           SUM(CASE WHEN d.is_wicket = 1 AND d.wicket_kind NOT IN ('run out', 'retired hurt', 'obstructing the field') THEN 1 ELSE 0 END) as wickets,
-                           SUM(CASE WHEN d.is_wide_ball = 0 AND d.is_no_ball = 0 THEN 1 ELSE 0 END) as balls_bowled,
-                           SUM(d.batter_runs + d.wide_ball_runs + d.no_ball_runs) as runs_conceded,
-                           ROUND(SUM(d.batter_runs + d.wide_ball_runs + d.no_ball_runs) * 6.0 / NULLIF(SUM(CASE WHEN d.is_wide_ball = 0 AND d.is_no_ball = 0 THEN 1 ELSE 0 END), 0), 2) as economy
-                    FROM deliveries d
-                    JOIN matches m ON d.match_id = m.match_id
-                    WHERE d.bowler IS NOT NULL {season_filter}
-                    GROUP BY d.bowler
-                    HAVING COUNT(DISTINCT d.match_id) >= {match_threshold_bowling} AND SUM(CASE WHEN d.is_wide_ball = 0 AND d.is_no_ball = 0 THEN 1 ELSE 0 END) >= {run_threshold_bowling}
-                    ORDER BY economy ASC
-                    LIMIT 15
-                """
-                best_economy = pd.read_sql_query(query, conn)
+                best_economy = get_economy_leaders(season, match_threshold_bowling, run_threshold_bowling)
                 best_economy = format_columns(best_economy)
                 
                 st.markdown("### 💰 Best Economy Rates")
@@ -3021,19 +2927,45 @@ def show_player_records():
                 st.plotly_chart(fig, width='stretch')
                 add_chart_export_button(fig, "Best_Economy_Rates", "best_economy")
         
+        # ============ PHASE SPECIALISTS ============
+        st.markdown("---")
+        st.markdown("## ⏱️ Phase Specialists")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            phase = st.selectbox("Phase", list(PHASES), format_func=str.title,
+                                 key='specialist_phase')
+        with col2:
+            min_balls = st.number_input("Min Balls", min_value=1, value=120 if season is None else 30,
+                                        step=10, key='specialist_min_balls')
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            batters = get_phase_split('batting', ('player',), season=season, phase=phase)
+            if not batters.empty:
+                batters = batters[batters['faced'] >= min_balls].nlargest(10, 'strike_rate')
+                st.markdown(f"### 🏏 Best Strike Rates - {phase.title()}")
+                st.dataframe(batters[['player', 'player_runs', 'faced', 'strike_rate', 'boundary_pct']].rename(columns={
+                    'player': 'Player', 'player_runs': 'Runs', 'faced': 'Balls',
+                    'strike_rate': 'Strike Rate', 'boundary_pct': 'Boundary %'}),
+                    width='stretch', hide_index=True)
+        with col2:
+            bowlers = get_phase_split('bowling', ('player',), season=season, phase=phase)
+            if not bowlers.empty:
+                bowlers = bowlers[bowlers['balls'] >= min_balls].nsmallest(10, 'economy')
+                st.markdown(f"### 🎯 Best Economy - {phase.title()}")
+                st.dataframe(bowlers[['player', 'balls', 'player_wickets', 'economy', 'dot_pct']].rename(columns={
+                    'player': 'Player', 'balls': 'Balls', 'player_wickets': 'Wickets',
+                    'economy': 'Economy', 'dot_pct': 'Dot %'}),
+                    width='stretch', hide_index=True)
+        
         # ============ PLAYER COMPARISON ============
         st.markdown("---")
         st.markdown("## 🔄 Player Comparison")
         
-        # Get all players
-        all_players = pd.read_sql_query(f"""
-            SELECT DISTINCT batter as player FROM deliveries
-            WHERE batter IS NOT NULL
-            UNION
-            SELECT DISTINCT bowler as player FROM deliveries
-            WHERE bowler IS NOT NULL
-            ORDER BY player
-        """, conn)['player'].tolist()
+        # Player directory from the in-memory index (no query per rerun)
+        player_index = get_player_index()
+        all_players = player_index.players
         
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -3046,39 +2978,19 @@ def show_player_records():
         if st.button("🔄 Compare Players", type="primary"):
             players = [player1, player2] if player3 == 'None' else [player1, player2, player3]
             
-            # Get comparison data
-            comparison_data = []
-            for player in players:
-                batting = pd.read_sql_query(f"""
-                    SELECT 
-                        '{player}' as player,
-                        COUNT(DISTINCT match_id) as matches,
-                        SUM(batter_runs) as runs,
-                        ROUND(SUM(batter_runs) * 100.0 / COUNT(*), 1) as strike_rate,
-                        SUM(CASE WHEN batter_runs = 6 THEN 1 ELSE 0 END) as sixes
-                    FROM deliveries
-                    WHERE batter = '{player}'
-                """, conn)
-                
-                bowling = pd.read_sql_query(f"""
-                    SELECT 
-                        SUM(CASE WHEN is_wicket = 1 AND wicket_kind NOT IN ('run out', 'retired hurt', 'obstructing the field') THEN 1 ELSE 0 END) as wickets,
-                        ROUND(SUM(batter_runs + wide_ball_runs + no_ball_runs) * 6.0 / NULLIF(SUM(CASE WHEN is_wide_ball = 0 AND is_no_ball = 0 THEN 1 ELSE 0 END), 0), 2) as economy
-                    FROM deliveries
-                    WHERE bowler = '{player}'
-                """, conn)
-                
-                comparison_data.append({
-                    'Player': player,
-                    'Matches': int(batting['matches'].iloc[0]),
-                    'Runs': int(batting['runs'].iloc[0]),
-                    'Strike Rate': float(batting['strike_rate'].iloc[0]),
-                    'Sixes': int(batting['sixes'].iloc[0]),
-                    'Wickets': int(bowling['wickets'].iloc[0]) if bowling['wickets'].iloc[0] else 0,
-                    'Economy': float(bowling['economy'].iloc[0]) if bowling['economy'].iloc[0] else 0
-                })
-            
-            comp_df = pd.DataFrame(comparison_data)
+            # One index lookup for every selected player (summary, seasons and phases)
+            comparison = player_index.compare(players)
+            summary = comparison.summary
+            comp_df = pd.DataFrame({
+                'Player': summary['player'],
+                'Matches': summary['matches'].astype(int),
+                'Runs': summary['runs'].astype(int),
+                'Average': summary['average'].fillna(0.0),
+                'Strike Rate': summary['strike_rate'].fillna(0.0).round(1),
+                'Sixes': summary['sixes'].astype(int),
+                'Wickets': summary['wickets'].astype(int),
+                'Economy': summary['economy'].fillna(0.0),
+            })
             
             col1, col2 = st.columns([1, 2])
             
@@ -3125,6 +3037,27 @@ def show_player_records():
                 )
                 st.plotly_chart(fig, width='stretch')
                 add_chart_export_button(fig, "Player_Comparison_Radar", "player_comparison")
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                seasons_df = comparison.seasons
+                if not seasons_df.empty:
+                    fig = px.line(seasons_df, x='season', y='runs', color='player', markers=True,
+                                  title='Runs by Season', labels={'season': 'Season', 'runs': 'Runs', 'player': 'Player'})
+                    fig = apply_chart_theme(fig, height=CHART_CONFIG['default_height'])
+                    st.plotly_chart(fig, width='stretch')
+                    add_chart_export_button(fig, "Player_Comparison_Seasons", "player_comparison_seasons")
+            
+            with col2:
+                phases_df = comparison.phases
+                if not phases_df.empty:
+                    st.markdown("### ⏱️ By Phase")
+                    phases_df = phases_df.assign(phase=phases_df['phase'].astype(str).str.title())
+                    st.dataframe(phases_df[['player', 'phase', 'runs', 'strike_rate', 'wickets', 'economy']].rename(columns={
+                        'player': 'Player', 'phase': 'Phase', 'runs': 'Runs', 'strike_rate': 'Strike Rate',
+                        'wickets': 'Wickets', 'economy': 'Economy'}),
+                        width='stretch', hide_index=True)
         
         # ============ HALL OF FAME ============
         st.markdown("---")
@@ -3134,14 +3067,7 @@ def show_player_records():
         
         with col1:
             st.markdown("### 🎯 Highest Score")
-            query = """
-                SELECT batter as player, SUM(batter_runs) as runs
-                FROM deliveries
-                GROUP BY match_id, innings, batter
-                ORDER BY runs DESC
-                LIMIT 5
-            """
-            highest = pd.read_sql_query(query, conn)
+            highest = get_highest_scores(CHART_CONFIG['top_n_hall_of_fame'])
             highest = format_columns(highest)
             # Show as bar chart
             fig = px.bar(highest, x='Runs', y='Player', orientation='h', title='Top Innings - Highest Scores', color='Runs', color_continuous_scale='Oranges')
@@ -3152,16 +3078,7 @@ def show_player_records():
         
         with col2:
             st.markdown("### 🎯 Best Bowling")
-            query = """
-                SELECT bowler as player, 
-                       SUM(CASE WHEN is_wicket = 1 AND wicket_kind NOT IN ('run out', 'retired hurt', 'obstructing the field') THEN 1 ELSE 0 END) as wickets,
-                       SUM(batter_runs + wide_ball_runs + no_ball_runs) as runs
-                FROM deliveries
-                GROUP BY match_id, innings, bowler
-                ORDER BY wickets DESC, runs ASC
-                LIMIT 5
-            """
-            best_bowling = pd.read_sql_query(query, conn)
+            best_bowling = get_best_bowling_figures(CHART_CONFIG['top_n_hall_of_fame'])
             best_bowling = format_columns(best_bowling)
             # Show as bar chart (wickets)
             fig = px.bar(best_bowling, x='Wickets', y='Player', orientation='h', title='Best Bowling Performances', color='Wickets', color_continuous_scale='Reds')
@@ -3172,15 +3089,7 @@ def show_player_records():
         
         with col3:
             st.markdown("### 🎯 Most Sixes")
-            query = """
-                SELECT batter as player, COUNT(*) as total_sixes
-                FROM deliveries
-                WHERE batter_runs = 6
-                GROUP BY batter
-                ORDER BY total_sixes DESC
-                LIMIT 5
-            """
-            most_sixes = pd.read_sql_query(query, conn)
+            most_sixes = get_most_sixes(CHART_CONFIG['top_n_hall_of_fame'])
             most_sixes = format_columns(most_sixes)
             # Show as bar chart
             fig = px.bar(most_sixes, x='Total Sixes', y='Player', orientation='h', title='Most Sixes (Innings)', color='Total Sixes', color_continuous_scale='Purples')
@@ -3194,6 +3103,161 @@ def show_player_records():
         import traceback
         st.code(traceback.format_exc())
 
+def show_player_profile():
+    """Player Profile page - career lines, best figures, dismissals, phases and opponents"""
+    st.title("👤 Player Profile")
+    
+    try:
+        if not has_deliveries():
+            st.warning("⚠️ Player profiles require ball-by-ball data")
+            st.info("💡 Load deliveries data to see player profiles")
+            return
+        
+        players = get_player_index().players
+        if not players:
+            st.warning("⚠️ No players found")
+            return
+        
+        name = st.selectbox("Select Player", players, key='profile_player')
+        profile = get_player_profile(name)
+        if profile is None:
+            st.warning(f"⚠️ No records for {name}")
+            return
+        
+        career = profile.career
+        st.markdown(f"## {profile.name}")
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            show_metric_with_tooltip("Matches", int(career['matches']),
+                                     help_text=f"Matches batted or bowled in, across {int(career['seasons'])} seasons")
+        with col2:
+            show_metric_with_tooltip("Runs", f"{int(career['runs']):,}",
+                                     delta=f"HS {profile.highest_score}",
+                                     help_text="Career runs off the bat; * marks a not-out highest score")
+        with col3:
+            show_metric_with_tooltip("Wickets", int(career['wickets']),
+                                     delta=f"Best {profile.best_figures}",
+                                     help_text="Wickets credited to the bowler (run outs excluded); best figures in one innings")
+        with col4:
+            show_metric_with_tooltip("Strike Rate / Economy",
+                                     f"{career['strike_rate'] if pd.notna(career['strike_rate']) else 0:.1f} / "
+                                     f"{career['economy'] if pd.notna(career['economy']) else 0:.2f}",
+                                     help_text="Runs per 100 balls faced / runs conceded per over")
+        
+        # ============ CAREER LINES ============
+        st.markdown("---")
+        st.markdown("## 📅 Season by Season")
+        seasons_df = profile.seasons
+        if not seasons_df.empty:
+            season_lines = pd.DataFrame({
+                'Season': seasons_df['season'],
+                'Matches': seasons_df['matches'],
+                'Runs': seasons_df['runs'],
+                'HS': seasons_df['highest_score'],
+                'Average': seasons_df['average'],
+                'Strike Rate': seasons_df['strike_rate'],
+                '4s': seasons_df['fours'],
+                '6s': seasons_df['sixes'],
+                'Wickets': seasons_df['wickets'],
+                'Economy': seasons_df['economy'],
+                'Bowling Avg': seasons_df['bowling_average'],
+            })
+            st.dataframe(season_lines, width='stretch', hide_index=True)
+            add_export_buttons(season_lines, key_prefix=f"profile_{name}")
+            
+            fig = go.Figure()
+            theme = get_chart_theme_colors()
+            fig.add_trace(go.Bar(x=seasons_df['season'], y=seasons_df['runs'], name='Runs',
+                                 marker_color=theme['accent_primary']))
+            fig.add_trace(go.Scatter(x=seasons_df['season'], y=seasons_df['wickets'], name='Wickets',
+                                     yaxis='y2', mode='lines+markers', line=dict(color=theme['accent_warning'])))
+            fig.update_layout(yaxis=dict(title='Runs'), yaxis2=dict(title='Wickets', overlaying='y', side='right'),
+                              xaxis_title='Season')
+            fig = apply_chart_theme(fig, title=f'{name} - Runs and Wickets by Season',
+                                    height=CHART_CONFIG['default_height'])
+            st.plotly_chart(fig, width='stretch')
+            add_chart_export_button(fig, f"{name}_Career", f"profile_career_{name}")
+        
+        # ============ DISMISSALS & PHASES ============
+        st.markdown("---")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("### 🏏 How Dismissed")
+            if not profile.dismissals.empty:
+                fig = px.pie(profile.dismissals, names='kind', values='count', hole=0.4)
+                fig = apply_chart_theme(fig, height=CHART_CONFIG['small_height'])
+                st.plotly_chart(fig, width='stretch')
+            else:
+                st.info("Never dismissed")
+        with col2:
+            st.markdown("### 🎯 How Wickets Fell")
+            if not profile.wicket_kinds.empty:
+                fig = px.pie(profile.wicket_kinds, names='kind', values='count', hole=0.4)
+                fig = apply_chart_theme(fig, height=CHART_CONFIG['small_height'])
+                st.plotly_chart(fig, width='stretch')
+            else:
+                st.info("No wickets")
+        
+        st.markdown("### ⏱️ By Phase")
+        col1, col2 = st.columns(2)
+        with col1:
+            if not profile.batting_phases.empty:
+                batting_phases = profile.batting_phases
+                st.dataframe(pd.DataFrame({
+                    'Phase': batting_phases['phase'].astype(str).str.title(),
+                    'Runs': batting_phases['runs'],
+                    'Balls': batting_phases['balls'],
+                    'Strike Rate': batting_phases['strike_rate'],
+                    'Dot %': batting_phases['dot_pct'],
+                    'Boundary %': batting_phases['boundary_pct'],
+                }), width='stretch', hide_index=True)
+        with col2:
+            if not profile.bowling_phases.empty:
+                bowling_phases = profile.bowling_phases
+                st.dataframe(pd.DataFrame({
+                    'Phase': bowling_phases['phase'].astype(str).str.title(),
+                    'Balls': bowling_phases['balls'],
+                    'Wickets': bowling_phases['wickets'],
+                    'Economy': bowling_phases['economy'],
+                    'Dot %': bowling_phases['dot_pct'],
+                }), width='stretch', hide_index=True)
+        
+        # ============ OPPONENTS ============
+        st.markdown("---")
+        st.markdown("## ⚔️ Against Each Team")
+        col1, col2 = st.columns(2)
+        with col1:
+            opponents = profile.batting_opponents
+            if not opponents.empty:
+                st.markdown("### Batting")
+                batting_vs = pd.DataFrame({
+                    'Opponent': opponents['opponent'].astype(str),
+                    'Runs': opponents['runs'],
+                    'Balls': opponents['balls'],
+                    'Strike Rate': opponents['strike_rate'],
+                })
+                if 'outs' in opponents.columns:
+                    batting_vs['Outs'] = opponents['outs']
+                    batting_vs['Average'] = opponents['average']
+                st.dataframe(batting_vs, width='stretch', hide_index=True)
+        with col2:
+            opponents = profile.bowling_opponents
+            if not opponents.empty:
+                st.markdown("### Bowling")
+                st.dataframe(pd.DataFrame({
+                    'Opponent': opponents['opponent'].astype(str),
+                    'Balls': opponents['balls'],
+                    'Runs': opponents['runs'],
+                    'Wickets': opponents['wickets'],
+                    'Economy': opponents['economy'],
+                }), width='stretch', hide_index=True)
+        st.caption("Phase and opponent splits exclude super overs.")
+        
+    except Exception as e:
+        st.error(f"❌ Error loading player profile: {e}")
+        logger.error(f"Player profile error: {e}\n{traceback.format_exc()}")
+
 # ==================== AI DASHBOARD (REDESIGNED) ====================
 
 def show_ai_dashboard():
@@ -3207,25 +3271,50 @@ def show_ai_dashboard():
         </div>
     """, unsafe_allow_html=True)
     
-    if not GEMINI_AVAILABLE or not GEMINI_API_KEY:
+    if AI_MODEL_BACKEND != 'stub' and (not GEMINI_AVAILABLE or not GEMINI_API_KEY):
         st.warning("⚠️ Gemini API not configured. Please set GEMINI_API_KEY in your .env file.")
         return
     
     # --- INTERNAL HELPER: Data Fetching Logic ---
     def fetch_and_process_data(user_question):
         """Fetches data and updates session state. Returns (Success_Bool, Data_Frame or Error_Msg)"""
+        truncated_note = f"Showing the first {MAX_ROWS:,} rows - ask a more specific question for the rest."
         try:
-            # Generate SQL (Assuming generate_sql_from_question uses the appropriate model internally)
-            # If you need to enforce gemini-3-pro-preview for SQL, update that function separately
-            sql = generate_sql_from_question(user_question)
-            
-            if not sql:
-                return False, "Could not translate question to SQL."
+            # Repeat questions are answered from the cache without calling Gemini
+            cached = get_ai_cache().get(user_question)
+            if cached is not None:
+                st.session_state.last_query_data = cached.data
+                st.session_state.last_query_question = user_question
+                st.session_state.last_query_sql = cached.sql
+                st.session_state.last_query_insight = cached.insight
+                st.session_state.last_query_note = truncated_note if cached.truncated else None
+                return True, cached.data
+
+            # Common questions resolve locally to a registered query - no Gemini round-trips
+            insight = None
+            truncated = False
+            resolved = resolve_question(user_question, get_entity_index())
+            if resolved is not None:
+                sql = f"-- {resolved.description}\n{QUERIES[resolved.query_id].sql.strip()}"
+                with db_connection() as conn:
+                    df = run_query(conn, resolved.query_id, resolved.params)
+                insight = summarize(resolved, df)
+            else:
+                # Generate SQL (Assuming generate_sql_from_question uses the appropriate model internally)
+                # If you need to enforce gemini-3-pro-preview for SQL, update that function separately
+                sql = generate_sql_from_question(user_question)
+                
+                if not sql:
+                    return False, "Could not translate question to SQL."
 
-            # Get data
-            conn = get_database_connection()
-            # Assuming safe_query_execution returns a dataframe
-            df = safe_query_execution(sql, conn, "Unable to fetch data")
+                # Model-written SQL runs read-only with cost, row, time and size limits
+                try:
+                    with db_connection() as conn:
+                        guarded = run_guarded(conn, sql)
+                except SqlGuardError as e:
+                    logger.error(f"Rejected generated SQL: {e}\nSQL: {sql}")
+                    return False, f"Query rejected: {e}"
+                sql, df, truncated = guarded.sql, guarded.data, guarded.truncated
             
             if df is None or df.empty:
                 return False, "No data found for this query."
@@ -3233,11 +3322,61 @@ def show_ai_dashboard():
             # Update Session State
             st.session_state.last_query_data = df
             st.session_state.last_query_question = user_question
+            st.session_state.last_query_sql = sql
+            st.session_state.last_query_insight = insight
+            st.session_state.last_query_note = truncated_note if truncated else None
+            try:
+                get_ai_cache().put(user_question, sql, df, insight, truncated=truncated)
+            except Exception as e:
+                logger.error(f"Could not cache AI result: {e}")
             return True, df
             
         except Exception as e:
             return False, str(e)
 
+    # --- INTERNAL HELPERS: Model prompts and rendering ---
+    client = get_model_client()
+
+    def insight_prompt(user_question, data):
+        data_summary = data.head(10).to_string(index=False)
+        return f"""You are an IPL analyst. Answer concisely based on this data:
+                    Question: {user_question}
+                    Data: {data_summary}
+                    Keep it conversational, mention specific numbers."""
+
+    def image_prompt(user_question, data):
+        data_ctx = prepare_data_context(data, max_rows=15)
+        return f"""Generate a professional IPL cricket infographic.
+                    Question: {user_question}
+                    Data Summary: {data_ctx}
+                    Style: High resolution 1920x1080, dark modern theme, neon accents. 
+                    Include clear data labels, team logos or cricket elements. 
+                    Make it look like a broadcast graphic."""
+
+    def image_task(user_question, data):
+        return PipelineTask('image', lambda: client.generate_image(image_prompt(user_question, data),
+                                                                   timeout=IMAGE_TIMEOUT), IMAGE_TIMEOUT)
+
+    def render_insight(slot, answer):
+        slot.markdown(f"""
+            <div style="background: linear-gradient(135deg, {theme['accent_primary']} 0%, {theme['accent_secondary']} 100%); 
+                       padding: 1.5rem; border-radius: 12px; color: white; box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
+                <div style="font-size: 1.1rem; line-height: 1.8;">{answer}</div>
+            </div>
+        """, unsafe_allow_html=True)
+
+    def render_image(slot, image_bytes, user_question):
+        watermarked = add_watermark_to_image(image_bytes, "@rkjat65")
+        save_image_to_folder(watermarked, prompt=user_question)
+        with slot.container():
+            st.image(watermarked, width="stretch", caption=f"Visual: {user_question}")
+            st.download_button(
+                "Download Image", 
+                watermarked, 
+                "ipl_viz.png", 
+                "image/png"
+            )
+
     # --- UI LAYOUT ---
 
     # Example questions
@@ -3283,6 +3422,12 @@ def show_ai_dashboard():
         get_answer_btn = st.button("🔍 Get Answer", type="primary", use_container_width=True)
     with col2:
         generate_image_btn = st.button("🎨 Generate Visualization", type="secondary", use_container_width=True)
+    include_image = st.checkbox("Also generate an infographic with the answer", value=False,
+                                help="Draws the image in parallel with the insight instead of afterwards")
+
+    cache_stats = get_ai_cache().stats()
+    st.caption(f"⚡ Answer cache: {cache_stats['entries']} saved answers, {cache_stats['hits']} hits / "
+               f"{cache_stats['misses']} misses in this worker ({cache_stats['hit_rate']:.0%} hit rate)")
 
     # --- LOGIC HANDLERS ---
 
@@ -3302,35 +3447,50 @@ def show_ai_dashboard():
                 st.markdown("### 📊 Data Results")
                 formatted_data = format_columns(data.head(20))
                 st.dataframe(formatted_data, width='stretch', hide_index=True, height=300)
+                if st.session_state.get('last_query_note'):
+                    st.caption(st.session_state.last_query_note)
+                chart_slot = st.empty()
+                st.markdown("### 💡 AI Insight")
+                insight_slot = st.empty()
+                image_slot = st.empty()
                 
-                # Step 2: Generate AI Text Insight
-                status.write("🤖 Generating AI insight...")
-                try:
-                    # Specific model for text analysis
-                    model_text = genai.GenerativeModel('gemini-3-pro-preview') 
-                    
-                    data_summary = data.head(10).to_string(index=False)
-                    prompt = f"""You are an IPL analyst. Answer concisely based on this data:
-                    Question: {question}
-                    Data: {data_summary}
-                    Keep it conversational, mention specific numbers."""
-                    
-                    response = model_text.generate_content(prompt)
-                    answer = response.text.strip()
-                    
-                    st.markdown("### 💡 AI Insight")
-                    st.markdown(f"""
-                        <div style="background: linear-gradient(135deg, {theme['accent_primary']} 0%, {theme['accent_secondary']} 100%); 
-                                   padding: 1.5rem; border-radius: 12px; color: white; box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
-                            <div style="font-size: 1.1rem; line-height: 1.8;">{answer}</div>
-                        </div>
-                    """, unsafe_allow_html=True)
-                    
+                # Step 2: Insight, chart and infographic run concurrently and render as each lands
+                tasks = [PipelineTask('chart', lambda: generate_plotly_chart(data, title=question[:80]),
+                                      TEXT_TIMEOUT, in_thread=False)]
+                cached_insight = st.session_state.get('last_query_insight')
+                if cached_insight:
+                    status.write("⚡ Using cached insight...")
+                    render_insight(insight_slot, cached_insight)
+                else:
+                    status.write("🤖 Generating AI insight...")
+                    tasks.append(PipelineTask('insight', lambda: client.generate_text(
+                        insight_prompt(question, data), timeout=TEXT_TIMEOUT), TEXT_TIMEOUT))
+                if include_image:
+                    status.write("🖌️ AI is drawing the infographic...")
+                    tasks.append(image_task(question, data))
+                
+                def on_event(event: PipelineEvent):
+                    if event.status != 'ok' or event.result is None:
+                        status.write(f"⚠️ {event.name.title()} unavailable: {event.result or 'no output'}")
+                        return
+                    if event.name == 'chart':
+                        chart_slot.plotly_chart(event.result, width='stretch')
+                    elif event.name == 'insight':
+                        render_insight(insight_slot, event.result)
+                        st.session_state.last_query_insight = event.result
+                        try:
+                            get_ai_cache().set_insight(question, event.result)
+                        except Exception as e:
+                            logger.error(f"Could not cache AI insight: {e}")
+                    elif event.name == 'image':
+                        render_image(image_slot, event.result, question)
+                    status.write(f"✅ {event.name.title()} ready ({event.elapsed_ms / 1000:.1f}s)")
+                
+                events = stream_tasks(tasks, on_event)
+                if all(event.status == 'ok' for event in events):
                     status.update(label="Analysis Complete!", state="complete", expanded=True)
-                    
-                except Exception as e:
-                    status.update(label="Analysis Failed", state="error")
-                    st.error(f"AI Text Error: {str(e)}")
+                else:
+                    status.update(label="Analysis Partially Complete", state="error", expanded=True)
             else:
                 status.update(label="Data Fetch Failed", state="error")
                 st.error(f"❌ {result}")
@@ -3363,52 +3523,20 @@ def show_ai_dashboard():
             # Step 2: Generate Image
             if data_ready:
                 status.write("🖌️ AI is drawing the chart (Gemini 3 Pro Image)...")
-                try:
-                    data_ctx = prepare_data_context(current_data, max_rows=15)
-                    
-                    ai_prompt = f"""Generate a professional IPL cricket infographic.
-                    Question: {question}
-                    Data Summary: {data_ctx}
-                    Style: High resolution 1920x1080, dark modern theme, neon accents. 
-                    Include clear data labels, team logos or cricket elements. 
-                    Make it look like a broadcast graphic."""
-                    
-                    # Specific model for Image Generation
-                    model_image = genai.GenerativeModel('gemini-3-pro-image-preview')
-                    
-                    response = model_image.generate_content(
-                        ai_prompt,
-                        generation_config=genai.GenerationConfig(temperature=0.4),
-                        request_options={'timeout': 60}
-                    )
-                    
-                    if response and hasattr(response, 'parts'):
-                        # Extract Image
-                        for part in response.parts:
-                            if hasattr(part, 'inline_data') and part.inline_data:
-                                ai_img = part.inline_data.data
-                                # Assuming add_watermark_to_image exists
-                                watermarked = add_watermark_to_image(ai_img, "@rkjat65")
-                                
-                                st.image(watermarked, width="stretch", caption=f"Visual: {question}")
-                                st.download_button(
-                                    "Download Image", 
-                                    watermarked, 
-                                    "ipl_viz.png", 
-                                    "image/png"
-                                )
-                                status.update(label="Visualization Generated!", state="complete", expanded=True)
-                                break
-                        else:
-                             status.update(label="Generation Failed", state="error")
-                             st.error("Model returned no image data.")
-                    else:
+                image_slot = st.empty()
+                
+                def on_image(event: PipelineEvent):
+                    if event.status == 'ok' and event.result:
+                        render_image(image_slot, event.result, question)
+                        status.update(label="Visualization Generated!", state="complete", expanded=True)
+                    elif event.status == 'ok':
                         status.update(label="Generation Failed", state="error")
-                        st.error("No response from Image API.")
-                        
-                except Exception as e:
-                    status.update(label="Generation Error", state="error")
-                    st.error(f"Image Gen Error: {str(e)}")
+                        st.error("Model returned no image data.")
+                    else:
+                        status.update(label="Generation Error", state="error")
+                        st.error(f"Image Gen Error: {event.result}")
+                
+                stream_tasks([image_task(question, current_data)], on_image)
 
     # SECTION 2: Portfolio Images (Keeping your existing code for static images)
     st.markdown("---")
@@ -3438,41 +3566,43 @@ def show_generated_gallery():
     """Show history of generated images"""
     st.markdown("## 🖼️ Generated Images Gallery")
     st.markdown("*Your AI-generated visualizations*")
-    
-    # Check for generated images
-    if GENERATED_IMAGES_DIR.exists():
-        images = list(GENERATED_IMAGES_DIR.glob("*.png"))
-        
-        if images:
-            st.info(f"📊 Found {len(images)} generated images")
-            
-            # Sort by modification time (newest first)
-            images = sorted(images, key=lambda x: x.stat().st_mtime, reverse=True)
-            
-            # Display in grid
-            cols = st.columns(3)
-            for idx, img_path in enumerate(images):
-                with cols[idx % 3]:
-                    st.image(str(img_path), caption=img_path.name)
-                    
-                    # Download button with unique key
-                    st.download_button(
-                        "📥 Download",
-                        open(img_path, 'rb').read(),
-                        img_path.name,
-                        "image/png",
-                        key=f"gallery_dl_{idx}_{img_path.stem}",  # Unique key
-                        width='stretch'
-                    )
-        else:
-            st.info("💡 No images generated yet. Create some from the Smart Query or Quick Insights tabs!")
-    else:
-        st.info("💡 Start generating images to build your gallery!")
-        # Create directory if it doesn't exist
-        GENERATED_IMAGES_DIR.mkdir(exist_ok=True)
 
-    
+    # Only the index and one page of thumbnails are read per rerun
+    gallery = get_gallery_index()
+    gallery.sync()
+    total = gallery.count()
+    if not total:
+        st.info("💡 No images generated yet. Create some from the AI Dashboard!")
+        return
 
+    per_page = GALLERY_PAGE_SIZE
+    pages = (total + per_page - 1) // per_page
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.info(f"📊 Found {total} generated images")
+    with col2:
+        page_number = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1,
+                                      key="gallery_page") if pages > 1 else 1
+
+    # Display in grid
+    cols = st.columns(3)
+    for idx, image in enumerate(gallery.page(page_number - 1, per_page)):
+        with cols[idx % 3]:
+            thumbnail = gallery.thumbnail(image.filename)
+            if thumbnail is None:
+                st.warning(f"Could not open {image.filename}")
+                continue
+            st.image(thumbnail, caption=image.prompt or image.filename, width='stretch')
+            size = f"{image.width}×{image.height} · " if image.width else ""
+            st.caption(f"{size}{image.size / 1024:,.0f} KB · "
+                       f"{datetime.fromtimestamp(image.mtime).strftime('%d %b %Y %H:%M')}")
+
+            # The full-size file is read only when the download is clicked
+            deferred_download_button("📥 Download", lambda name=image.filename: gallery.read(name), image.filename,
+                                     mimetypes.guess_type(image.filename)[0] or "image/png",
+                                     key=f"gallery_dl_{image.filename}")
+    if pages > 1:
+        st.caption(f"Page {page_number} of {pages}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,254 @@
+"""
+Batch export of chart images from a manifest (``scripts/export_charts.py``).
+
+A manifest lists charts as a registered query (``queries.py``) plus a small
+chart spec. ``export_charts`` runs each distinct query once on a shared
+connection, hashes the resulting data together with the spec, and only
+renders charts whose hash changed since the last run (kept in
+``.chart_state.json`` next to the images). Renders are spread over a process
+pool; each worker keeps one warm Kaleido renderer for all its charts. When a
+PNG can't be rendered (no Kaleido / Chrome) the chart is written as HTML
+instead and retried on the next run.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import pandas as pd
+
+from queries import run_query
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_DIR = Path("generated_images")
+STATE_NAME = ".chart_state.json"
+CHART_KINDS = ('bar', 'line', 'pie')
+
+
+class ChartSpec(NamedTuple):
+    name: str
+    query: str
+    params: Optional[Dict[str, Any]] = None
+    kind: str = 'bar'
+    x: Optional[str] = None
+    y: Optional[str] = None
+    title: str = ''
+    orientation: Optional[str] = None
+    color: Optional[str] = None
+    color_scale: Optional[str] = None
+    x_title: Optional[str] = None
+    y_title: Optional[str] = None
+    reverse_y: bool = False
+    width: int = 1200
+    height: int = 675
+    formats: Tuple[str, ...] = ('png',)
+
+
+class ChartResult(NamedTuple):
+    name: str
+    status: str  # 'rendered', 'html', 'skipped' or 'error'
+    outputs: List[str]
+    query_ms: float  # the chart's query (shared by charts that use the same one)
+    render_ms: float
+    detail: str = ''
+    figure_ms: float = 0.0
+
+
+class ExportReport(NamedTuple):
+    results: List[ChartResult]
+    query_ms: float
+    figure_ms: float
+    render_ms: float
+    elapsed_ms: float
+
+    def count(self, status: str) -> int:
+        return sum(1 for result in self.results if result.status == status)
+
+# ==================== MANIFEST ====================
+
+def load_manifest(path: Path) -> List[ChartSpec]:
+    """Chart specs from a JSON manifest: ``{"charts": [{"name": ..., "query": ...}, ...]}``"""
+    with open(path, encoding='utf-8') as f:
+        entries = json.load(f)['charts']
+    specs = []
+    for entry in entries:
+        unknown = set(entry) - set(ChartSpec._fields)
+        if unknown:
+            raise ValueError(f"Chart {entry.get('name')}: unknown keys {', '.join(sorted(unknown))}")
+        if 'formats' in entry:
+            entry = {**entry, 'formats': tuple(entry['formats'])}
+        spec = ChartSpec(**entry)
+        if spec.kind not in CHART_KINDS:
+            raise ValueError(f"Chart {spec.name}: kind must be one of {', '.join(CHART_KINDS)}")
+        specs.append(spec)
+    names = [spec.name for spec in specs]
+    duplicates = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise ValueError(f"Duplicate chart names: {', '.join(sorted(duplicates))}")
+    return specs
+
+
+def data_hash(spec: ChartSpec, df: pd.DataFrame) -> str:
+    """Hash of the chart spec and its data; unchanged hash means the image is current"""
+    digest = hashlib.sha256(json.dumps(spec._asdict(), sort_keys=True, default=str).encode('utf-8'))
+    digest.update('|'.join(map(str, df.columns)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+# ==================== FIGURES ====================
+
+def build_figure(spec: ChartSpec, df: pd.DataFrame):
+    """Plotly figure for a chart spec"""
+    import plotly.express as px
+
+    if spec.kind == 'pie':
+        fig = px.pie(df, names=spec.x, values=spec.y, title=spec.title)
+    elif spec.kind == 'line':
+        fig = px.line(df, x=spec.x, y=spec.y, title=spec.title, markers=True)
+    else:
+        fig = px.bar(df, x=spec.x, y=spec.y, orientation=spec.orientation, title=spec.title,
+                     color=spec.color, color_continuous_scale=spec.color_scale)
+    if spec.x_title is not None:
+        fig.update_layout(xaxis_title=spec.x_title)
+    if spec.y_title is not None:
+        fig.update_layout(yaxis_title=spec.y_title)
+    if spec.reverse_y:
+        fig.update_layout(yaxis=dict(autorange='reversed'))
+    return fig
+
+# ==================== RENDER WORKERS ====================
+
+def _start_renderer() -> bool:
+    """Process pool initializer: one persistent Kaleido browser per worker"""
+    try:
+        import kaleido
+        import plotly.io as pio
+
+        # A one-off render fails fast without Chrome; a server started without one would hang
+        pio.to_image({'data': [], 'layout': {}}, format='png', width=32, height=32)
+        if hasattr(kaleido, 'start_sync_server'):
+            kaleido.start_sync_server(silence_warnings=True)
+    except Exception as e:
+        logger.warning(f"Kaleido renderer not started: {str(e).strip().splitlines()[0] if str(e).strip() else e!r}")
+        return False
+    return True
+
+
+def render_chart(name: str, fig_json: str, formats: Tuple[str, ...], width: int, height: int,
+                 output_dir: str) -> Tuple[str, str, List[str], float, str]:
+    """Write one chart's files; returns (name, status, outputs, render_ms, detail)"""
+    import plotly.io as pio
+
+    start = time.perf_counter()
+    fig = pio.from_json(fig_json, skip_invalid=True)
+    outputs: List[str] = []
+    status, detail = 'rendered', ''
+    for fmt in formats:
+        path = Path(output_dir) / f"{name}.{fmt}"
+        try:
+            if fmt == 'html':
+                fig.write_html(str(path), include_plotlyjs='cdn')
+            else:
+                path.write_bytes(pio.to_image(fig, format=fmt, width=width, height=height))
+        except Exception as e:
+            # No Kaleido / Chrome: keep an interactive HTML version instead
+            path = path.with_suffix('.html')
+            fig.write_html(str(path), include_plotlyjs='cdn')
+            status, detail = 'html', str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+        outputs.append(str(path))
+    return name, status, outputs, (time.perf_counter() - start) * 1000, detail
+
+# ==================== EXPORT ====================
+
+def _load_state(path: Path) -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _is_current(entry: Optional[Dict[str, Any]], digest: str) -> bool:
+    # HTML fallbacks are retried so images appear once Kaleido is available
+    return (entry is not None and entry.get('hash') == digest and entry.get('status') == 'rendered'
+            and all(Path(output).exists() for output in entry.get('outputs', [])))
+
+
+def export_charts(conn: sqlite3.Connection, specs: List[ChartSpec], output_dir: Path = DEFAULT_OUTPUT_DIR,
+                  workers: int = 1, force: bool = False) -> ExportReport:
+    """Query, hash and render every chart; charts with unchanged data are skipped"""
+    start = time.perf_counter()
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    state_path = output_dir / STATE_NAME
+    state = _load_state(state_path)
+
+    # Each distinct query + params runs once, however many charts use it
+    frames: Dict[str, pd.DataFrame] = {}
+    query_ms: Dict[str, float] = {}
+    chart_query_ms: Dict[str, float] = {}
+    figure_ms: Dict[str, float] = {}
+    jobs, hashes, results = [], {}, {}
+    for spec in specs:
+        params = spec.params or {}
+        query_key = json.dumps([spec.query, params], sort_keys=True, default=str)
+        if query_key not in frames:
+            query_start = time.perf_counter()
+            frames[query_key] = run_query(conn, spec.query, params)
+            query_ms[query_key] = (time.perf_counter() - query_start) * 1000
+        chart_query_ms[spec.name] = query_ms[query_key]
+        df = frames[query_key]
+        digest = data_hash(spec, df)
+        if not force and _is_current(state.get(spec.name), digest):
+            results[spec.name] = ChartResult(spec.name, 'skipped', state[spec.name]['outputs'],
+                                             chart_query_ms[spec.name], 0.0)
+            continue
+        if df.empty:
+            results[spec.name] = ChartResult(spec.name, 'error', [], chart_query_ms[spec.name], 0.0,
+                                             'query returned no rows')
+            continue
+        hashes[spec.name] = digest
+        figure_start = time.perf_counter()
+        fig_json = build_figure(spec, df).to_json()
+        figure_ms[spec.name] = (time.perf_counter() - figure_start) * 1000
+        jobs.append((spec.name, fig_json, spec.formats, spec.width, spec.height, str(output_dir)))
+    figures_done = time.perf_counter()
+
+    def record(name, status, outputs, render_ms, detail):
+        results[name] = ChartResult(name, status, outputs, chart_query_ms[name], render_ms, detail,
+                                    figure_ms[name])
+        state[name] = {'hash': hashes[name], 'status': status, 'outputs': outputs, 'rendered_at': time.time()}
+
+    workers = max(1, min(workers, len(jobs)))
+    if workers == 1:
+        if jobs:
+            _start_renderer()
+        for job in jobs:
+            record(*render_chart(*job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_start_renderer) as pool:
+            futures = [pool.submit(render_chart, *job) for job in jobs]
+            for job, future in zip(jobs, futures):
+                try:
+                    record(*future.result())
+                except Exception as e:
+                    logger.error(f"Chart {job[0]} failed: {e}")
+                    results[job[0]] = ChartResult(job[0], 'error', [], chart_query_ms[job[0]], 0.0, str(e),
+                                                  figure_ms[job[0]])
+
+    # Atomic state write so an interrupted run never leaves a half-written file
+    tmp_path = state_path.with_name(f"{STATE_NAME}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, state_path)
+
+    end = time.perf_counter()
+    return ExportReport([results[spec.name] for spec in specs], sum(query_ms.values()), sum(figure_ms.values()),
+                        (end - figures_done) * 1000, (end - start) * 1000)
@@ -0,0 +1,234 @@
+"""
+Lazy, cached PNG/HTML export of Plotly charts for the download buttons.
+
+Rendering a PNG goes through Kaleido and takes hundreds of milliseconds per
+chart, so it must not happen while a page renders. ``ChartExporter`` renders
+only when a download is requested, on a small pool of worker threads that are
+warmed at startup. With Kaleido 1.x that means a persistent headless browser
+(``kaleido.start_sync_server``); Kaleido 0.x keeps its own subprocess alive
+after the first render. Results are content-addressed: the key is a hash of
+the figure JSON, format and size, so an identical chart - on any page, in any
+session - is rendered once. Entries are kept in memory (LRU) and on disk
+under ``data/chart_cache/``. Concurrent requests for the same chart share
+one render.
+"""
+
+import hashlib
+import os
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    import kaleido
+    KALEIDO_AVAILABLE = True
+except ImportError:
+    KALEIDO_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path("data/chart_cache")
+DEFAULT_WORKERS = 2
+PNG_WIDTH = 1200
+PNG_HEIGHT = 675
+RENDER_TIMEOUT = 30.0      # seconds a download waits for its render
+MEMORY_CACHE_ITEMS = 64
+MAX_CACHE_FILES = 2000
+
+
+def figure_key(fig_json: str, fmt: str, width: int = PNG_WIDTH, height: int = PNG_HEIGHT) -> str:
+    """Content address of one rendered chart"""
+    digest = hashlib.sha256(fig_json.encode('utf-8'))
+    digest.update(f"|{fmt}|{width}x{height}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _render_image(fig_json: str, fmt: str, width: int, height: int) -> bytes:
+    import plotly.io as pio
+
+    return pio.to_image(pio.from_json(fig_json, skip_invalid=True), format=fmt, width=width, height=height)
+
+
+def _render_html(fig_json: str) -> bytes:
+    import plotly.io as pio
+
+    return pio.to_html(pio.from_json(fig_json, skip_invalid=True), include_plotlyjs='cdn').encode('utf-8')
+
+
+class ChartExporter:
+    """Warm Kaleido worker pool with a content-addressed memory + disk cache"""
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, workers: int = DEFAULT_WORKERS,
+                 memory_items: int = MEMORY_CACHE_ITEMS, max_files: int = MAX_CACHE_FILES):
+        self.cache_dir = Path(cache_dir)
+        self.workers = max(1, workers)
+        self.memory_items = memory_items
+        self.max_files = max_files
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='chart-export')
+        self._memory: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._warm: Optional[Future] = None
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._renders = 0
+        self._errors = 0
+        self._render_ms = 0.0
+
+    # ==================== WORKER POOL ====================
+
+    def warm(self) -> Future:
+        """Start the Kaleido renderers in the background (idempotent)"""
+        with self._lock:
+            if self._warm is None:
+                self._warm = self._executor.submit(self._start_renderers)
+            return self._warm
+
+    def png_state(self) -> str:
+        """'ready' once the renderers started, 'starting' while they warm up, else 'unavailable'"""
+        warm = self.warm()
+        if not warm.done():
+            return 'starting'
+        return 'ready' if warm.result() else 'unavailable'
+
+    def _start_renderers(self) -> bool:
+        if not KALEIDO_AVAILABLE:
+            return False
+        try:
+            # First render fails fast without a browser and loads plotly.js into Kaleido 0.x
+            _render_image('{"data": [], "layout": {}}', 'png', 32, 32)
+            if hasattr(kaleido, 'start_sync_server'):
+                # Kaleido 1.x: keep one browser alive instead of launching one per image
+                kaleido.start_sync_server(n=self.workers, silence_warnings=True)
+            return True
+        except Exception as e:
+            logger.warning(f"Could not start Kaleido renderers: {e}")
+            return False
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if KALEIDO_AVAILABLE and hasattr(kaleido, 'stop_sync_server'):
+            try:
+                kaleido.stop_sync_server(silence_warnings=True)
+            except Exception as e:
+                logger.warning(f"Could not stop Kaleido renderers: {e}")
+
+    # ==================== CACHE ====================
+
+    def _path(self, key: str, fmt: str) -> Path:
+        return self.cache_dir / f"{key}.{fmt}"
+
+    def _remember(self, key: str, payload: bytes) -> None:
+        with self._lock:
+            self._memory[key] = payload
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, key: str, fmt: str) -> Optional[bytes]:
+        with self._lock:
+            payload = self._memory.get(key)
+            if payload is not None:
+                self._memory.move_to_end(key)
+                self._memory_hits += 1
+                return payload
+        path = self._path(key, fmt)
+        try:
+            payload = path.read_bytes()
+        except OSError:
+            return None
+        self._remember(key, payload)
+        with self._lock:
+            self._disk_hits += 1
+        return payload
+
+    def _store(self, key: str, fmt: str, payload: bytes) -> None:
+        self._remember(key, payload)
+        path = self._path(key, fmt)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_bytes(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write chart cache file {path}: {e}")
+            return
+        if self._renders % 100 == 0:
+            self.prune()
+
+    def prune(self) -> int:
+        """Delete the oldest cache files beyond ``max_files``"""
+        files = sorted(self.cache_dir.glob('*.*'), key=lambda p: p.stat().st_mtime)
+        excess = files[:max(0, len(files) - self.max_files)]
+        for path in excess:
+            path.unlink(missing_ok=True)
+        return len(excess)
+
+    # ==================== RENDERING ====================
+
+    def _render(self, key: str, fmt: str, render) -> bytes:
+        start = time.perf_counter()
+        try:
+            payload = render()
+        except Exception:
+            with self._lock:
+                self._errors += 1
+            raise
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._renders += 1
+            self._render_ms += elapsed_ms
+        self._store(key, fmt, payload)
+        return payload
+
+    def _get(self, key: str, fmt: str, render, timeout: float) -> bytes:
+        payload = self._lookup(key, fmt)
+        if payload is not None:
+            return payload
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._executor.submit(self._render, key, fmt, render)
+                self._inflight[key] = future
+                future.add_done_callback(lambda _, key=key: self._forget(key))
+        return future.result(timeout)
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def image(self, fig_json: str, fmt: str = 'png', width: int = PNG_WIDTH, height: int = PNG_HEIGHT,
+              timeout: float = RENDER_TIMEOUT) -> bytes:
+        """Rendered image bytes; raises if Kaleido is missing or the render fails"""
+        key = figure_key(fig_json, fmt, width, height)
+        return self._get(key, fmt, lambda: _render_image(fig_json, fmt, width, height), timeout)
+
+    def png(self, fig_json: str, width: int = PNG_WIDTH, height: int = PNG_HEIGHT) -> Optional[bytes]:
+        """PNG bytes, or None when the chart can't be rendered"""
+        try:
+            return self.image(fig_json, 'png', width, height)
+        except Exception as e:
+            logger.warning(f"Could not export chart: {e}")
+            return None
+
+    def html(self, fig_json: str) -> bytes:
+        """Standalone HTML page for the chart (plotly.js from the CDN)"""
+        key = figure_key(fig_json, 'html', 0, 0)
+        return self._get(key, 'html', lambda: _render_html(fig_json), RENDER_TIMEOUT)
+
+    def stats(self) -> Dict[str, Any]:
+        """Render and cache-hit counters for this process"""
+        with self._lock:
+            return {
+                'renders': self._renders,
+                'memory_hits': self._memory_hits,
+                'disk_hits': self._disk_hits,
+                'errors': self._errors,
+                'avg_render_ms': round(self._render_ms / self._renders, 1) if self._renders else 0.0,
+                'warm': bool(self._warm and self._warm.done() and self._warm.result()),
+            }
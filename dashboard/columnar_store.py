@@ -0,0 +1,293 @@
+"""
+Columnar in-memory copy of the deliveries table.
+
+The whole ``deliveries`` table is loaded once, sorted in match order, into
+NumPy arrays (categorical codes for players and teams, int8 runs, bool
+flags). Aggregations are then plain ``np.bincount`` / ``np.add.reduceat``
+passes over those arrays instead of repeated SQLite scans, and one store
+instance is shared by every Streamlit session in the process.
+"""
+
+import sqlite3
+import logging
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from aggregates import NON_BOWLER_DISMISSALS
+from parquet_store import DEFAULT_EXPORT_DIR, read_frame
+
+logger = logging.getLogger(__name__)
+
+# Over ranges (1-based) for each phase of a T20 innings
+PHASES = ('powerplay', 'middle', 'death')
+POWERPLAY_LAST_OVER = 6
+MIDDLE_LAST_OVER = 15
+
+# Keys that can be grouped/filtered on, mapped to the category table they decode with
+CATEGORICAL_KEYS = {
+    'batter': 'players',
+    'bowler': 'players',
+    'batting_team': 'teams',
+    'bowling_team': 'teams',
+    'player_out': 'players',
+    'wicket_kind': 'wicket_kinds',
+}
+
+DELIVERIES_COLUMNS = [
+    'match_id', 'innings', 'over_number', 'ball_number', 'batter', 'bowler',
+    'batter_runs', 'total_runs', 'wide_ball_runs', 'no_ball_runs',
+    'is_wide_ball', 'is_no_ball', 'is_wicket', 'player_out', 'wicket_kind',
+]
+MATCHES_COLUMNS = ['match_id', 'season', 'team1_name', 'team2_name', 'toss_winner_name', 'toss_decision']
+
+DELIVERIES_QUERY = f"""
+    SELECT {', '.join(DELIVERIES_COLUMNS)}
+    FROM deliveries
+    ORDER BY match_id, innings, over_number, ball_number
+"""
+
+MATCHES_QUERY = f"SELECT {', '.join(MATCHES_COLUMNS)} FROM matches"
+
+# A metric spec is ('sum', column), ('count',), ('nunique', column), ('max', column)
+# or ('ratio', numerator_column, denominator_column, scale)
+MetricSpec = Tuple
+
+
+def over_phase(over_number: np.ndarray) -> np.ndarray:
+    """Phase code (index into PHASES) for 1-based over numbers"""
+    return np.where(over_number <= POWERPLAY_LAST_OVER, 0,
+                    np.where(over_number <= MIDDLE_LAST_OVER, 1, 2)).astype(np.int8)
+
+
+def batting_first_team(matches: pd.DataFrame) -> pd.Series:
+    """Team that batted in the first innings, derived from the toss"""
+    toss_winner_bats = matches['toss_decision'].eq('bat')
+    other_team = matches['team2_name'].where(matches['toss_winner_name'] == matches['team1_name'],
+                                             matches['team1_name'])
+    first = matches['toss_winner_name'].where(toss_winner_bats, other_team)
+    # No toss recorded: fall back to listing order
+    return first.where(matches['toss_winner_name'].notna(), matches['team1_name'])
+
+
+class DeliveriesStore:
+    """Process-wide columnar deliveries store with a small group-by API"""
+
+    def __init__(self, columns: Dict[str, np.ndarray], categories: Dict[str, np.ndarray]):
+        self.columns = columns
+        self.categories = categories
+        self._lookup = {
+            name: {label: code for code, label in enumerate(labels)}
+            for name, labels in categories.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.columns['match_id'])
+
+    # ==================== LOADING ====================
+
+    @classmethod
+    def from_frames(cls, deliveries: pd.DataFrame, matches: pd.DataFrame) -> 'DeliveriesStore':
+        """Build the store from deliveries (in match order) and matches frames"""
+        matches = matches.set_index('match_id')
+        first = batting_first_team(matches)
+        second = matches['team2_name'].where(first == matches['team1_name'], matches['team1_name'])
+
+        match_ids = deliveries['match_id'].to_numpy(np.int64)
+        innings = deliveries['innings'].to_numpy(np.int8)
+        # Innings 1/3 are batted by the side batting first, 2/4 (super overs aside) by the chasers
+        first_bats = (innings % 2) == 1
+        first_team = first.reindex(match_ids).to_numpy(object)
+        second_team = second.reindex(match_ids).to_numpy(object)
+        batting_team = np.where(first_bats, first_team, second_team)
+        bowling_team = np.where(first_bats, second_team, first_team)
+
+        # player_out is usually the batter, but a non-striker can be run out before facing a ball
+        players = pd.Categorical(pd.concat([deliveries['batter'], deliveries['bowler'], deliveries['player_out']],
+                                           ignore_index=True))
+        wicket_kinds = pd.Categorical(deliveries['wicket_kind'])
+        teams = pd.Categorical(np.concatenate([batting_team, bowling_team]))
+        n = len(deliveries)
+
+        wide = deliveries['is_wide_ball'].to_numpy().astype(bool)
+        no_ball = deliveries['is_no_ball'].to_numpy().astype(bool)
+        wicket = deliveries['is_wicket'].to_numpy().astype(bool)
+        batter_runs = deliveries['batter_runs'].to_numpy(np.int8)
+        total_runs = deliveries['total_runs'].to_numpy(np.int8)
+        over_number = deliveries['over_number'].to_numpy(np.int8)
+        legal = ~wide & ~no_ball
+
+        columns = {
+            'match_id': match_ids,
+            'innings': innings,
+            'over_number': over_number,
+            'phase': over_phase(over_number),
+            'season': matches['season'].reindex(match_ids).to_numpy(np.int16),
+            'batter': players.codes[:n].astype(np.int32),
+            'bowler': players.codes[n:2 * n].astype(np.int32),
+            'player_out': players.codes[2 * n:].astype(np.int32),
+            'wicket_kind': wicket_kinds.codes.astype(np.int16),
+            'batting_team': teams.codes[:n].astype(np.int16),
+            'bowling_team': teams.codes[n:].astype(np.int16),
+            'batter_runs': batter_runs,
+            'total_runs': total_runs,
+            'runs_conceded': (batter_runs + deliveries['wide_ball_runs'].to_numpy(np.int8)
+                              + deliveries['no_ball_runs'].to_numpy(np.int8)).astype(np.int8),
+            'is_wide_ball': wide,
+            'is_no_ball': no_ball,
+            'is_wicket': wicket,
+            'bowler_wicket': wicket & ~deliveries['wicket_kind'].isin(NON_BOWLER_DISMISSALS).to_numpy(),
+            'legal_ball': legal,
+            'faced_ball': ~wide,
+            'is_four': batter_runs == 4,
+            'is_six': batter_runs == 6,
+            'is_dot': legal & (total_runs == 0),
+        }
+        categories = {
+            'players': np.asarray(players.categories, dtype=object),
+            'teams': np.asarray(teams.categories, dtype=object),
+            'wicket_kinds': np.asarray(wicket_kinds.categories, dtype=object),
+            'phase': np.asarray(PHASES, dtype=object),
+        }
+        return cls(columns, categories)
+
+    @classmethod
+    def from_connection(cls, conn: sqlite3.Connection) -> 'DeliveriesStore':
+        """Load deliveries and match metadata from SQLite in one pass"""
+        deliveries = pd.read_sql_query(DELIVERIES_QUERY, conn)
+        matches = pd.read_sql_query(MATCHES_QUERY, conn)
+        store = cls.from_frames(deliveries, matches)
+        logger.info(f"Loaded columnar deliveries store: {len(store):,} balls, "
+                    f"{len(store.categories['players']):,} players")
+        return store
+
+    @classmethod
+    def from_export(cls, export_dir: Path = DEFAULT_EXPORT_DIR) -> 'DeliveriesStore':
+        """Load from memory-mapped Parquet/Arrow files written by scripts/export_parquet.py"""
+        # Exports keep each match's balls contiguous and in order, which innings_totals relies on
+        deliveries = read_frame('deliveries', export_dir, columns=DELIVERIES_COLUMNS)
+        matches = read_frame('matches', export_dir, columns=MATCHES_COLUMNS)
+        store = cls.from_frames(deliveries, matches)
+        logger.info(f"Loaded columnar deliveries store from {export_dir}: {len(store):,} balls")
+        return store
+
+    # ==================== FILTERS ====================
+
+    def code(self, key: str, value) -> int:
+        """Categorical code for a player/team name (-1 if unknown)"""
+        return self._lookup[CATEGORICAL_KEYS[key]].get(value, -1)
+
+    def decode(self, key: str, codes: np.ndarray) -> np.ndarray:
+        """Names for categorical codes (None where the code is missing)"""
+        labels = self.categories[CATEGORICAL_KEYS[key]]
+        return np.where(codes >= 0, labels[np.maximum(codes, 0)] if len(labels) else None, None)
+
+    def _key_values(self, key: str, value) -> np.ndarray:
+        """Encode filter value(s) for a key into the stored representation"""
+        values = value if isinstance(value, (list, tuple, set, np.ndarray)) else [value]
+        if key in CATEGORICAL_KEYS:
+            # Unknown names match nothing (-1 is also the code for a missing value)
+            codes = [self.code(key, v) for v in values]
+            return np.array([code for code in codes if code >= 0], dtype=np.int64)
+        if key == 'phase':
+            return np.array([PHASES.index(v) for v in values])
+        return np.asarray(list(values))
+
+    def mask(self, team: Optional[str] = None, **filters) -> np.ndarray:
+        """Boolean row mask; ``team`` matches either the batting or bowling side"""
+        result = np.ones(len(self), dtype=bool)
+        if team is not None:
+            code = self.code('batting_team', team)
+            if code < 0:
+                return np.zeros(len(self), dtype=bool)
+            result &= (self.columns['batting_team'] == code) | (self.columns['bowling_team'] == code)
+        for key, value in filters.items():
+            if value is None:
+                continue
+            result &= np.isin(self.columns[key], self._key_values(key, value))
+        return result
+
+    # ==================== AGGREGATION ====================
+
+    def _group_codes(self, key: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Dense non-negative group codes and their labels for a key"""
+        values = self.columns[key]
+        if key in CATEGORICAL_KEYS:
+            return values.astype(np.int64), self.categories[CATEGORICAL_KEYS[key]]
+        if key == 'phase':
+            return values.astype(np.int64), self.categories['phase']
+        labels, codes = np.unique(values, return_inverse=True)
+        return codes.astype(np.int64), labels
+
+    def aggregate(self, by: Sequence[str], metrics: Dict[str, MetricSpec],
+                  mask: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Group rows by ``by`` keys and compute sum/count/nunique/max/ratio metrics"""
+        rows = np.ones(len(self), dtype=bool) if mask is None else mask.copy()
+        combined = np.zeros(len(self), dtype=np.int64)
+        shape = []
+        labels = []
+        for key in by:
+            codes, key_labels = self._group_codes(key)
+            rows &= codes >= 0  # drop rows with a missing player/team
+            combined = combined * len(key_labels) + np.maximum(codes, 0)
+            shape.append(len(key_labels))
+            labels.append(key_labels)
+
+        groups, inverse = np.unique(combined[rows], return_inverse=True)
+        n_groups = len(groups)
+        result = {}
+        if by:
+            for key, key_labels, positions in zip(by, labels, np.unravel_index(groups, shape)):
+                result[key] = key_labels[positions]
+
+        for name, spec in metrics.items():
+            op = spec[0]
+            if op == 'sum':
+                values = self.columns[spec[1]][rows]
+                total = np.bincount(inverse, weights=values, minlength=n_groups)
+                result[name] = total if values.dtype.kind == 'f' else np.rint(total).astype(np.int64)
+            elif op == 'count':
+                result[name] = np.bincount(inverse, minlength=n_groups)
+            elif op == 'nunique':
+                pairs = np.unique(np.stack([inverse, self.columns[spec[1]][rows].astype(np.int64)]), axis=1)
+                result[name] = np.bincount(pairs[0], minlength=n_groups)
+            elif op == 'max':
+                out = np.full(n_groups, np.iinfo(np.int64).min)
+                np.maximum.at(out, inverse, self.columns[spec[1]][rows].astype(np.int64))
+                result[name] = out
+            elif op == 'ratio':
+                num = np.bincount(inverse, weights=self.columns[spec[1]][rows], minlength=n_groups)
+                den = np.bincount(inverse, weights=self.columns[spec[2]][rows], minlength=n_groups)
+                scale = spec[3] if len(spec) > 3 else 1.0
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    result[name] = np.where(den > 0, num * scale / den, np.nan)
+            else:
+                raise ValueError(f"Unknown metric op: {op}")
+
+        frame = pd.DataFrame(result)
+        if not by and frame.empty:
+            # A global aggregate over zero rows still has one (all-zero) group
+            frame = pd.DataFrame({name: [0] for name in metrics})
+        return frame
+
+    def innings_totals(self, mask: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Per match-innings totals via np.add.reduceat over contiguous (sorted) innings blocks"""
+        rows = np.ones(len(self), dtype=bool) if mask is None else mask
+        match_ids = self.columns['match_id'][rows]
+        innings = self.columns['innings'][rows]
+        if len(match_ids) == 0:
+            return pd.DataFrame(columns=['match_id', 'innings', 'season', 'batting_team', 'bowling_team',
+                                         'runs', 'legal_balls', 'wickets'])
+        boundaries = np.flatnonzero(np.r_[True, (np.diff(match_ids) != 0) | (np.diff(innings) != 0)])
+        return pd.DataFrame({
+            'match_id': match_ids[boundaries],
+            'innings': innings[boundaries],
+            'season': self.columns['season'][rows][boundaries],
+            'batting_team': self.decode('batting_team', self.columns['batting_team'][rows][boundaries]),
+            'bowling_team': self.decode('bowling_team', self.columns['bowling_team'][rows][boundaries]),
+            'runs': np.add.reduceat(self.columns['total_runs'][rows].astype(np.int64), boundaries),
+            'legal_balls': np.add.reduceat(self.columns['legal_ball'][rows].astype(np.int64), boundaries),
+            'wickets': np.add.reduceat(self.columns['is_wicket'][rows].astype(np.int64), boundaries),
+        })
@@ -0,0 +1,369 @@
+"""
+Incremental ingestion of Cricsheet ball-by-ball match files.
+
+Sources (match files, directories or the ``*_json.zip`` / ``*_yaml.zip``
+archives from cricsheet.org) are streamed one file at a time through a
+generator pipeline: read -> hash -> skip unchanged -> parse -> write. Only
+new or changed matches (by SHA-256 of the file, tracked in
+``ingested_files``) are written; each one replaces its ``matches`` row and
+``deliveries`` with ``executemany``, and the player aggregates are refreshed
+for just those matches. The whole batch is a single transaction.
+
+For archive backfills ``ingest(..., workers=N)`` shards the changed files in
+chunks across a process pool. Workers parse and return compact columnar
+batches (one tuple per deliveries column); the calling process stays the
+single SQLite writer.
+
+JSON files need only the standard library; the older YAML format needs
+PyYAML.
+"""
+
+import hashlib
+import io
+import json
+import sqlite3
+import logging
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from aggregates import refresh_player_innings
+from db_schema import bump_data_version
+from season_engine import LEAGUE_STAGE, refresh_season_tables
+
+try:
+    import yaml
+    _YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    YAML_AVAILABLE = True
+except ImportError:
+    YAML_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+MATCH_FILE_SUFFIXES = ('.json', '.yaml', '.yml')
+
+# Only these info keys are shipped back from the parse workers ('target' is copied from the innings)
+MATCH_INFO_KEYS = ('dates', 'venue', 'city', 'teams', 'toss', 'outcome', 'player_of_match', 'event', 'target')
+CHUNK_SIZE = 32  # match files per worker task
+
+MATCH_COLUMNS = (
+    'match_id', 'season', 'match_date', 'venue', 'city',
+    'team1_id', 'team2_id', 'team1_name', 'team2_name',
+    'toss_winner_id', 'toss_winner_name', 'toss_decision',
+    'match_winner_id', 'match_winner_name', 'win_by_runs', 'win_by_wickets',
+    'player_of_match', 'result', 'target_runs', 'target_overs', 'method', 'stage',
+)
+
+DELIVERY_COLUMNS = (
+    'match_id', 'innings', 'over_number', 'ball_number', 'batter', 'non_striker', 'bowler',
+    'batter_runs', 'extras', 'total_runs', 'wide_ball_runs', 'no_ball_runs',
+    'is_wide_ball', 'is_no_ball', 'is_wicket', 'player_out', 'wicket_kind',
+)
+
+MATCH_UPSERT = (f"INSERT OR REPLACE INTO matches ({', '.join(MATCH_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in MATCH_COLUMNS)})")
+DELIVERY_INSERT = (f"INSERT INTO deliveries ({', '.join(DELIVERY_COLUMNS)}) "
+                   f"VALUES ({', '.join('?' for _ in DELIVERY_COLUMNS)})")
+
+
+class SourceFile(NamedTuple):
+    name: str
+    match_id: int
+    payload: bytes
+
+    @property
+    def file_hash(self) -> str:
+        return hashlib.sha256(self.payload).hexdigest()
+
+
+class ParsedMatch(NamedTuple):
+    match_id: int
+    info: Dict[str, Any]
+    innings: List[Dict[str, Any]]
+
+
+class PreparedMatch(NamedTuple):
+    """A parsed match ready to write, as returned by the parse workers"""
+    name: str
+    file_hash: str
+    match: ParsedMatch  # info only; the deliveries are in ``columns``
+    columns: Tuple[tuple, ...]  # one tuple per DELIVERY_COLUMNS entry
+
+    @property
+    def delivery_count(self) -> int:
+        return len(self.columns[0]) if self.columns else 0
+
+
+class IngestReport(NamedTuple):
+    files_seen: int
+    unchanged: int
+    ingested: List[int]
+    deliveries: int
+    failed: List[Tuple[str, str]]
+
+# ==================== SOURCES ====================
+
+def _match_id(name: str) -> Optional[int]:
+    """Cricsheet names each file after its match id (e.g. 1359475.json)"""
+    stem = Path(name).stem
+    return int(stem) if stem.isdigit() else None
+
+
+def iter_sources(paths: Iterable[Path]) -> Iterator[SourceFile]:
+    """Yield match files from files, directories and zip archives one at a time"""
+    for path in map(Path, paths):
+        if path.is_dir():
+            yield from iter_sources(sorted(p for p in path.iterdir() if p.suffix in MATCH_FILE_SUFFIXES + ('.zip',)))
+        elif path.suffix == '.zip':
+            with zipfile.ZipFile(path) as archive:
+                for member in sorted(archive.namelist()):
+                    match_id = _match_id(member)
+                    if Path(member).suffix in MATCH_FILE_SUFFIXES and match_id is not None:
+                        yield SourceFile(f"{path.name}:{member}", match_id, archive.read(member))
+        elif path.suffix in MATCH_FILE_SUFFIXES and _match_id(path.name) is not None:
+            yield SourceFile(str(path), _match_id(path.name), path.read_bytes())
+
+# ==================== PARSING ====================
+
+def parse_match(source: SourceFile) -> ParsedMatch:
+    """Parse a Cricsheet JSON (or legacy YAML) match file into a normalized form"""
+    if source.name.endswith('.json'):
+        data = json.loads(source.payload)
+        innings = [
+            {
+                'team': inning.get('team'),
+                'target': inning.get('target'),
+                'deliveries': [
+                    (over['over'] + 1, ball, delivery)
+                    for over in inning.get('overs', [])
+                    for ball, delivery in enumerate(over.get('deliveries', []), start=1)
+                ],
+            }
+            for inning in data.get('innings', [])
+        ]
+    else:
+        if not YAML_AVAILABLE:
+            raise ImportError("PyYAML is required for Cricsheet YAML files: pip install pyyaml")
+        data = yaml.load(io.BytesIO(source.payload), Loader=_YamlLoader)
+        innings = []
+        for entry in data.get('innings', []):
+            (inning,) = entry.values()  # {'1st innings': {...}}
+            deliveries, ball, last_over = [], 0, None
+            for item in inning.get('deliveries', []):
+                ((key, delivery),) = item.items()  # {0.1: {...}}
+                over = int(str(key).split('.')[0]) + 1
+                ball = ball + 1 if over == last_over else 1
+                last_over = over
+                deliveries.append((over, ball, delivery))
+            innings.append({'team': inning.get('team'), 'deliveries': deliveries})
+    return ParsedMatch(source.match_id, data.get('info', {}), innings)
+
+
+def match_row(match: ParsedMatch, team_ids: Dict[str, int]) -> tuple:
+    """Row for the matches table"""
+    info = match.info
+    teams = list(info.get('teams', [])) + [None, None]
+    toss = info.get('toss', {})
+    outcome = info.get('outcome', {})
+    by = outcome.get('by', {})
+    # Ties decided by a super over / bowl-out name the winner as the eliminator
+    winner = outcome.get('winner') or outcome.get('eliminator')
+    match_date = str(info.get('dates', [''])[0])
+    player_of_match = info.get('player_of_match') or [None]
+    # Chase target (JSON only); differs from first-innings runs + 1 when revised by DLS
+    target = info.get('target') or {}
+    # Playoffs name their stage; league matches only carry a match number
+    event = info.get('event') or {}
+
+    row = {
+        'match_id': match.match_id,
+        # Cricsheet labels split seasons "2007/08"; the IPL season is the year the match was played
+        'season': int(match_date[:4]) if match_date else None,
+        'match_date': match_date,
+        'venue': info.get('venue'),
+        'city': info.get('city'),
+        'team1_id': team_ids.get(teams[0]),
+        'team2_id': team_ids.get(teams[1]),
+        'team1_name': teams[0],
+        'team2_name': teams[1],
+        'toss_winner_id': team_ids.get(toss.get('winner')),
+        'toss_winner_name': toss.get('winner'),
+        'toss_decision': toss.get('decision'),
+        'match_winner_id': team_ids.get(winner),
+        'match_winner_name': winner,
+        'win_by_runs': by.get('runs', 0),
+        'win_by_wickets': by.get('wickets', 0),
+        'player_of_match': player_of_match[0],
+        'result': outcome.get('result', 'normal'),
+        'target_runs': target.get('runs'),
+        'target_overs': target.get('overs'),
+        'method': outcome.get('method'),
+        'stage': event.get('stage') or (LEAGUE_STAGE if event else None),
+    }
+    return tuple(row[column] for column in MATCH_COLUMNS)
+
+
+def delivery_rows(match: ParsedMatch) -> Iterator[tuple]:
+    """Rows for the deliveries table (innings 3+ are super overs)"""
+    for innings_number, inning in enumerate(match.innings, start=1):
+        for over, ball, delivery in inning['deliveries']:
+            runs = delivery.get('runs', {})
+            extras = delivery.get('extras', {})
+            # JSON has a 'wickets' list, YAML a single 'wicket'
+            wickets = delivery.get('wickets') or ([delivery['wicket']] if 'wicket' in delivery else [])
+            wicket = wickets[0] if wickets else {}
+            wides = extras.get('wides', 0)
+            no_balls = extras.get('noballs', 0)
+            yield (
+                match.match_id, innings_number, over, ball,
+                delivery.get('batter', delivery.get('batsman')),
+                delivery.get('non_striker'),
+                delivery.get('bowler'),
+                runs.get('batter', runs.get('batsman', 0)),
+                runs.get('extras', 0),
+                runs.get('total', 0),
+                wides, no_balls,
+                int(wides > 0), int(no_balls > 0), int(bool(wickets)),
+                wicket.get('player_out'), wicket.get('kind'),
+            )
+
+def prepare_match(source: SourceFile) -> PreparedMatch:
+    """Parse a match file into its info and columnar deliveries"""
+    match = parse_match(source)
+    rows = list(delivery_rows(match))
+    targets = [inning['target'] for inning in match.innings if inning.get('target')]
+    info = dict(match.info, target=targets[0]) if targets else match.info
+    info = {key: info[key] for key in MATCH_INFO_KEYS if key in info}
+    return PreparedMatch(
+        source.name, source.file_hash, ParsedMatch(match.match_id, info, []),
+        tuple(zip(*rows)) if rows else (),
+    )
+
+
+def prepare_chunk(sources: List[SourceFile]) -> Tuple[List[PreparedMatch], List[Tuple[str, str]]]:
+    """Parse a chunk of match files (runs in a worker process)"""
+    prepared, failed = [], []
+    for source in sources:
+        try:
+            prepared.append(prepare_match(source))
+        except Exception as e:
+            failed.append((source.name, str(e)))
+    return prepared, failed
+
+
+def _chunks(sources: Iterable[SourceFile], size: int) -> Iterator[List[SourceFile]]:
+    chunk: List[SourceFile] = []
+    for source in sources:
+        chunk.append(source)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _prepared_chunks(sources: Iterable[SourceFile], workers: int,
+                     chunk_size: int) -> Iterator[Tuple[List[PreparedMatch], List[Tuple[str, str]]]]:
+    """Parse chunks in-process, or across ``workers`` processes in source order"""
+    chunks = _chunks(sources, chunk_size)
+    if workers <= 1:
+        yield from map(prepare_chunk, chunks)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Keep a bounded number of chunks in flight so payloads aren't all read up front
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(pool.submit(prepare_chunk, chunk))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+# ==================== WRITING ====================
+
+def _team_ids(conn: sqlite3.Connection, names: Iterable[Optional[str]], cache: Dict[str, int]) -> Dict[str, int]:
+    """team_id for each name, inserting teams seen for the first time"""
+    for name in names:
+        if name is None or name in cache:
+            continue
+        row = conn.execute("SELECT team_id FROM teams WHERE team_name = ?", (name,)).fetchone()
+        if row is None:
+            row = (conn.execute("INSERT INTO teams (team_name) VALUES (?)", (name,)).lastrowid,)
+            logger.info(f"Added new team: {name}")
+        cache[name] = row[0]
+    return cache
+
+
+def _known_hashes(conn: sqlite3.Connection) -> Dict[int, str]:
+    return dict(conn.execute("SELECT match_id, file_hash FROM ingested_files").fetchall())
+
+
+def _write_match(conn: sqlite3.Connection, prepared: PreparedMatch, team_cache: Dict[str, int],
+                 now: str) -> Optional[int]:
+    """Replace one match's row and deliveries and record its file hash; returns the match season"""
+    match = prepared.match
+    info = match.info
+    _team_ids(conn, list(info.get('teams', [])) + [info.get('toss', {}).get('winner'),
+                                                 info.get('outcome', {}).get('winner'),
+                                                 info.get('outcome', {}).get('eliminator')], team_cache)
+    conn.execute("DELETE FROM deliveries WHERE match_id = ?", (match.match_id,))
+    row = match_row(match, team_cache)
+    conn.execute(MATCH_UPSERT, row)
+    conn.executemany(DELIVERY_INSERT, zip(*prepared.columns))
+    conn.execute(
+        "INSERT OR REPLACE INTO ingested_files (match_id, source, file_hash, ingested_at) VALUES (?, ?, ?, ?)",
+        (match.match_id, prepared.name, prepared.file_hash, now)
+    )
+    return row[MATCH_COLUMNS.index('season')]
+
+
+def ingest(conn: sqlite3.Connection, sources: Iterable[SourceFile], force: bool = False,
+           workers: int = 1, chunk_size: int = CHUNK_SIZE) -> IngestReport:
+    """Write new/changed matches and refresh their aggregates in one transaction"""
+    known = {} if force else _known_hashes(conn)
+    team_cache: Dict[str, int] = {}
+    counts = {'seen': 0, 'unchanged': 0}
+    deliveries = 0
+    ingested: List[int] = []
+    seasons = set()
+    failed: List[Tuple[str, str]] = []
+    now = datetime.now().isoformat(timespec='seconds')
+
+    def changed_sources() -> Iterator[SourceFile]:
+        for source in sources:
+            counts['seen'] += 1
+            file_hash = source.file_hash
+            if known.get(source.match_id) == file_hash:
+                counts['unchanged'] += 1
+            else:
+                # The same file listed twice (e.g. a directory and its zip) is only parsed once
+                known[source.match_id] = file_hash
+                yield source
+
+    conn.execute("BEGIN")
+    try:
+        for prepared_matches, chunk_failures in _prepared_chunks(changed_sources(), workers, chunk_size):
+            for name, error in chunk_failures:
+                logger.error(f"Could not parse {name}: {error}")
+            failed.extend(chunk_failures)
+            for prepared in prepared_matches:
+                seasons.add(_write_match(conn, prepared, team_cache, now))
+                deliveries += prepared.delivery_count
+                ingested.append(prepared.match.match_id)
+
+        refresh_player_innings(conn, ingested)
+        # Points, standings and playoff results are per season, so whole seasons are recomputed
+        refresh_season_tables(conn, seasons)
+        if ingested:
+            bump_data_version(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    logger.info(f"Ingested {len(ingested)} matches ({deliveries:,} deliveries), {counts['unchanged']} unchanged")
+    return IngestReport(counts['seen'], counts['unchanged'], ingested, deliveries, failed)
@@ -0,0 +1,150 @@
+"""
+Small pool of read-only SQLite connections for the dashboard.
+
+Streamlit serves every session from its own thread; sharing one connection
+serializes them and lets cursors interleave. Each request instead checks a
+connection out of the pool (``with pool.connection() as conn:``). Connections
+are opened ``mode=ro`` with ``query_only`` and tuned cache/mmap sizes, and
+rely on the database being in WAL mode (set by the migrations) so readers
+never block on a writer. Checkout wait times and saturation are tracked.
+"""
+
+import queue
+import sqlite3
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_CHECKOUT_TIMEOUT = 10.0   # seconds
+DEFAULT_CACHE_SIZE_KIB = 32768    # page cache per connection
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+
+
+class PoolTimeout(Exception):
+    """No connection became free within the checkout timeout"""
+
+
+class ConnectionPool:
+    """Fixed-size pool of read-only connections, opened lazily"""
+
+    def __init__(self, db_path: Path, size: int = DEFAULT_POOL_SIZE,
+                 timeout: float = DEFAULT_CHECKOUT_TIMEOUT, cached_statements: int = 128,
+                 cache_size_kib: int = DEFAULT_CACHE_SIZE_KIB, mmap_size: int = DEFAULT_MMAP_SIZE):
+        self.db_path = Path(db_path)
+        self.size = size
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.cache_size_kib = cache_size_kib
+        self.mmap_size = mmap_size
+
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._peak_in_use = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._total_wait_ms = 0.0
+        self._max_wait_ms = 0.0
+
+    def _open(self) -> sqlite3.Connection:
+        """Open one read-only connection with the tuned pragmas"""
+        conn = sqlite3.connect(f"file:{self.db_path.resolve()}?mode=ro", uri=True,
+                               check_same_thread=False, cached_statements=self.cached_statements)
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kib)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        with self._lock:
+            # Don't jump the queue while other threads are already waiting
+            if not self._waiting:
+                try:
+                    return self._idle.get_nowait()
+                except queue.Empty:
+                    pass
+            can_open = self._opened < self.size
+            if can_open:
+                self._opened += 1
+            else:
+                self._waiting += 1
+        if can_open:
+            try:
+                return self._open()
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+
+        # Pool saturated: wait for a connection to be returned
+        start = time.perf_counter()
+        try:
+            conn = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            with self._lock:
+                self._waiting -= 1
+                self._timeouts += 1
+            raise PoolTimeout(f"No database connection free after {self.timeout:.0f}s "
+                              f"({self.size} connections in use)")
+        waited_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._waiting -= 1
+            self._waits += 1
+            self._total_wait_ms += waited_ms
+            self._max_wait_ms = max(self._max_wait_ms, waited_ms)
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Check out a connection for the duration of a ``with`` block"""
+        conn = self._acquire()
+        with self._lock:
+            self._checkouts += 1
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            with self._lock:
+                self._in_use -= 1
+            self._idle.put(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        """Checkout, wait and saturation counters since the pool was created"""
+        with self._lock:
+            return {
+                'size': self.size,
+                'open': self._opened,
+                'in_use': self._in_use,
+                'waiting': self._waiting,
+                'peak_in_use': self._peak_in_use,
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'timeouts': self._timeouts,
+                'avg_wait_ms': round(self._total_wait_ms / self._waits, 2) if self._waits else 0.0,
+                'max_wait_ms': round(self._max_wait_ms, 2),
+                # Share of checkouts that found every connection busy
+                'saturation': round(self._waits / self._checkouts, 3) if self._checkouts else 0.0,
+            }
+
+    def close(self) -> None:
+        """Close idle connections, e.g. when the pool is being replaced"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._opened -= 1
@@ -0,0 +1,264 @@
+"""
+Schema, index plan and versioned migrations for data/cricket_analytics.db.
+
+Every migration is recorded in ``schema_migrations`` so the dashboard can
+refuse to start against a database that is missing indexes or aggregate
+tables it depends on. Migrations must be idempotent: a migration that was
+interrupted before its version row was written is simply re-run.
+
+The ``meta`` table holds the data version: every ingest, aggregate rebuild
+and migration bumps it in the same transaction as the change, and the
+dashboard keeps its caches until the version it reads there changes.
+"""
+
+import re
+import sqlite3
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from aggregates import build_player_innings
+from nrr_engine import create_nrr_table
+from queries import QUERIES
+from season_engine import build_season_tables, reinfer_stored_stages
+
+logger = logging.getLogger(__name__)
+
+# ==================== BASE SCHEMA ====================
+
+BASE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS teams (
+    team_id     INTEGER PRIMARY KEY,
+    team_name   TEXT NOT NULL UNIQUE,
+    short_name  TEXT,
+    is_active   INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS matches (
+    match_id           INTEGER PRIMARY KEY,
+    season             INTEGER,
+    match_date         TEXT,
+    venue              TEXT,
+    city               TEXT,
+    team1_id           INTEGER,
+    team2_id           INTEGER,
+    team1_name         TEXT,
+    team2_name         TEXT,
+    toss_winner_id     INTEGER,
+    toss_winner_name   TEXT,
+    toss_decision      TEXT,
+    match_winner_id    INTEGER,
+    match_winner_name  TEXT,
+    win_by_runs        INTEGER DEFAULT 0,
+    win_by_wickets     INTEGER DEFAULT 0,
+    player_of_match    TEXT,
+    result             TEXT
+);
+
+CREATE TABLE IF NOT EXISTS deliveries (
+    match_id        INTEGER NOT NULL REFERENCES matches (match_id),
+    innings         INTEGER NOT NULL,
+    over_number     INTEGER NOT NULL,
+    ball_number     INTEGER NOT NULL,
+    batter          TEXT,
+    non_striker     TEXT,
+    bowler          TEXT,
+    batter_runs     INTEGER NOT NULL DEFAULT 0,
+    extras          INTEGER NOT NULL DEFAULT 0,
+    total_runs      INTEGER NOT NULL DEFAULT 0,
+    wide_ball_runs  INTEGER NOT NULL DEFAULT 0,
+    no_ball_runs    INTEGER NOT NULL DEFAULT 0,
+    is_wide_ball    INTEGER NOT NULL DEFAULT 0,
+    is_no_ball      INTEGER NOT NULL DEFAULT 0,
+    is_wicket       INTEGER NOT NULL DEFAULT 0,
+    player_out      TEXT,
+    wicket_kind     TEXT
+);
+"""
+
+# Covering indexes for the query shapes used by the dashboard pages:
+# - team/season pages join matches -> deliveries by match and innings and
+#   only need over_number / total_runs / is_wicket (NRR, powerplay, trends)
+# - player lookups filter deliveries by batter or bowler
+# - match filters are by season, by either team slot, or by a fixture pair
+INDEX_PLAN = """
+CREATE INDEX IF NOT EXISTS idx_deliveries_match_innings
+    ON deliveries (match_id, innings, over_number, total_runs, is_wicket);
+CREATE INDEX IF NOT EXISTS idx_deliveries_batter ON deliveries (batter, match_id);
+CREATE INDEX IF NOT EXISTS idx_deliveries_bowler ON deliveries (bowler, match_id);
+CREATE INDEX IF NOT EXISTS idx_matches_season ON matches (season);
+CREATE INDEX IF NOT EXISTS idx_matches_team1 ON matches (team1_name, team2_name);
+CREATE INDEX IF NOT EXISTS idx_matches_team2 ON matches (team2_name, team1_name);
+"""
+
+# Source file tracking for incremental Cricsheet ingestion (cricsheet_ingest.py)
+INGESTION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingested_files (
+    match_id     INTEGER PRIMARY KEY,
+    source       TEXT NOT NULL,
+    file_hash    TEXT NOT NULL,
+    ingested_at  TEXT NOT NULL
+);
+"""
+
+# Data version stamp read by the dashboard on every request (primary-key lookups)
+META_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key    TEXT PRIMARY KEY,
+    value  TEXT NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', '1')
+"""
+
+# ==================== MIGRATIONS ====================
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def _split_statements(script: str) -> List[str]:
+    """Split a DDL script into individual statements"""
+    return [stmt.strip() for stmt in script.split(';') if stmt.strip()]
+
+
+def _run_script(script: str) -> Callable[[sqlite3.Connection], None]:
+    """Migration step that executes a DDL script in a single transaction"""
+    def apply(conn: sqlite3.Connection) -> None:
+        conn.execute("BEGIN")
+        try:
+            for statement in _split_statements(script):
+                conn.execute(statement)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return apply
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Base schema: teams, matches, deliveries", _run_script(BASE_SCHEMA)),
+    Migration(2, "Covering indexes for page query shapes", _run_script(INDEX_PLAN)),
+    Migration(3, "Materialize batter_innings / bowler_innings", lambda conn: build_player_innings(conn)),
+    Migration(4, "Track ingested Cricsheet files", _run_script(INGESTION_SCHEMA)),
+    Migration(5, "Match targets and materialized team_season_nrr", lambda conn: create_nrr_table(conn)),
+    Migration(6, "Match stages, league-only points tables, standings race and season results",
+              lambda conn: build_season_tables(conn)),
+    Migration(7, "Data version stamp (meta)", _run_script(META_SCHEMA)),
+    Migration(8, "Flag inferred match stages and re-infer them on every refresh",
+              lambda conn: reinfer_stored_stages(conn)),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Return the highest applied migration version (0 for an unversioned DB)"""
+    try:
+        row = conn.execute("SELECT MAX(version) FROM schema_migrations").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] or 0
+
+
+def get_data_version(conn: sqlite3.Connection) -> str:
+    """Data version stamp ('<counter>@<updated at>'); changes whenever the data does"""
+    values = dict(conn.execute(
+        "SELECT key, value FROM meta WHERE key IN ('data_version', 'data_updated_at')"
+    ).fetchall())
+    return f"{values.get('data_version', '0')}@{values.get('data_updated_at', '')}"
+
+
+def bump_data_version(conn: sqlite3.Connection) -> int:
+    """Record a data change inside the caller's transaction; returns the new counter"""
+    conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', '0')")
+    conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'data_version'")
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('data_updated_at', ?)",
+                 (datetime.now().isoformat(timespec='microseconds'),))
+    return int(conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()[0])
+
+
+def migrate(conn: sqlite3.Connection, analyze: bool = True) -> List[int]:
+    """Apply all pending migrations in order, then refresh planner statistics"""
+    # WAL is persistent: dashboard readers (read-only pool) never block on a writer
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version     INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at  TEXT NOT NULL
+        )
+    """)
+    conn.commit()
+
+    current = get_schema_version(conn)
+    applied = []
+    for migration in MIGRATIONS:
+        if migration.version <= current:
+            continue
+        logger.info(f"Applying migration {migration.version}: {migration.description}")
+        migration.apply(conn)
+        conn.execute(
+            "INSERT OR REPLACE INTO schema_migrations (version, description, applied_at) VALUES (?, ?, ?)",
+            (migration.version, migration.description, datetime.now().isoformat(timespec='seconds'))
+        )
+        conn.commit()
+        applied.append(migration.version)
+
+    if applied:
+        # Migrations can rebuild aggregate tables, so cached results are stale
+        bump_data_version(conn)
+        conn.commit()
+
+    if analyze:
+        conn.execute("ANALYZE")
+        conn.commit()
+    return applied
+
+# ==================== QUERY PLAN REPORT ====================
+
+# Every registered dashboard query, explained with its sample parameters.
+# None of them may fall back to a full scan of the deliveries table.
+PAGE_QUERIES: Dict[str, Tuple[str, dict]] = {
+    query.query_id: (query.sql, query.sample) for query in QUERIES.values()
+}
+
+_ALIAS_PATTERN = re.compile(r'\bdeliveries\b(?:\s+(?:AS\s+)?(?!ON\b|WHERE\b|GROUP\b|JOIN\b|ORDER\b)(\w+))?', re.IGNORECASE)
+
+
+def _deliveries_aliases(sql: str) -> set:
+    """Names the deliveries table is referred to by in a query"""
+    names = {'deliveries'}
+    for match in _ALIAS_PATTERN.finditer(sql):
+        if match.group(1):
+            names.add(match.group(1).lower())
+    return names
+
+
+def explain_query_plan(conn: sqlite3.Connection, sql: str, params=()) -> List[str]:
+    """Return the EXPLAIN QUERY PLAN detail lines for a query"""
+    return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
+
+
+def query_plan_report(conn: sqlite3.Connection, queries: Dict[str, Tuple[str, dict]] = None) -> List[Dict]:
+    """Explain each page query and flag any full scan of deliveries"""
+    queries = queries or PAGE_QUERIES
+    report = []
+    for name, (sql, params) in queries.items():
+        plan = explain_query_plan(conn, sql, params)
+        aliases = _deliveries_aliases(sql)
+        full_scans = [
+            line for line in plan
+            if line.startswith('SCAN ') and line.split()[1].lower() in aliases
+        ]
+        report.append({'query': name, 'plan': plan, 'full_scan': bool(full_scans)})
+    return report
+
+
+def assert_no_full_scans(conn: sqlite3.Connection, queries: Dict[str, Tuple[str, dict]] = None) -> List[Dict]:
+    """Raise AssertionError if any page query scans the whole deliveries table"""
+    report = query_plan_report(conn, queries)
+    offenders = [entry['query'] for entry in report if entry['full_scan']]
+    assert not offenders, f"Full scan of deliveries in page queries: {', '.join(offenders)}"
+    return report
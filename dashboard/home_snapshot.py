@@ -0,0 +1,89 @@
+"""
+Precomputed snapshot of every dataset the Home page renders.
+
+``write_snapshot`` runs at data-load time (``create_database.py`` and
+``build_aggregates.py``) and stores the leaderboards, team table, win
+methods, season trends and venue counts in one pickle file stamped with the
+source database. ``load_snapshot`` returns them while the stamp still
+matches, so a new session paints the Home page without querying
+``deliveries``; a stale or missing snapshot returns None and the caller
+rebuilds the datasets live.
+"""
+
+import os
+import sqlite3
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from parquet_store import source_stamp, stamp_is_current
+from queries import run_query, run_scalar
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_PATH = Path("data/home_snapshot.pkl")
+SNAPSHOT_FORMAT = 1
+TOP_N = 10
+
+
+def build_home_datasets(conn: sqlite3.Connection, top_n: int = TOP_N) -> Dict[str, Any]:
+    """Compute the Home page datasets from the database"""
+    matches = run_query(conn, 'matches_all')
+    has_deliveries = run_scalar(conn, 'has_deliveries') is not None
+
+    venue_counts = matches['venue'].value_counts().head(10).reset_index()
+    venue_counts.columns = ['venue', 'matches']
+
+    return {
+        'team_stats': run_query(conn, 'team_stats'),
+        'win_methods': {
+            'runs': int((matches['win_by_runs'] > 0).sum()),
+            'wickets': int((matches['win_by_wickets'] > 0).sum()),
+        },
+        'matches_per_season': matches.groupby('season').size().reset_index(name='matches'),
+        'venue_counts': venue_counts,
+        'has_deliveries': has_deliveries,
+        'matches_with_deliveries': run_scalar(conn, 'data_quality_coverage') if has_deliveries else 0,
+        'top_scorers': run_query(conn, 'top_run_scorers', {'limit': top_n}) if has_deliveries else pd.DataFrame(),
+        'top_bowlers': run_query(conn, 'top_wicket_takers', {'limit': top_n}) if has_deliveries else pd.DataFrame(),
+        'scoring_trends': run_query(conn, 'season_scoring_trends') if has_deliveries else pd.DataFrame(),
+        'built_at': datetime.now(),
+    }
+
+
+def write_snapshot(db_path: Path, path: Path = DEFAULT_SNAPSHOT_PATH, top_n: int = TOP_N) -> Dict[str, Any]:
+    """Build the Home datasets and write them atomically to ``path``"""
+    db_path = Path(db_path)
+    path = Path(path)
+    conn = sqlite3.connect(f"file:{db_path.resolve()}?mode=ro", uri=True)
+    try:
+        datasets = build_home_datasets(conn, top_n)
+    finally:
+        conn.close()
+
+    # Stamp after the read connection is closed so the stamp reflects the final file state
+    payload = {'format': SNAPSHOT_FORMAT, 'source': source_stamp(db_path), 'datasets': datasets}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    pd.to_pickle(payload, tmp_path)
+    os.replace(tmp_path, path)
+    logger.info(f"Wrote Home snapshot to {path}")
+    return datasets
+
+
+def load_snapshot(db_path: Path, path: Path = DEFAULT_SNAPSHOT_PATH) -> Optional[Dict[str, Any]]:
+    """Snapshot datasets, or None if missing, from an older format, or stale"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        payload = pd.read_pickle(path)
+    except Exception as e:
+        logger.error(f"Unreadable Home snapshot {path}: {e}")
+        return None
+    if payload.get('format') != SNAPSHOT_FORMAT or not stamp_is_current(payload['source'], db_path):
+        return None
+    return payload['datasets']
@@ -0,0 +1,184 @@
+"""
+Index and thumbnails for the generated images gallery.
+
+``GalleryIndex`` keeps one row per image in ``generated_images/`` (file name,
+mtime, size, dimensions, prompt, source) in a small SQLite file next to the
+images, plus a WebP thumbnail per image under ``.thumbs/``. Images saved by
+the dashboard are indexed as they are written; ``sync`` picks up files added,
+rewritten or removed by other means (``export_charts.py``, watermarking in
+place, copying files in) by comparing each file's mtime and size with the
+index - one ``scandir`` per sync. The gallery page then reads one
+page of rows and small thumbnails - full-size files are only opened when a
+download is requested.
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+from PIL import Image, features
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GALLERY_DIR = Path("generated_images")
+INDEX_NAME = ".gallery.db"
+THUMBNAIL_DIR_NAME = ".thumbs"
+THUMBNAIL_SIZE = (480, 270)
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg', '.webp')
+# Pillow builds without libwebp still get (larger) JPEG thumbnails
+THUMBNAIL_FORMAT = 'WEBP' if features.check('webp') else 'JPEG'
+
+GALLERY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    filename TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    prompt TEXT,
+    source TEXT NOT NULL DEFAULT 'file'
+);
+CREATE INDEX IF NOT EXISTS idx_images_mtime ON images(mtime);
+"""
+
+
+class GalleryImage(NamedTuple):
+    filename: str
+    mtime: float
+    size: int
+    width: Optional[int]
+    height: Optional[int]
+    prompt: Optional[str]
+    source: str
+
+
+class GalleryIndex:
+    """SQLite index + thumbnail store for one images directory"""
+
+    def __init__(self, directory: Path = DEFAULT_GALLERY_DIR):
+        self.directory = Path(directory)
+        self.thumbnail_dir = self.directory / THUMBNAIL_DIR_NAME
+        self.thumbnail_dir.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.directory / INDEX_NAME, timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(GALLERY_SCHEMA)
+        self._lock = threading.Lock()
+
+    # ==================== INDEXING ====================
+
+    def thumbnail_path(self, filename: str) -> Path:
+        return self.thumbnail_dir / f"{filename}.{THUMBNAIL_FORMAT.lower()}"
+
+    def _make_thumbnail(self, image: Image.Image, filename: str) -> None:
+        thumbnail = image.copy()
+        thumbnail.thumbnail(THUMBNAIL_SIZE)
+        if thumbnail.mode not in ('RGB', 'RGBA') or THUMBNAIL_FORMAT == 'JPEG':
+            thumbnail = thumbnail.convert('RGB')
+        thumbnail.save(self.thumbnail_path(filename), format=THUMBNAIL_FORMAT, quality=80)
+
+    def add(self, path: Path, prompt: Optional[str] = None, source: str = 'file') -> Optional[GalleryImage]:
+        """Index one image file and write its thumbnail"""
+        path = Path(path)
+        try:
+            stat = path.stat()
+            with Image.open(path) as image:
+                width, height = image.size
+                self._make_thumbnail(image, path.name)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not index gallery image {path.name}: {e}")
+            return None
+        entry = GalleryImage(path.name, stat.st_mtime, stat.st_size, width, height, prompt, source)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO images (filename, mtime, size, width, height, prompt, source) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(filename) DO UPDATE SET mtime = excluded.mtime, size = excluded.size, "
+                "width = excluded.width, height = excluded.height, "
+                "prompt = COALESCE(excluded.prompt, images.prompt), source = excluded.source",
+                entry
+            )
+        return entry
+
+    def remove(self, filename: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM images WHERE filename = ?", (filename,))
+        self.thumbnail_path(filename).unlink(missing_ok=True)
+
+    def sync(self) -> int:
+        """Index new/changed files and drop deleted ones; returns files (re)indexed"""
+        with self._lock:
+            known = {filename: (mtime, size) for filename, mtime, size in
+                     self._conn.execute("SELECT filename, mtime, size FROM images")}
+
+        # Files rewritten in place (e.g. watermarked) leave the directory's mtime alone,
+        # so every file's own mtime and size are checked
+        indexed = 0
+        present = set()
+        try:
+            entries = os.scandir(self.directory)
+        except OSError:
+            return 0
+        with entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.name.lower().endswith(IMAGE_SUFFIXES):
+                    continue
+                present.add(entry.name)
+                stat = entry.stat()
+                if known.get(entry.name) != (stat.st_mtime, stat.st_size) \
+                        or not self.thumbnail_path(entry.name).exists():
+                    if self.add(Path(entry.path)) is not None:
+                        indexed += 1
+        for filename in set(known) - present:
+            self.remove(filename)
+        return indexed
+
+    # ==================== READING ====================
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM images").fetchone()[0]
+
+    def page(self, page: int, per_page: int) -> List[GalleryImage]:
+        """One page of images, newest first (``page`` starts at 0)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT filename, mtime, size, width, height, prompt, source FROM images "
+                "ORDER BY mtime DESC, filename LIMIT ? OFFSET ?", (per_page, page * per_page)
+            ).fetchall()
+        return [GalleryImage(*row) for row in rows]
+
+    def thumbnail(self, filename: str) -> Optional[bytes]:
+        """Thumbnail bytes, rebuilt from the original if missing"""
+        path = self.thumbnail_path(filename)
+        if not path.exists() and self.add(self.directory / filename) is None:
+            return None
+        try:
+            return path.read_bytes()
+        except OSError:
+            return None
+
+    def read(self, filename: str) -> bytes:
+        """Full-size image bytes (for downloads)"""
+        return (self.directory / Path(filename).name).read_bytes()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def save_image(directory: Path, image_bytes: bytes, prefix: str, index: Optional[GalleryIndex] = None,
+               prompt: Optional[str] = None, source: str = 'ai') -> Path:
+    """Write an image with a timestamped name and index it"""
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    path = Path(directory) / f"{prefix}_{timestamp}.png"
+    suffix = 1
+    while path.exists():
+        path = Path(directory) / f"{prefix}_{timestamp}_{suffix}.png"
+        suffix += 1
+    path.write_bytes(image_bytes)
+    if index is not None:
+        index.add(path, prompt=prompt, source=source)
+    return path
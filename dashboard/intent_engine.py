@@ -0,0 +1,480 @@
+"""
+Rule-based natural-language intent engine for the AI Dashboard.
+
+Common questions - top-N leaderboards, season / team / venue records, season
+champions, head to head, team comparisons, player summaries and batter vs
+bowler - are answered locally instead of asking Gemini for SQL. An
+``EntityIndex`` built from the database recognizes teams (full names,
+initials, unique words), players (full names, unique surnames, "first-name
+surname"), venues and seasons, with fuzzy matching for typos. The question is
+then mapped to a registered query in ``queries.py``. Questions containing
+words the engine does not understand resolve to None and the caller falls back
+to the LLM.
+"""
+
+import re
+import difflib
+import sqlite3
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import pandas as pd
+
+from queries import run_query
+
+# ==================== VOCABULARY ====================
+
+METRIC_WORDS = {
+    'runs': {'runs', 'run', 'scorers', 'scorer', 'scored', 'batsmen', 'batsman', 'batters', 'batter', 'batting'},
+    'wickets': {'wickets', 'wicket', 'takers', 'taker', 'bowlers', 'bowler', 'bowling'},
+    'sixes': {'sixes', 'six', 'hitters'},
+    'strike_rate': {'strike'},
+    'economy': {'economy', 'economical'},
+    'wins': {'win', 'wins', 'won', 'winning', 'percentage', 'successful'},
+    'matches': {'matches', 'match', 'games', 'game', 'played', 'hosted'},
+}
+COMPARE_WORDS = {'compare', 'comparison', 'compared'}
+CHAMPION_WORDS = {'champion', 'champions', 'title', 'titles', 'trophy', 'winner', 'winners', 'final', 'lifted'}
+# Words that ask for a ranking rather than a single result
+LEADERBOARD_WORDS = {'most', 'many', 'much', 'top', 'best', 'highest', 'leading', 'leader', 'leaders'}
+HEAD_TO_HEAD_WORDS = {'vs', 'versus', 'v', 'against', 'head', 'h2h', 'between', 'meetings', 'rivalry'}
+FILLER_WORDS = set("""
+    a about across all alltime an and any are as at be best by can career count did do does during each
+    edition ever far for franchise from get give ground had has have highest history how i in ipl is it its
+    leader leaders leading list many me most much my number numbers of on overall performance player players
+    please profile rate record records season seasons show side so stadium stats statistics summary team teams
+    tell than that the their them there these this time times to top total venue want was were what which who
+    whose wise with year
+""".split())
+
+VOCABULARY = FILLER_WORDS | COMPARE_WORDS | CHAMPION_WORDS | HEAD_TO_HEAD_WORDS | set().union(*METRIC_WORDS.values())
+
+NUMBER_WORDS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7, 'eight': 8,
+    'nine': 9, 'ten': 10, 'fifteen': 15, 'twenty': 20,
+}
+# Number words that are also metric words: "top six run scorers" vs "top 5 six hitters"
+METRIC_NUMBER_WORDS = set(NUMBER_WORDS) & VOCABULARY
+
+# Words too generic to identify a team or venue on their own
+GENERIC_NAME_WORDS = set("""
+    academy association cricket club ground international oval park sports stadium the of and de
+""".split())
+
+# Abbreviations that are not simply the initials of the team name, or that
+# should follow a franchise across renames
+EXTRA_TEAM_ALIASES = {
+    'rcb': ('Royal Challengers Bangalore', 'Royal Challengers Bengaluru'),
+    'pbks': ('Punjab Kings', 'Kings XI Punjab'),
+    'kxip': ('Kings XI Punjab', 'Punjab Kings'),
+    'srh': ('Sunrisers Hyderabad',),
+    'dc': ('Delhi Capitals', 'Delhi Daredevils'),
+    'rps': ('Rising Pune Supergiant', 'Rising Pune Supergiants'),
+}
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+# Qualifying thresholds for rate leaderboards: (all time, single season)
+STRIKE_RATE_MIN_RUNS = (500, 100)
+ECONOMY_MIN_BALLS = (600, 120)
+
+_APOSTROPHE_PATTERN = re.compile(r"'s\b|'")
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens with possessives and apostrophes removed"""
+    return _TOKEN_PATTERN.findall(_APOSTROPHE_PATTERN.sub('', text.lower()))
+
+
+class Entity(NamedTuple):
+    kind: str  # 'team', 'player', 'venue'
+    name: str
+
+
+class ResolvedIntent(NamedTuple):
+    intent: str
+    query_id: str
+    params: Dict[str, Any]
+    description: str
+
+# ==================== ENTITY INDEX ====================
+
+class EntityIndex:
+    """Alias -> entity lookup for teams (most-played first), players and venues, plus known seasons"""
+
+    def __init__(self, teams: Iterable[str], players: Iterable[str], venues: Iterable[str],
+                 seasons: Iterable[int]):
+        self.seasons: Set[int] = {int(season) for season in seasons}
+        self._aliases: Dict[str, Entity] = {}
+        derived: Dict[str, Set[Entity]] = {}
+        self._surnames: Dict[str, List[str]] = {}
+
+        def claim(alias: str, entity: Entity) -> None:
+            if alias and alias not in VOCABULARY and not alias.isdigit():
+                derived.setdefault(alias, set()).add(entity)
+
+        teams, players, venues = list(teams), list(players), list(venues)
+        team_names = set(teams)
+        for team in teams:
+            entity = Entity('team', team)
+            words = tokenize(team)
+            self._aliases[' '.join(words)] = entity
+            if len(words) > 1:
+                claim(''.join(word[0] for word in words), entity)
+            for word in words:
+                if len(word) >= 3 and word not in GENERIC_NAME_WORDS:
+                    claim(word, entity)
+
+        for player in players:
+            entity = Entity('player', player)
+            words = tokenize(player)
+            self._aliases.setdefault(' '.join(words), entity)
+            # Cricsheet stores initials ("AB de Villiers"): surnames are every proper suffix
+            for start in range(1, len(words)):
+                claim(' '.join(words[start:]), entity)
+            if len(words) > 1:
+                self._surnames.setdefault(words[-1], []).append(player)
+
+        for venue in venues:
+            entity = Entity('venue', venue)
+            self._aliases.setdefault(' '.join(tokenize(venue)), entity)
+            # "Wankhede Stadium, Mumbai" is also asked about as "Wankhede Stadium" / "Wankhede"
+            short_name = venue.split(',')[0]
+            claim(' '.join(tokenize(short_name)), entity)
+            for word in tokenize(short_name):
+                if len(word) >= 4 and word not in GENERIC_NAME_WORDS:
+                    claim(word, entity)
+
+        # A derived alias only counts if exactly one entity claims it and it isn't a full name
+        for alias, entities in derived.items():
+            if len(entities) == 1 and alias not in self._aliases:
+                self._aliases[alias] = next(iter(entities))
+
+        # Explicit abbreviations win, using the name variant with the most matches
+        team_rank = {team: rank for rank, team in enumerate(teams)}
+        for alias, candidates in EXTRA_TEAM_ALIASES.items():
+            present = sorted((team for team in candidates if team in team_names), key=team_rank.get)
+            if present:
+                self._aliases[alias] = Entity('team', present[0])
+
+        self._max_words = max((len(alias.split()) for alias in self._aliases), default=1)
+        self._fuzzy_keys = [alias for alias in self._aliases if ' ' not in alias and len(alias) >= 4]
+
+    @classmethod
+    def from_connection(cls, conn: sqlite3.Connection) -> 'EntityIndex':
+        """Build the index from teams, match venues/seasons and the player directory"""
+        matches = run_query(conn, 'matches_all')
+        team_matches = pd.concat([matches['team1_name'], matches['team2_name']]).value_counts()
+        teams = list(team_matches.index) + [team for team in run_query(conn, 'teams_all')['team_name']
+                                            if team not in team_matches.index]
+        return cls(
+            teams=teams,
+            players=run_query(conn, 'player_directory')['player'],
+            venues=run_query(conn, 'venue_directory')['venue'],
+            seasons=matches['season'].dropna().unique(),
+        )
+
+    def __len__(self) -> int:
+        return len(self._aliases)
+
+    def lookup(self, phrase: str) -> Optional[Entity]:
+        return self._aliases.get(phrase)
+
+    def fuzzy_lookup(self, word: str) -> Optional[Entity]:
+        """Closest single-word alias for a misspelt word (e.g. 'kohlii')"""
+        if len(word) < 5:
+            return None
+        close = difflib.get_close_matches(word, self._fuzzy_keys, n=1, cutoff=0.85)
+        return self._aliases[close[0]] if close else None
+
+    def first_name_match(self, first: str, surname: str) -> Optional[Entity]:
+        """'rohit sharma' -> 'RG Sharma' when exactly one Sharma's initials start with R"""
+        candidates = [name for name in self._surnames.get(surname, [])
+                      if tokenize(name)[0].startswith(first[0])]
+        return Entity('player', candidates[0]) if len(candidates) == 1 else None
+
+    def scan(self, tokens: List[str]) -> Tuple[List[Entity], List[str]]:
+        """Greedy longest-match entity recognition; returns (entities, unmatched tokens)"""
+        entities: List[Entity] = []
+        rest: List[str] = []
+        i = 0
+        while i < len(tokens):
+            entity, width = None, 1
+            for n in range(min(self._max_words, len(tokens) - i), 0, -1):
+                entity = self._aliases.get(' '.join(tokens[i:i + n]))
+                if entity is not None:
+                    width = n
+                    break
+            if entity is None and tokens[i] not in VOCABULARY:
+                if i + 1 < len(tokens) and len(tokens[i]) >= 3:
+                    entity = self.first_name_match(tokens[i], tokens[i + 1])
+                    width = 2
+                if entity is None:
+                    entity, width = self.fuzzy_lookup(tokens[i]), 1
+            if entity is None:
+                rest.append(tokens[i])
+            else:
+                entities.append(entity)
+            i += width
+        return entities, rest
+
+# ==================== RESOLUTION ====================
+
+def _leaderboard(metrics: Set[str], season: Optional[int], limit: int) -> Optional[Tuple[str, Dict[str, Any], str]]:
+    """(query id, params, description) for a player leaderboard"""
+    threshold = 0 if season is None else 1
+    season_params = {} if season is None else {'season': season}
+    suffix = '' if season is None else '_by_season'
+    if 'strike_rate' in metrics and 'wickets' not in metrics:
+        params = {'min_matches': 1, 'min_runs': STRIKE_RATE_MIN_RUNS[threshold], 'limit': limit}
+        return f'strike_rate_leaders{suffix}', dict(season_params, **params), f"Top {limit} batting strike rates"
+    if 'economy' in metrics:
+        params = {'min_matches': 1, 'min_balls': ECONOMY_MIN_BALLS[threshold], 'limit': limit}
+        return f'economy_leaders{suffix}', dict(season_params, **params), f"Top {limit} bowling economy rates"
+    if 'sixes' in metrics:
+        return f'most_sixes{suffix}', dict(season_params, limit=limit), f"Top {limit} six hitters"
+    if 'runs' in metrics and 'wickets' not in metrics:
+        return (f'batting_leaders{suffix}', dict(season_params, min_matches=1, limit=limit),
+                f"Top {limit} run scorers")
+    if 'wickets' in metrics and 'runs' not in metrics:
+        return (f'bowling_leaders{suffix}', dict(season_params, min_matches=1, limit=limit),
+                f"Top {limit} wicket takers")
+    return None
+
+
+def resolve_question(question: str, index: EntityIndex) -> Optional[ResolvedIntent]:
+    """Map a question to a registered query, or None if it needs the LLM"""
+    entities, rest = index.scan(tokenize(question))
+
+    seasons: List[int] = []
+    numbers: List[int] = []
+    words: Set[str] = set()
+    has_digits = any(token.isdigit() and len(token) != 4 for token in rest)
+    for position, token in enumerate(rest):
+        following = rest[position + 1] if position + 1 < len(rest) else None
+        if token in METRIC_NUMBER_WORDS and (has_digits or following in METRIC_WORDS['sixes']):
+            words.add(token)
+        elif token.isdigit() and len(token) == 4:
+            if int(token) not in index.seasons:
+                return None
+            seasons.append(int(token))
+        elif token.isdigit() or token in NUMBER_WORDS:
+            numbers.append(int(token) if token.isdigit() else NUMBER_WORDS[token])
+        elif token in VOCABULARY:
+            words.add(token)
+        else:
+            return None  # Something the templates can't express
+
+    if len(set(seasons)) > 1 or len(numbers) > 1:
+        return None
+    season = seasons[0] if seasons else None
+    limit = min(max(numbers[0], 1), MAX_LIMIT) if numbers else DEFAULT_LIMIT
+    metrics = {metric for metric, vocabulary in METRIC_WORDS.items() if words & vocabulary}
+    if 'strike' in words and 'rate' not in words:
+        metrics.discard('strike_rate')
+    in_season = '' if season is None else f" in {season}"
+
+    teams = list(dict.fromkeys(e.name for e in entities if e.kind == 'team'))
+    players = list(dict.fromkeys(e.name for e in entities if e.kind == 'player'))
+    venues = list(dict.fromkeys(e.name for e in entities if e.kind == 'venue'))
+    team_metrics_only = metrics <= {'wins', 'matches'}
+
+    # "Who won IPL 2023?" asks for the champion, not the team with the most wins; anything
+    # else about a final ("most runs in the 2022 final") is left to the LLM
+    ranking = bool(numbers) or bool(words & LEADERBOARD_WORDS)
+    asks_who_won = 'won' in words and words & {'who', 'which'}
+    if words & CHAMPION_WORDS or (asks_who_won and metrics == {'wins'} and not ranking):
+        if season is not None and metrics <= {'wins'} and not ranking and not (players or teams or venues):
+            return ResolvedIntent('season_champion', 'season_result', {'season': season},
+                                  f"{season} champion")
+        return None
+
+    if players:
+        if len(players) == 2 and not (teams or venues or season):
+            return ResolvedIntent('batter_vs_bowler', 'batter_vs_bowler',
+                                  {'player1': players[0], 'player2': players[1]},
+                                  f"{players[0]} vs {players[1]} (batter vs bowler)")
+        if len(players) == 1 and not (teams or venues or season):
+            return ResolvedIntent('player_summary', 'player_summary', {'player': players[0]},
+                                  f"Career summary for {players[0]}")
+        return None
+
+    if teams:
+        if len(teams) == 2 and not (venues or season) and team_metrics_only:
+            if words & COMPARE_WORDS:
+                return ResolvedIntent('team_comparison', 'team_comparison',
+                                      {'team1': teams[0], 'team2': teams[1]},
+                                      f"{teams[0]} vs {teams[1]} overall records")
+            return ResolvedIntent('head_to_head', 'head_to_head_record',
+                                  {'team1': teams[0], 'team2': teams[1]},
+                                  f"Head to head: {teams[0]} vs {teams[1]}")
+        if len(teams) == 1 and len(venues) <= 1 and team_metrics_only:
+            if venues and season is None:
+                return ResolvedIntent('team_venue_record', 'team_venue_record',
+                                      {'team': teams[0], 'venue': venues[0]},
+                                      f"{teams[0]} at {venues[0]}")
+            if not venues and season is not None:
+                return ResolvedIntent('team_season_record', 'team_season_record',
+                                      {'team': teams[0], 'season': season}, f"{teams[0]}{in_season}")
+            if not venues:
+                return ResolvedIntent('team_record', 'team_record', {'team': teams[0]},
+                                      f"{teams[0]} overall record")
+        return None
+
+    if venues:
+        if len(venues) > 1 or season is not None:
+            return None
+        venue = venues[0]
+        if metrics == {'runs'} or metrics == {'runs', 'matches'}:
+            return ResolvedIntent('venue_leaderboard', 'venue_run_scorers', {'venue': venue, 'limit': limit},
+                                  f"Top {limit} run scorers at {venue}")
+        if metrics == {'wickets'} or metrics == {'wickets', 'matches'}:
+            return ResolvedIntent('venue_leaderboard', 'venue_wicket_takers', {'venue': venue, 'limit': limit},
+                                  f"Top {limit} wicket takers at {venue}")
+        if team_metrics_only:
+            return ResolvedIntent('venue_summary', 'venue_summary', {'venue': venue}, f"Matches at {venue}")
+        return None
+
+    leaderboard = _leaderboard(metrics - {'matches'}, season, limit)
+    if leaderboard is not None:
+        query_id, params, description = leaderboard
+        return ResolvedIntent('leaderboard', query_id, params, description + in_season)
+    if 'wins' in metrics and metrics <= {'wins', 'matches'}:
+        if season is not None:
+            return ResolvedIntent('team_standings', 'season_team_standings', {'season': season},
+                                  f"Team standings{in_season}")
+        return ResolvedIntent('team_standings', 'team_stats', {}, "All-time team win percentages")
+    if metrics == {'matches'}:
+        if season is not None:
+            return ResolvedIntent('season_matches', 'season_match_count', {'season': season},
+                                  f"Matches played{in_season}")
+        return ResolvedIntent('season_matches', 'matches_per_season', {}, "Matches per season")
+    return None
+
+# ==================== SUMMARIES ====================
+
+def _value(value: Any) -> str:
+    if pd.isna(value):
+        return '0'
+    return f"{value:,.0f}" if float(value).is_integer() else f"{value:,}"
+
+
+LEADERBOARD_METRICS = {
+    'batting_leaders': 'total_runs',
+    'bowling_leaders': 'total_wickets',
+    'most_sixes': 'total_sixes',
+    'strike_rate_leaders': 'strike_rate',
+    'economy_leaders': 'economy',
+    'venue_run_scorers': 'total_runs',
+    'venue_wicket_takers': 'total_wickets',
+}
+
+
+def _summarize_leaderboard(resolved: ResolvedIntent, df: pd.DataFrame) -> str:
+    metric = LEADERBOARD_METRICS[resolved.query_id.replace('_by_season', '')]
+    label = metric.replace('total_', '').replace('_', ' ')
+    top = df.iloc[0]
+    text = f"{top['player']} leads with {_value(top[metric])} {label}"
+    if len(df) > 1:
+        text += f", ahead of {df.iloc[1]['player']} ({_value(df.iloc[1][metric])})"
+    return f"{resolved.description}: {text}."
+
+
+def _summarize_team_records(resolved: ResolvedIntent, df: pd.DataFrame) -> str:
+    parts = [f"{row['team']} won {_value(row['wins'])} of {_value(row['matches_played'])}"
+             + (f" ({row['win_percentage']}%)" if 'win_percentage' in df.columns else '')
+             for _, row in df.iterrows()]
+    return f"{resolved.description}: " + '; '.join(parts) + '.'
+
+
+def _summarize_head_to_head(resolved: ResolvedIntent, df: pd.DataFrame) -> str:
+    first, second = df.iloc[0], df.iloc[1]
+    meetings = int(first['matches_played'])
+    if not meetings:
+        return f"{first['team']} and {second['team']} have not played each other."
+    if first['wins'] == second['wins']:
+        return f"{first['team']} and {second['team']} are level at {_value(first['wins'])} wins each in {meetings} meetings."
+    leader, trailer = (first, second) if first['wins'] > second['wins'] else (second, first)
+    return (f"{leader['team']} lead {trailer['team']} {_value(leader['wins'])}-{_value(trailer['wins'])} "
+            f"in {meetings} meetings.")
+
+
+def _summarize_player(resolved: ResolvedIntent, df: pd.DataFrame) -> str:
+    row = df.iloc[0]
+    parts = []
+    if not pd.isna(row['total_runs']):
+        parts.append(f"{_value(row['total_runs'])} runs (best {_value(row['highest_score'])}, "
+                     f"strike rate {row['strike_rate']})")
+    if not pd.isna(row['total_wickets']) and row['total_wickets'] > 0:
+        parts.append(f"{_value(row['total_wickets'])} wickets (economy {row['economy']})")
+    return f"{row['player']} has {' and '.join(parts) or 'no recorded stats'} in {_value(row['matches'])} matches."
+
+
+def _summarize_batter_vs_bowler(resolved: ResolvedIntent, df: pd.DataFrame) -> str:
+    return ' '.join(
+        f"{row['batter']} has scored {_value(row['runs'])} off {_value(row['balls'])} balls against "
+        f"{row['bowler']} (strike rate {row['strike_rate']}), dismissed {_value(row['dismissals'])} times."
+        for _, row in df.iterrows()
+    )
+
+
+def _summarize_venue(resolved: ResolvedIntent, df: pd.DataFrame) -> str:
+    row = df.iloc[0]
+    return (f"{row['venue']} has hosted {_value(row['matches'])} matches ({row['first_season']}-"
+            f"{row['last_season']}): {_value(row['batting_first_wins'])} won batting first, "
+            f"{_value(row['chasing_wins'])} chasing.")
+
+
+def _summarize_standings(resolved: ResolvedIntent, df: pd.DataFrame) -> str:
+    top = df.iloc[0]
+    return (f"{resolved.description}: {top['team']} lead with {_value(top['wins'])} wins from "
+            f"{_value(top['matches_played'])} matches ({top['win_percentage']}%).")
+
+
+def _summarize_champion(resolved: ResolvedIntent, df: pd.DataFrame) -> str:
+    row = df.iloc[0]
+    season = resolved.params['season']
+    if not row['champion']:
+        leader = f" {row['league_leader']} lead the league table." if row['league_leader'] else ''
+        return f"No final has been recorded for {season}.{leader}"
+    text = f"{row['champion']} won {season}, beating {row['runner_up']} in the final"
+    if row['league_leader']:
+        text += f"; {row['league_leader']} topped the league table"
+    return text + '.'
+
+
+def _summarize_season_matches(resolved: ResolvedIntent, df: pd.DataFrame) -> str:
+    if 'venues' in df.columns:
+        row = df.iloc[0]
+        return (f"{_value(row['matches'])} matches were played in {row['season']} across "
+                f"{_value(row['venues'])} venues ({row['first_match']} to {row['last_match']}).")
+    busiest = df.loc[df['matches'].idxmax()]
+    return (f"{_value(df['matches'].sum())} matches over {len(df)} seasons; the busiest was "
+            f"{busiest['season']} with {_value(busiest['matches'])}.")
+
+
+SUMMARIES: Dict[str, Callable[[ResolvedIntent, pd.DataFrame], str]] = {
+    'leaderboard': _summarize_leaderboard,
+    'venue_leaderboard': _summarize_leaderboard,
+    'team_comparison': _summarize_team_records,
+    'team_record': _summarize_team_records,
+    'team_season_record': _summarize_team_records,
+    'team_venue_record': _summarize_team_records,
+    'head_to_head': _summarize_head_to_head,
+    'player_summary': _summarize_player,
+    'batter_vs_bowler': _summarize_batter_vs_bowler,
+    'venue_summary': _summarize_venue,
+    'team_standings': _summarize_standings,
+    'season_champion': _summarize_champion,
+    'season_matches': _summarize_season_matches,
+}
+
+
+def summarize(resolved: ResolvedIntent, df: pd.DataFrame) -> Optional[str]:
+    """Short templated insight for a locally answered question"""
+    if df.empty:
+        return None
+    try:
+        return SUMMARIES[resolved.intent](resolved, df)
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None
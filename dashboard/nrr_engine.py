@@ -0,0 +1,223 @@
+"""
+Season points table and Net Run Rate from ball-level legal-delivery counts.
+
+NRR follows the tournament rules rather than raw balls faced:
+
+- overs are counted from legal deliveries only (wides and no-balls are not
+  balls of the over);
+- a side bowled out is charged its full quota of overs, not the balls it
+  actually faced;
+- in a reduced-overs match the quota is the overs available to that side -
+  the chase quota comes from the revised target, and a first innings that
+  finished neither all out nor at 20 overs is charged the whole overs it had;
+- when a DLS target was set, the side batting first is credited with
+  ``target - 1`` runs off the chase quota (the par it is deemed to have
+  scored in the chaser's overs);
+- matches without a result and super overs do not count.
+
+``build_nrr_frame`` does this for every match at once (one grouped SQL pass
+over ``deliveries`` plus vectorized pandas). ``season_engine`` feeds it the
+league matches and stores one row per season and team in
+``team_season_nrr`` so pages read a handful of rows instead of re-deriving
+NRR from deliveries.
+"""
+
+import sqlite3
+import logging
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from columnar_store import batting_first_team
+
+logger = logging.getLogger(__name__)
+
+FULL_INNINGS_BALLS = 120
+BALLS_PER_OVER = 6
+ALL_OUT_WICKETS = 10
+POINTS_PER_WIN = 2
+POINTS_PER_NO_RESULT = 1
+
+# Dismissals that don't cost the batting side a wicket
+NOT_OUT_DISMISSALS = ('retired hurt', 'retired not out')
+
+_NOT_OUT_SQL = ", ".join(f"'{kind}'" for kind in NOT_OUT_DISMISSALS)
+
+# ==================== TABLE DEFINITIONS ====================
+
+NRR_DDL = """
+CREATE TABLE IF NOT EXISTS team_season_nrr (
+    season         INTEGER NOT NULL,
+    team           TEXT    NOT NULL,
+    matches        INTEGER NOT NULL DEFAULT 0,
+    wins           INTEGER NOT NULL DEFAULT 0,
+    losses         INTEGER NOT NULL DEFAULT 0,
+    no_results     INTEGER NOT NULL DEFAULT 0,
+    points         INTEGER NOT NULL DEFAULT 0,
+    runs_for       INTEGER NOT NULL DEFAULT 0,
+    balls_for      INTEGER NOT NULL DEFAULT 0,
+    runs_against   INTEGER NOT NULL DEFAULT 0,
+    balls_against  INTEGER NOT NULL DEFAULT 0,
+    nrr            REAL    NOT NULL DEFAULT 0,
+    PRIMARY KEY (season, team)
+);
+
+CREATE INDEX IF NOT EXISTS idx_team_season_nrr_team ON team_season_nrr (team, season);
+"""
+
+# Columns added to matches so reduced-overs matches can be charged correctly
+MATCH_TARGET_COLUMNS = (
+    ('target_runs', 'INTEGER'),
+    ('target_overs', 'REAL'),
+    ('method', 'TEXT'),
+)
+
+NRR_COLUMNS = (
+    'season', 'team', 'matches', 'wins', 'losses', 'no_results', 'points',
+    'runs_for', 'balls_for', 'runs_against', 'balls_against', 'nrr',
+)
+
+_SEASON_FILTER = "WHERE season IN ({placeholders})"
+
+MATCHES_SQL = """
+SELECT match_id, season, match_date, stage, stage_inferred, team1_name, team2_name, toss_winner_name,
+       toss_decision, match_winner_name, result, target_runs, target_overs, method
+FROM matches
+{season_filter}
+"""
+
+INNINGS_TOTALS_SQL = f"""
+SELECT d.match_id, d.innings,
+       SUM(d.total_runs) as runs,
+       SUM(CASE WHEN d.is_wide_ball = 0 AND d.is_no_ball = 0 THEN 1 ELSE 0 END) as legal_balls,
+       SUM(CASE WHEN d.is_wicket = 1 AND COALESCE(d.wicket_kind, '') NOT IN ({_NOT_OUT_SQL})
+                THEN 1 ELSE 0 END) as wickets
+FROM deliveries d
+WHERE d.innings IN (1, 2) {{match_filter}}
+GROUP BY d.match_id, d.innings
+"""
+
+# ==================== BUILD FUNCTIONS ====================
+
+def overs_to_balls(overs: pd.Series) -> pd.Series:
+    """Cricket overs notation (``11.3`` = 11 overs 3 balls) to balls"""
+    whole = np.floor(overs)
+    return whole * BALLS_PER_OVER + np.round((overs - whole) * 10)
+
+
+def add_match_target_columns(conn: sqlite3.Connection) -> None:
+    """Add target / method columns to matches if they are missing (idempotent)"""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(matches)")}
+    for column, column_type in MATCH_TARGET_COLUMNS:
+        if column not in existing:
+            conn.execute(f"ALTER TABLE matches ADD COLUMN {column} {column_type}")
+
+
+def build_nrr_frame(innings: pd.DataFrame, matches: pd.DataFrame) -> pd.DataFrame:
+    """One row per (match, team) with result flags and the runs / balls that count for NRR"""
+    first_innings = innings[innings['innings'] == 1].set_index('match_id')[['runs', 'legal_balls', 'wickets']]
+    second_innings = innings[innings['innings'] == 2].set_index('match_id')[['runs', 'legal_balls', 'wickets']]
+    frame = (matches.set_index('match_id')
+             .join(first_innings.add_suffix('_1'))
+             .join(second_innings.add_suffix('_2')))
+    frame['batting_first'] = batting_first_team(frame)
+    frame['batting_second'] = frame['team2_name'].where(frame['batting_first'] == frame['team1_name'],
+                                                        frame['team1_name'])
+
+    runs_1 = frame['runs_1'].fillna(0)
+    balls_1 = frame['legal_balls_1'].fillna(0)
+    all_out_1 = frame['wickets_1'].fillna(0) >= ALL_OUT_WICKETS
+    runs_2 = frame['runs_2'].fillna(0)
+    balls_2 = frame['legal_balls_2'].fillna(0)
+    all_out_2 = frame['wickets_2'].fillna(0) >= ALL_OUT_WICKETS
+
+    target_balls = overs_to_balls(frame['target_overs'].astype(float))
+    has_target = frame['target_runs'].notna() & target_balls.gt(0)
+    # A target other than first-innings runs + 1 was revised (DLS / VJD)
+    revised = has_target & frame['target_runs'].ne(runs_1 + 1)
+    reduced = has_target & ~revised & target_balls.lt(FULL_INNINGS_BALLS)
+
+    # A first innings that stopped short of 20 overs without being bowled out was curtailed:
+    # charge the whole overs it had rather than the balls it happened to face
+    curtailed_quota = np.ceil(balls_1 / BALLS_PER_OVER) * BALLS_PER_OVER
+    quota_1 = np.where(reduced, target_balls,
+                       np.where(all_out_1 | (balls_1 >= FULL_INNINGS_BALLS), FULL_INNINGS_BALLS, curtailed_quota))
+    quota_2 = np.where(has_target, target_balls, quota_1)
+
+    charged_runs_1 = np.where(revised, frame['target_runs'] - 1, runs_1)
+    charged_balls_1 = np.where(revised, target_balls, np.where(all_out_1, quota_1, balls_1))
+    charged_balls_2 = np.where(all_out_2, quota_2, balls_2)
+
+    # No result, or no second innings on record: the match counts for points but not NRR
+    counts = (frame['match_winner_name'].notna() & frame['legal_balls_1'].gt(0)
+              & frame['legal_balls_2'].gt(0)).to_numpy()
+
+    def side(team_column: str, runs_for, balls_for, runs_against, balls_against) -> pd.DataFrame:
+        return pd.DataFrame({
+            'match_id': frame.index,
+            'season': frame['season'].to_numpy(),
+            'team': frame[team_column].to_numpy(),
+            'won': (frame['match_winner_name'] == frame[team_column]).to_numpy(),
+            'no_result': frame['match_winner_name'].isna().to_numpy(),
+            'runs_for': np.where(counts, runs_for, 0),
+            'balls_for': np.where(counts, balls_for, 0),
+            'runs_against': np.where(counts, runs_against, 0),
+            'balls_against': np.where(counts, balls_against, 0),
+        })
+
+    sides = pd.concat([
+        side('batting_first', charged_runs_1, charged_balls_1, runs_2, charged_balls_2),
+        side('batting_second', runs_2, charged_balls_2, charged_runs_1, charged_balls_1),
+    ], ignore_index=True)
+    return sides[sides['team'].notna()]
+
+
+def net_run_rate(runs_for: pd.Series, balls_for: pd.Series,
+                 runs_against: pd.Series, balls_against: pd.Series) -> pd.Series:
+    """Runs per over scored minus runs per over conceded (0 before any balls count)"""
+    rate_for = runs_for * BALLS_PER_OVER / balls_for.where(balls_for > 0)
+    rate_against = runs_against * BALLS_PER_OVER / balls_against.where(balls_against > 0)
+    return (rate_for.fillna(0.0) - rate_against.fillna(0.0)).round(3)
+
+
+def season_table(sides: pd.DataFrame) -> pd.DataFrame:
+    """Points table rows (season, team, record, points, NRR) from ``build_nrr_frame`` output"""
+    table = sides.groupby(['season', 'team'], as_index=False).agg(
+        matches=('won', 'size'), wins=('won', 'sum'), no_results=('no_result', 'sum'),
+        runs_for=('runs_for', 'sum'), balls_for=('balls_for', 'sum'),
+        runs_against=('runs_against', 'sum'), balls_against=('balls_against', 'sum'),
+    )
+    table['losses'] = table['matches'] - table['wins'] - table['no_results']
+    table['points'] = table['wins'] * POINTS_PER_WIN + table['no_results'] * POINTS_PER_NO_RESULT
+    table['nrr'] = net_run_rate(table['runs_for'], table['balls_for'], table['runs_against'], table['balls_against'])
+    integer_columns = [column for column in NRR_COLUMNS if column not in ('team', 'nrr')]
+    table[integer_columns] = table[integer_columns].astype(int)
+    return table[list(NRR_COLUMNS)]
+
+
+def load_nrr_inputs(conn: sqlite3.Connection, seasons: Optional[Iterable[int]] = None):
+    """(innings totals, matches) frames for the given seasons (all when None)"""
+    if seasons is None:
+        season_filter, match_filter, params = "", "", []
+    else:
+        params = sorted({int(season) for season in seasons})
+        placeholders = ", ".join('?' for _ in params)
+        season_filter = _SEASON_FILTER.format(placeholders=placeholders)
+        match_filter = f"AND d.match_id IN (SELECT match_id FROM matches {season_filter})"
+    matches = pd.read_sql_query(MATCHES_SQL.format(season_filter=season_filter), conn, params=params)
+    innings = pd.read_sql_query(INNINGS_TOTALS_SQL.format(match_filter=match_filter), conn, params=params)
+    return innings, matches
+
+
+def create_nrr_table(conn: sqlite3.Connection) -> None:
+    """Add match target columns and create team_season_nrr in one transaction (filled by season_engine)"""
+    conn.execute("BEGIN")
+    try:
+        add_match_target_columns(conn)
+        for statement in [stmt.strip() for stmt in NRR_DDL.split(';') if stmt.strip()]:
+            conn.execute(statement)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
@@ -0,0 +1,175 @@
+"""
+Parquet / Arrow IPC export and memory-mapped load path for the cricket database.
+
+``export_tables`` writes ``teams``, ``matches`` and ``deliveries`` next to the
+SQLite database: Parquet with deliveries partitioned by season, or Arrow IPC
+files that are memory-mapped zero-copy on load. A manifest records the
+source database stamp so stale exports are ignored and callers fall back to
+SQLite. The same files can be read by the batch scripts in ``scripts/``.
+"""
+
+import json
+import os
+import sqlite3
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPORT_DIR = Path("data/parquet")
+MANIFEST_NAME = "_manifest.json"
+EXPORT_FORMATS = ('parquet', 'arrow')
+
+EXPORT_QUERIES = {
+    'teams': "SELECT * FROM teams ORDER BY team_id",
+    'matches': "SELECT * FROM matches ORDER BY match_id",
+    # Season is carried on deliveries so the Parquet export can partition by it
+    'deliveries': """
+        SELECT d.*, m.season
+        FROM deliveries d
+        JOIN matches m ON d.match_id = m.match_id
+        ORDER BY d.match_id, d.innings, d.over_number, d.ball_number
+    """,
+}
+
+# ==================== EXPORT ====================
+
+def source_stamp(db_path: Path) -> Dict:
+    """Identity of the source database file used to detect stale derived files"""
+    stat = os.stat(db_path)
+    stamp = {'path': str(db_path), 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+    # In WAL mode committed writes can sit in the -wal file until a checkpoint;
+    # readers may create an empty -wal, which does not change the data
+    wal_path = Path(f"{db_path}-wal")
+    if wal_path.exists() and wal_path.stat().st_size > 0:
+        wal = os.stat(wal_path)
+        stamp['wal_mtime_ns'], stamp['wal_size'] = wal.st_mtime_ns, wal.st_size
+    return stamp
+
+
+def stamp_is_current(stamp: Dict, db_path: Path) -> bool:
+    """True when a stamp recorded by ``source_stamp`` still matches the database"""
+    if not Path(db_path).exists():
+        return False
+    current = source_stamp(Path(db_path))
+    return all(stamp.get(key) == current.get(key)
+               for key in ('mtime_ns', 'size', 'wal_mtime_ns', 'wal_size'))
+
+
+def export_tables(db_path: Path, out_dir: Path = DEFAULT_EXPORT_DIR, fmt: str = 'parquet') -> Dict[str, int]:
+    """Export teams, matches and deliveries; returns row counts per table"""
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow is required for Parquet/Arrow export: pip install pyarrow")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}, expected one of {EXPORT_FORMATS}")
+
+    db_path = Path(db_path)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    _remove_previous_export(out_dir)
+
+    counts = {}
+    conn = sqlite3.connect(db_path)
+    try:
+        for name, query in EXPORT_QUERIES.items():
+            table = pa.Table.from_pandas(pd.read_sql_query(query, conn), preserve_index=False)
+            counts[name] = table.num_rows
+            if fmt == 'arrow':
+                # Uncompressed IPC so readers can memory-map the buffers directly
+                with pa.OSFile(str(out_dir / f"{name}.arrow"), 'wb') as sink:
+                    with ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+            elif name == 'deliveries':
+                pq.write_to_dataset(table, root_path=str(out_dir / name), partition_cols=['season'])
+            else:
+                pq.write_table(table, str(out_dir / f"{name}.parquet"))
+    finally:
+        conn.close()
+
+    manifest = {
+        'format': fmt,
+        'source': source_stamp(db_path),
+        'exported_at': datetime.now().isoformat(timespec='seconds'),
+        'tables': counts,
+    }
+    (out_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+    logger.info(f"Exported {counts} as {fmt} to {out_dir}")
+    return counts
+
+
+def _remove_previous_export(out_dir: Path) -> None:
+    """Delete files from an earlier export so formats/partitions never mix"""
+    manifest_path = out_dir / MANIFEST_NAME
+    if manifest_path.exists():
+        manifest_path.unlink()
+    for name in EXPORT_QUERIES:
+        for path in (out_dir / f"{name}.arrow", out_dir / f"{name}.parquet"):
+            if path.exists():
+                path.unlink()
+        dataset_dir = out_dir / name
+        if dataset_dir.is_dir():
+            for part in sorted(dataset_dir.rglob('*'), reverse=True):
+                part.unlink() if part.is_file() else part.rmdir()
+            dataset_dir.rmdir()
+
+# ==================== LOAD ====================
+
+def read_manifest(export_dir: Path = DEFAULT_EXPORT_DIR) -> Optional[Dict]:
+    """Export manifest, or None if nothing has been exported"""
+    manifest_path = Path(export_dir) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return None
+    return json.loads(manifest_path.read_text())
+
+
+def export_is_current(db_path: Path, export_dir: Path = DEFAULT_EXPORT_DIR) -> bool:
+    """True when pyarrow is installed and the export matches the database file"""
+    if not PYARROW_AVAILABLE or not Path(db_path).exists():
+        return False
+    manifest = read_manifest(export_dir)
+    if manifest is None:
+        return False
+    return stamp_is_current(manifest['source'], db_path)
+
+
+def read_table(name: str, export_dir: Path = DEFAULT_EXPORT_DIR,
+               columns: Optional[List[str]] = None) -> 'pa.Table':
+    """Memory-map an exported table (zero-copy for Arrow IPC)"""
+    export_dir = Path(export_dir)
+    arrow_path = export_dir / f"{name}.arrow"
+    if arrow_path.exists():
+        table = ipc.open_file(pa.memory_map(str(arrow_path), 'r')).read_all()
+        return table.select(columns) if columns else table
+
+    parquet_path = export_dir / f"{name}.parquet"
+    if parquet_path.exists():
+        return pq.read_table(str(parquet_path), columns=columns, memory_map=True)
+
+    dataset_dir = export_dir / name
+    if dataset_dir.is_dir():
+        # Partition columns (season) are restored from the directory names
+        table = pq.read_table(str(dataset_dir), columns=columns, memory_map=True)
+        if 'season' in table.column_names and pa.types.is_dictionary(table.schema.field('season').type):
+            index = table.column_names.index('season')
+            table = table.set_column(index, 'season', table.column('season').cast(pa.int64()))
+        return table
+
+    raise FileNotFoundError(f"No exported table {name!r} in {export_dir}")
+
+
+def read_frame(name: str, export_dir: Path = DEFAULT_EXPORT_DIR,
+               columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Exported table as a DataFrame (numeric columns avoid consolidation copies)"""
+    return read_table(name, export_dir, columns).to_pandas(split_blocks=True)
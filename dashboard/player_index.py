@@ -0,0 +1,247 @@
+"""
+In-memory player index: picker directory, batched comparisons and career profiles.
+
+``PlayerIndex.from_connection`` runs one grouped query over the
+batter_innings / bowler_innings aggregates (``player_season_stats``: one row
+per player and season, both disciplines side by side) plus the career-best
+innings queries. Given the columnar deliveries store and the phase cube, it
+also precomputes:
+
+- dismissal types, both how a player got out and how their wickets fell;
+- phase splits;
+- records against each opponent.
+
+Everything is computed once for all players with vectorized group-bys and
+partitioned by player name. ``profile(name)`` is a few dictionary lookups
+and row slices, so its cost doesn't grow with the number of seasons loaded.
+``compare`` serves the Player Records comparison from the same data.
+"""
+
+import sqlite3
+import logging
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from columnar_store import DeliveriesStore
+from phase_cube import PhaseCube
+from queries import run_query
+
+logger = logging.getLogger(__name__)
+
+SUM_COLUMNS = ('matches', 'innings', 'runs', 'balls', 'fours', 'sixes', 'dismissals',
+               'bowling_innings', 'balls_bowled', 'runs_conceded', 'wickets')
+MAX_COLUMNS = ('highest_score', 'best_wickets')
+
+# Not dismissals for batting records (matches batter_innings.dismissals)
+NOT_OUT_KINDS = ('retired hurt', 'retired not out')
+
+
+class PlayerComparison(NamedTuple):
+    summary: pd.DataFrame   # one row per player, in the order asked for
+    seasons: pd.DataFrame   # player x season runs / wickets / strike rate / economy
+    phases: pd.DataFrame    # player x phase batting strike rate and bowling economy
+
+
+class PlayerProfile(NamedTuple):
+    name: str
+    career: Dict[str, Any]
+    seasons: pd.DataFrame
+    best_batting: Optional[Dict[str, Any]] = None    # runs, balls, not_out, season
+    best_bowling: Optional[Dict[str, Any]] = None    # wickets, runs, season
+    dismissals: pd.DataFrame = pd.DataFrame()        # how the player was out
+    wicket_kinds: pd.DataFrame = pd.DataFrame()      # how the player's wickets fell
+    batting_phases: pd.DataFrame = pd.DataFrame()
+    bowling_phases: pd.DataFrame = pd.DataFrame()
+    batting_opponents: pd.DataFrame = pd.DataFrame()
+    bowling_opponents: pd.DataFrame = pd.DataFrame()
+
+    @property
+    def highest_score(self) -> str:
+        """e.g. ``"109*"`` (not out), ``"-"`` if the player never batted"""
+        if not self.best_batting:
+            return "-"
+        return f"{int(self.best_batting['runs'])}{'*' if self.best_batting['not_out'] else ''}"
+
+    @property
+    def best_figures(self) -> str:
+        """e.g. ``"5/17"``, ``"-"`` if the player never bowled"""
+        if not self.best_bowling:
+            return "-"
+        return f"{int(self.best_bowling['wickets'])}/{int(self.best_bowling['runs'])}"
+
+
+def _ratio(numerator: pd.Series, denominator: pd.Series, scale: float = 1.0) -> pd.Series:
+    return (numerator * scale / denominator.where(denominator > 0)).round(2)
+
+
+def add_player_rates(frame: pd.DataFrame) -> pd.DataFrame:
+    """Batting and bowling rates for summed player rows"""
+    return frame.assign(
+        average=_ratio(frame['runs'], frame['dismissals']),
+        strike_rate=_ratio(frame['runs'], frame['balls'], 100.0),
+        economy=_ratio(frame['runs_conceded'], frame['balls_bowled'], 6.0),
+        bowling_average=_ratio(frame['runs_conceded'], frame['wickets']),
+    )
+
+
+def career_totals(season_rows: pd.DataFrame) -> pd.DataFrame:
+    """Per-player totals and rates from player_season_stats rows (indexed by player)"""
+    grouped = season_rows.groupby(level='player', sort=True).agg(
+        {**{column: 'sum' for column in SUM_COLUMNS}, **{column: 'max' for column in MAX_COLUMNS},
+         'season': 'nunique'}
+    ).rename(columns={'season': 'seasons'})
+    return add_player_rates(grouped)
+
+
+class _Partition:
+    """Rows of a frame grouped by player, sliced by name without searching"""
+
+    def __init__(self, frame: pd.DataFrame, key: str = 'player'):
+        names = frame[key].astype(str).to_numpy()
+        order = np.argsort(names, kind='stable')
+        names = names[order]
+        self.frame = frame.drop(columns=key).iloc[order].reset_index(drop=True)
+        starts = np.flatnonzero(np.r_[True, names[1:] != names[:-1]]) if len(names) else np.array([], dtype=int)
+        ends = np.r_[starts[1:], len(names)].astype(int)
+        self.offsets = dict(zip(names[starts], zip(starts.tolist(), ends.tolist())))
+
+    def get(self, name: str) -> pd.DataFrame:
+        start, end = self.offsets.get(name, (0, 0))
+        return self.frame.iloc[start:end].reset_index(drop=True)
+
+
+class PlayerIndex:
+    """Per-player season rows, careers and profile splits, precomputed for every player"""
+
+    def __init__(self, season_stats: pd.DataFrame, cube: Optional[PhaseCube] = None,
+                 store: Optional[DeliveriesStore] = None, best_batting: Optional[pd.DataFrame] = None,
+                 best_bowling: Optional[pd.DataFrame] = None):
+        self.season_stats = season_stats.set_index('player').sort_index()
+        self.cube = cube
+        self.players: List[str] = self.season_stats.index.unique().tolist()
+        self.careers = career_totals(self.season_stats)
+        self._career_rows = self.careers.to_dict('index')
+        self._seasons = _Partition(add_player_rates(self.season_stats.reset_index()))
+        self._best_batting = self._records(best_batting)
+        self._best_bowling = self._records(best_bowling)
+        self._splits: Dict[str, _Partition] = {}
+        if cube is not None:
+            self._build_cube_splits(cube, store)
+        if store is not None:
+            self._build_dismissal_splits(store)
+
+    def __contains__(self, player: str) -> bool:
+        return player in self._career_rows
+
+    @classmethod
+    def from_connection(cls, conn: sqlite3.Connection, cube: Optional[PhaseCube] = None,
+                        store: Optional[DeliveriesStore] = None) -> 'PlayerIndex':
+        start = time.perf_counter()
+        index = cls(run_query(conn, 'player_season_stats'), cube, store,
+                    run_query(conn, 'player_best_batting'), run_query(conn, 'player_best_bowling'))
+        logger.info(f"Built player index: {len(index.players):,} players, {len(index.season_stats):,} "
+                    f"player seasons in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return index
+
+    # ==================== BUILD ====================
+
+    @staticmethod
+    def _records(frame: Optional[pd.DataFrame]) -> Dict[str, Dict[str, Any]]:
+        if frame is None or frame.empty:
+            return {}
+        return frame.drop_duplicates('player').set_index('player').to_dict('index')
+
+    def _build_cube_splits(self, cube: PhaseCube, store: Optional[DeliveriesStore]) -> None:
+        batting_phases = cube.slice('batting', ('player', 'phase'))
+        bowling_phases = cube.slice('bowling', ('player', 'phase'))
+        self._splits['batting_phases'] = _Partition(batting_phases[
+            ['player', 'phase', 'player_runs', 'faced', 'wickets', 'fours', 'sixes', 'dots', 'strike_rate',
+             'dot_pct', 'boundary_pct']].rename(columns={'player_runs': 'runs', 'faced': 'balls'}))
+        self._splits['bowling_phases'] = _Partition(bowling_phases[
+            ['player', 'phase', 'balls', 'player_runs', 'player_wickets', 'dots', 'economy', 'dot_pct',
+             'boundary_pct']].rename(columns={'player_runs': 'runs', 'player_wickets': 'wickets'}))
+
+        batting_opponents = cube.slice('batting', ('player', 'bowling_team'))[
+            ['player', 'bowling_team', 'player_runs', 'faced', 'fours', 'sixes', 'strike_rate']].rename(
+            columns={'bowling_team': 'opponent', 'player_runs': 'runs', 'faced': 'balls'})
+        if store is not None:
+            # Dismissals by opponent come from player_out (the striker isn't always the one out)
+            outs = store.aggregate(['player_out', 'bowling_team', 'wicket_kind'], {'outs': ('count',)},
+                                   mask=store.mask(innings=[1, 2]))
+            outs = outs[~outs['wicket_kind'].isin(NOT_OUT_KINDS)]
+            outs = outs.groupby(['player_out', 'bowling_team'], as_index=False)['outs'].sum().rename(
+                columns={'player_out': 'player', 'bowling_team': 'opponent'})
+            batting_opponents[['player', 'opponent']] = batting_opponents[['player', 'opponent']].astype(str)
+            batting_opponents = batting_opponents.merge(outs, on=['player', 'opponent'], how='left')
+            batting_opponents['outs'] = batting_opponents['outs'].fillna(0).astype(int)
+            batting_opponents['average'] = _ratio(batting_opponents['runs'], batting_opponents['outs'])
+        self._splits['batting_opponents'] = _Partition(batting_opponents.sort_values('runs', ascending=False))
+
+        bowling_opponents = cube.slice('bowling', ('player', 'batting_team'))[
+            ['player', 'batting_team', 'balls', 'player_runs', 'player_wickets', 'economy']].rename(
+            columns={'batting_team': 'opponent', 'player_runs': 'runs', 'player_wickets': 'wickets'})
+        self._splits['bowling_opponents'] = _Partition(bowling_opponents.sort_values('wickets', ascending=False))
+
+    def _build_dismissal_splits(self, store: DeliveriesStore) -> None:
+        outs = store.aggregate(['player_out', 'wicket_kind'], {'count': ('count',)})
+        outs = outs[~outs['wicket_kind'].isin(NOT_OUT_KINDS)].rename(
+            columns={'player_out': 'player', 'wicket_kind': 'kind'})
+        self._splits['dismissals'] = _Partition(outs.sort_values('count', ascending=False))
+
+        wickets = store.aggregate(['bowler', 'wicket_kind'], {'count': ('sum', 'bowler_wicket')},
+                                  mask=store.mask(bowler_wicket=True))
+        wickets = wickets.rename(columns={'bowler': 'player', 'wicket_kind': 'kind'})
+        self._splits['wicket_kinds'] = _Partition(wickets.sort_values('count', ascending=False))
+
+    # ==================== LOOKUPS ====================
+
+    def _rows(self, players: Sequence[str], season: Optional[int] = None) -> pd.DataFrame:
+        known = [player for player in players if player in self._career_rows]
+        rows = self.season_stats.loc[known].reset_index()
+        return rows if season is None else rows[rows['season'] == season]
+
+    def summary(self, players: Sequence[str], season: Optional[int] = None) -> pd.DataFrame:
+        """Career (or single-season) totals and rates, one row per player in ``players`` order"""
+        if season is None:
+            grouped = self.careers
+        else:
+            grouped = career_totals(self._rows(players, season).set_index('player'))
+        # Players with no rows (unknown, or absent that season) still get an all-zero row
+        columns = list(SUM_COLUMNS) + list(MAX_COLUMNS) + ['seasons']
+        grouped = grouped[columns].reindex(list(players), fill_value=0).rename_axis('player').reset_index()
+        return add_player_rates(grouped)
+
+    def seasons(self, players: Sequence[str]) -> pd.DataFrame:
+        """Season-by-season rows for ``players``"""
+        return add_player_rates(self._rows(players))
+
+    def phases(self, players: Sequence[str], season: Optional[int] = None) -> pd.DataFrame:
+        """Batting strike rate and bowling economy per phase for ``players``"""
+        if self.cube is None:
+            return pd.DataFrame(columns=['player', 'phase'])
+        batting = self.cube.slice('batting', ('player', 'phase'), player=list(players), season=season)
+        bowling = self.cube.slice('bowling', ('player', 'phase'), player=list(players), season=season)
+        batting = batting[['player', 'phase', 'player_runs', 'faced', 'strike_rate']].rename(
+            columns={'player_runs': 'runs', 'faced': 'balls'})
+        bowling = bowling[['player', 'phase', 'balls', 'player_wickets', 'economy']].rename(
+            columns={'balls': 'balls_bowled', 'player_wickets': 'wickets'})
+        for frame in (batting, bowling):
+            frame['player'] = frame['player'].astype(str)
+        return batting.merge(bowling, on=['player', 'phase'], how='outer')
+
+    def compare(self, players: Sequence[str], season: Optional[int] = None) -> PlayerComparison:
+        """Summary, season and phase splits for every player in one call"""
+        return PlayerComparison(self.summary(players, season), self.seasons(players),
+                                self.phases(players, season))
+
+    def profile(self, name: str) -> Optional[PlayerProfile]:
+        """Career profile from precomputed rows (None for an unknown player)"""
+        career = self._career_rows.get(name)
+        if career is None:
+            return None
+        splits = {key: partition.get(name) for key, partition in self._splits.items()}
+        return PlayerProfile(name, career, self._seasons.get(name), self._best_batting.get(name),
+                             self._best_bowling.get(name), **splits)
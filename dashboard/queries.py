@@ -0,0 +1,597 @@
+"""
+Registry of every SQL statement the dashboard runs.
+
+Queries are declared once with named (``:team``) parameters and executed
+through ``run_query`` / ``run_scalar``. Because the SQL text never changes,
+sqlite3's per-connection statement cache prepares each query only once
+(connections should be opened with ``cached_statements=STATEMENT_CACHE_SIZE``),
+and values are always bound - team names with apostrophes are safe. Every
+execution is timed; ``query_stats`` summarizes calls and latency per query.
+"""
+
+import re
+import sqlite3
+import logging
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import pandas as pd
+
+from aggregates import NON_BOWLER_DISMISSALS
+
+logger = logging.getLogger(__name__)
+
+_PARAM_PATTERN = re.compile(r'(?<!:):(\w+)')
+_NON_BOWLER_SQL = ", ".join(f"'{kind}'" for kind in NON_BOWLER_DISMISSALS)
+
+
+class Query(NamedTuple):
+    query_id: str
+    sql: str
+    sample: Dict[str, Any]  # representative parameters, used by the plan report
+
+    @property
+    def param_names(self) -> set:
+        return set(_PARAM_PATTERN.findall(self.sql))
+
+
+QUERIES: Dict[str, Query] = {}
+
+
+def register(query_id: str, sql: str, **sample) -> Query:
+    """Declare a query; ``sample`` gives example values for every parameter"""
+    if query_id in QUERIES:
+        raise ValueError(f"Duplicate query id: {query_id}")
+    query = Query(query_id, sql, sample)
+    missing = query.param_names - set(sample)
+    if missing:
+        raise ValueError(f"Query {query_id} has no sample value for: {', '.join(sorted(missing))}")
+    QUERIES[query_id] = query
+    return query
+
+
+def register_season_variants(query_id: str, sql: str, **sample) -> None:
+    """Register ``query_id`` (all time) and ``query_id_by_season`` from a {season_filter} template"""
+    register(query_id, sql.format(season_filter=""), **sample)
+    register(f"{query_id}_by_season", sql.format(season_filter="WHERE season = :season"),
+             season=2024, **sample)
+
+
+def season_query(query_id: str, season: Optional[int]) -> Tuple[str, Dict[str, Any]]:
+    """Query id and extra params for an all-time or single-season variant"""
+    if season is None:
+        return query_id, {}
+    return f"{query_id}_by_season", {'season': int(season)}
+
+# ==================== DATA AVAILABILITY ====================
+
+register('has_deliveries', "SELECT MIN(match_id) FROM deliveries")
+
+register('data_quality_coverage', """
+    SELECT COUNT(*) FROM matches m
+    WHERE EXISTS (SELECT 1 FROM deliveries d WHERE d.match_id = m.match_id)
+""")
+
+register('teams_all', "SELECT * FROM teams ORDER BY team_name")
+
+register('matches_all', "SELECT * FROM matches ORDER BY match_date DESC")
+
+# ==================== TEAMS ====================
+
+register('team_stats', """
+    WITH team_matches AS (
+        SELECT team1_name as team FROM matches
+        UNION ALL SELECT team2_name as team FROM matches
+    ),
+    team_wins AS (
+        SELECT match_winner_name as team FROM matches WHERE match_winner_name IS NOT NULL
+    )
+    SELECT
+        tm.team,
+        COUNT(*) as matches_played,
+        COALESCE(tw.wins, 0) as wins,
+        COUNT(*) - COALESCE(tw.wins, 0) as losses,
+        ROUND(100.0 * COALESCE(tw.wins, 0) / COUNT(*), 1) as win_percentage
+    FROM team_matches tm
+    LEFT JOIN (SELECT team, COUNT(*) as wins FROM team_wins GROUP BY team) tw
+    ON tm.team = tw.team
+    WHERE tm.team IS NOT NULL
+    GROUP BY tm.team
+    ORDER BY win_percentage DESC
+""")
+
+register('head_to_head', """
+    SELECT COUNT(*) as total,
+        SUM(CASE WHEN match_winner_name = :team1 THEN 1 ELSE 0 END) as team1_wins,
+        SUM(CASE WHEN match_winner_name = :team2 THEN 1 ELSE 0 END) as team2_wins
+    FROM matches
+    WHERE (team1_name = :team1 AND team2_name = :team2)
+       OR (team1_name = :team2 AND team2_name = :team1)
+""", team1='Mumbai Indians', team2='Chennai Super Kings')
+
+# Team NRR reads the league-stage team_season_nrr aggregate (season_engine.py); all-time NRR
+# re-derives the rate from summed runs and charged balls, not an average of rates
+register('team_nrr', """
+    SELECT team,
+           SUM(matches) as matches,
+           SUM(runs_for) as runs_for,
+           SUM(balls_for) as balls_for,
+           SUM(runs_against) as runs_against,
+           SUM(balls_against) as balls_against,
+           ROUND(COALESCE(SUM(runs_for) * 6.0 / NULLIF(SUM(balls_for), 0), 0)
+                 - COALESCE(SUM(runs_against) * 6.0 / NULLIF(SUM(balls_against), 0), 0), 3) as nrr
+    FROM team_season_nrr
+    WHERE team = :team
+    GROUP BY team
+""", team='Mumbai Indians')
+
+# ==================== SEASONS ====================
+
+register('season_points_table', """
+    SELECT team, matches, wins, losses, no_results, points, nrr,
+           runs_for, balls_for, runs_against, balls_against
+    FROM team_season_nrr
+    WHERE season = :season
+    ORDER BY points DESC, nrr DESC, team
+""", season=2024)
+
+# Standings after every league match and playoff results (season_engine.py)
+register('season_standings_race', """
+    SELECT match_number, match_date, team, played, wins, points, nrr, position
+    FROM season_standings
+    WHERE season = :season
+    ORDER BY match_number, position
+""", season=2024)
+
+register('season_result', """
+    SELECT league_matches, playoff_matches, league_leader, champion, runner_up, final_match_id
+    FROM season_results
+    WHERE season = :season
+""", season=2024)
+
+register('season_playoffs', """
+    SELECT match_id, match_date, stage, team1_name, team2_name, match_winner_name,
+           win_by_runs, win_by_wickets, venue
+    FROM matches
+    WHERE season = :season AND stage != 'League'
+    ORDER BY match_date, match_id
+""", season=2024)
+
+register('season_scoring_trends', """
+    SELECT m.season,
+           AVG(d.total_runs) as avg_runs_per_ball,
+           COUNT(DISTINCT m.match_id) as matches
+    FROM matches m
+    JOIN deliveries d ON m.match_id = d.match_id
+    GROUP BY m.season
+    ORDER BY m.season
+""")
+
+# ==================== PLAYERS ====================
+# Leaderboards read the batter_innings / bowler_innings aggregates (aggregates.py)
+
+register('player_directory', """
+    SELECT batter as player FROM batter_innings WHERE batter IS NOT NULL
+    UNION
+    SELECT bowler as player FROM bowler_innings WHERE bowler IS NOT NULL
+    ORDER BY player
+""")
+
+# One row per player and season with both disciplines (player_index.py)
+register('player_season_stats', """
+    SELECT player, season,
+           COUNT(DISTINCT match_id) as matches,
+           SUM(batted) as innings,
+           SUM(runs) as runs,
+           SUM(balls) as balls,
+           SUM(fours) as fours,
+           SUM(sixes) as sixes,
+           SUM(dismissals) as dismissals,
+           MAX(runs_in_innings) as highest_score,
+           SUM(bowled) as bowling_innings,
+           SUM(legal_balls) as balls_bowled,
+           SUM(runs_conceded) as runs_conceded,
+           SUM(wickets) as wickets,
+           MAX(wickets_in_innings) as best_wickets
+    FROM (
+        SELECT batter as player, season, match_id, 1 as batted, runs, balls, fours, sixes, dismissals,
+               runs as runs_in_innings, 0 as bowled, 0 as legal_balls, 0 as runs_conceded, 0 as wickets,
+               0 as wickets_in_innings
+        FROM batter_innings
+        UNION ALL
+        SELECT bowler, season, match_id, 0, 0, 0, 0, 0, 0, 0, 1, legal_balls, runs_conceded, wickets, wickets
+        FROM bowler_innings
+    )
+    WHERE player IS NOT NULL
+    GROUP BY player, season
+    ORDER BY player, season
+""")
+
+# Career-best innings per player (player_index.py profiles)
+register('player_best_batting', """
+    SELECT player, runs, balls, not_out, season
+    FROM (
+        SELECT batter as player, runs, balls, dismissals = 0 as not_out, season,
+               ROW_NUMBER() OVER (PARTITION BY batter ORDER BY runs DESC, dismissals ASC, balls ASC) as rank
+        FROM batter_innings
+        WHERE batter IS NOT NULL
+    )
+    WHERE rank = 1
+""")
+
+register('player_best_bowling', """
+    SELECT player, wickets, runs, season
+    FROM (
+        SELECT bowler as player, wickets, runs_conceded as runs, season,
+               ROW_NUMBER() OVER (PARTITION BY bowler ORDER BY wickets DESC, runs_conceded ASC) as rank
+        FROM bowler_innings
+        WHERE bowler IS NOT NULL AND legal_balls > 0
+    )
+    WHERE rank = 1
+""")
+
+register('top_run_scorers', """
+    SELECT batter as player,
+           SUM(runs) as total_runs,
+           COUNT(DISTINCT match_id) as matches,
+           ROUND(SUM(runs) * 1.0 / COUNT(DISTINCT match_id), 1) as avg_per_match
+    FROM batter_innings
+    GROUP BY batter
+    ORDER BY total_runs DESC
+    LIMIT :limit
+""", limit=10)
+
+register('top_wicket_takers', """
+    SELECT bowler as player,
+           SUM(wickets) as total_wickets,
+           COUNT(DISTINCT match_id) as matches,
+           ROUND(SUM(wickets) * 1.0 / COUNT(DISTINCT match_id), 2) as avg_per_match
+    FROM bowler_innings
+    GROUP BY bowler
+    ORDER BY total_wickets DESC
+    LIMIT :limit
+""", limit=10)
+
+register_season_variants('batting_leaders', """
+    SELECT batter as player,
+           COUNT(DISTINCT match_id) as matches,
+           SUM(runs) as total_runs,
+           MAX(runs) as highest_score,
+           ROUND(AVG(runs), 1) as average,
+           ROUND(SUM(runs) * 100.0 / NULLIF(SUM(balls), 0), 1) as strike_rate,
+           SUM(sixes) as sixes,
+           SUM(fours) as fours
+    FROM batter_innings
+    {season_filter}
+    GROUP BY batter
+    HAVING COUNT(DISTINCT match_id) >= :min_matches
+    ORDER BY total_runs DESC
+    LIMIT :limit
+""", min_matches=1, limit=15)
+
+register_season_variants('strike_rate_leaders', """
+    SELECT batter as player,
+           COUNT(DISTINCT match_id) as matches,
+           SUM(runs) as total_runs,
+           SUM(balls) as balls_faced,
+           ROUND(SUM(runs) * 100.0 / NULLIF(SUM(balls), 0), 1) as strike_rate,
+           SUM(sixes) as sixes
+    FROM batter_innings
+    {season_filter}
+    GROUP BY batter
+    HAVING COUNT(DISTINCT match_id) >= :min_matches AND SUM(runs) >= :min_runs
+    ORDER BY strike_rate DESC
+    LIMIT :limit
+""", min_matches=1, min_runs=0, limit=15)
+
+register_season_variants('bowling_leaders', """
+    SELECT bowler as player,
+           COUNT(DISTINCT match_id) as matches,
+           SUM(wickets) as total_wickets,
+           SUM(legal_balls) as balls_bowled,
+           SUM(runs_conceded) as runs_conceded,
+           ROUND(SUM(runs_conceded) * 6.0 / NULLIF(SUM(legal_balls), 0), 2) as economy,
+           ROUND(SUM(runs_conceded) * 1.0 / NULLIF(SUM(wickets), 0), 1) as average,
+           ROUND(SUM(legal_balls) * 1.0 / NULLIF(SUM(wickets), 0), 1) as strike_rate
+    FROM bowler_innings
+    {season_filter}
+    GROUP BY bowler
+    HAVING COUNT(DISTINCT match_id) >= :min_matches
+    ORDER BY total_wickets DESC
+    LIMIT :limit
+""", min_matches=1, limit=15)
+
+register_season_variants('economy_leaders', """
+    SELECT bowler as player,
+           COUNT(DISTINCT match_id) as matches,
+           SUM(wickets) as wickets,
+           SUM(legal_balls) as balls_bowled,
+           SUM(runs_conceded) as runs_conceded,
+           ROUND(SUM(runs_conceded) * 6.0 / NULLIF(SUM(legal_balls), 0), 2) as economy
+    FROM bowler_innings
+    {season_filter}
+    GROUP BY bowler
+    HAVING COUNT(DISTINCT match_id) >= :min_matches AND SUM(legal_balls) >= :min_balls
+    ORDER BY economy ASC
+    LIMIT :limit
+""", min_matches=1, min_balls=0, limit=15)
+
+register('highest_scores', """
+    SELECT batter as player, runs
+    FROM batter_innings
+    ORDER BY runs DESC
+    LIMIT :limit
+""", limit=5)
+
+register('best_bowling_figures', """
+    SELECT bowler as player, wickets, runs_conceded as runs
+    FROM bowler_innings
+    ORDER BY wickets DESC, runs_conceded ASC
+    LIMIT :limit
+""", limit=5)
+
+register_season_variants('most_sixes', """
+    SELECT batter as player, SUM(sixes) as total_sixes
+    FROM batter_innings
+    {season_filter}
+    GROUP BY batter
+    ORDER BY total_sixes DESC
+    LIMIT :limit
+""", limit=5)
+
+# ==================== AI INTENTS ====================
+# Templates the AI Dashboard's local intent engine (intent_engine.py) answers with
+
+register('matches_per_season', """
+    SELECT season, COUNT(*) as matches
+    FROM matches
+    GROUP BY season
+    ORDER BY season
+""")
+
+register('season_match_count', """
+    SELECT season,
+           COUNT(*) as matches,
+           COUNT(DISTINCT venue) as venues,
+           MIN(match_date) as first_match,
+           MAX(match_date) as last_match
+    FROM matches
+    WHERE season = :season
+    GROUP BY season
+""", season=2019)
+
+register('season_team_standings', """
+    WITH team_matches AS (
+        SELECT team1_name as team, match_winner_name FROM matches WHERE season = :season
+        UNION ALL
+        SELECT team2_name as team, match_winner_name FROM matches WHERE season = :season
+    )
+    SELECT team,
+           COUNT(*) as matches_played,
+           SUM(CASE WHEN match_winner_name = team THEN 1 ELSE 0 END) as wins,
+           ROUND(100.0 * SUM(CASE WHEN match_winner_name = team THEN 1 ELSE 0 END) / COUNT(*), 1) as win_percentage
+    FROM team_matches
+    WHERE team IS NOT NULL
+    GROUP BY team
+    ORDER BY wins DESC, win_percentage DESC
+""", season=2019)
+
+register('team_record', """
+    SELECT :team as team,
+           COUNT(*) as matches_played,
+           SUM(CASE WHEN match_winner_name = :team THEN 1 ELSE 0 END) as wins,
+           SUM(CASE WHEN match_winner_name IS NOT NULL AND match_winner_name != :team THEN 1 ELSE 0 END) as losses,
+           ROUND(100.0 * SUM(CASE WHEN match_winner_name = :team THEN 1 ELSE 0 END) / COUNT(*), 1) as win_percentage,
+           COUNT(DISTINCT season) as seasons
+    FROM matches
+    WHERE team1_name = :team OR team2_name = :team
+""", team='Mumbai Indians')
+
+register('team_season_record', """
+    SELECT :team as team, :season as season,
+           COUNT(*) as matches_played,
+           SUM(CASE WHEN match_winner_name = :team THEN 1 ELSE 0 END) as wins,
+           SUM(CASE WHEN match_winner_name IS NOT NULL AND match_winner_name != :team THEN 1 ELSE 0 END) as losses,
+           ROUND(100.0 * SUM(CASE WHEN match_winner_name = :team THEN 1 ELSE 0 END) / COUNT(*), 1) as win_percentage
+    FROM matches
+    WHERE season = :season AND (team1_name = :team OR team2_name = :team)
+""", team='Mumbai Indians', season=2019)
+
+register('team_comparison', """
+    SELECT :team1 as team,
+           COUNT(*) as matches_played,
+           SUM(CASE WHEN match_winner_name = :team1 THEN 1 ELSE 0 END) as wins,
+           ROUND(100.0 * SUM(CASE WHEN match_winner_name = :team1 THEN 1 ELSE 0 END) / COUNT(*), 1) as win_percentage
+    FROM matches
+    WHERE team1_name = :team1 OR team2_name = :team1
+    UNION ALL
+    SELECT :team2 as team,
+           COUNT(*) as matches_played,
+           SUM(CASE WHEN match_winner_name = :team2 THEN 1 ELSE 0 END) as wins,
+           ROUND(100.0 * SUM(CASE WHEN match_winner_name = :team2 THEN 1 ELSE 0 END) / COUNT(*), 1) as win_percentage
+    FROM matches
+    WHERE team1_name = :team2 OR team2_name = :team2
+""", team1='Mumbai Indians', team2='Chennai Super Kings')
+
+register('head_to_head_record', """
+    WITH meetings AS (
+        SELECT match_winner_name FROM matches
+        WHERE (team1_name = :team1 AND team2_name = :team2)
+           OR (team1_name = :team2 AND team2_name = :team1)
+    )
+    SELECT :team1 as team, COUNT(*) as matches_played,
+           SUM(CASE WHEN match_winner_name = :team1 THEN 1 ELSE 0 END) as wins
+    FROM meetings
+    UNION ALL
+    SELECT :team2 as team, COUNT(*) as matches_played,
+           SUM(CASE WHEN match_winner_name = :team2 THEN 1 ELSE 0 END) as wins
+    FROM meetings
+""", team1='Mumbai Indians', team2='Chennai Super Kings')
+
+register('player_summary', """
+    WITH batting AS (
+        SELECT COUNT(DISTINCT match_id) as matches,
+               SUM(runs) as total_runs,
+               MAX(runs) as highest_score,
+               ROUND(SUM(runs) * 100.0 / NULLIF(SUM(balls), 0), 1) as strike_rate,
+               SUM(fours) as fours,
+               SUM(sixes) as sixes
+        FROM batter_innings
+        WHERE batter = :player
+    ),
+    bowling AS (
+        SELECT COUNT(DISTINCT match_id) as matches,
+               SUM(wickets) as total_wickets,
+               ROUND(SUM(runs_conceded) * 6.0 / NULLIF(SUM(legal_balls), 0), 2) as economy
+        FROM bowler_innings
+        WHERE bowler = :player
+    )
+    SELECT :player as player,
+           MAX(batting.matches, bowling.matches) as matches,
+           batting.total_runs, batting.highest_score, batting.strike_rate, batting.fours, batting.sixes,
+           bowling.total_wickets, bowling.economy
+    FROM batting, bowling
+""", player='V Kohli')
+
+register('batter_vs_bowler', f"""
+    SELECT batter, bowler,
+           SUM(CASE WHEN is_wide_ball = 0 THEN 1 ELSE 0 END) as balls,
+           SUM(batter_runs) as runs,
+           SUM(CASE WHEN is_wicket = 1 AND player_out = batter
+                     AND wicket_kind NOT IN ({_NON_BOWLER_SQL}) THEN 1 ELSE 0 END) as dismissals,
+           ROUND(SUM(batter_runs) * 100.0 / NULLIF(SUM(CASE WHEN is_wide_ball = 0 THEN 1 ELSE 0 END), 0), 1) as strike_rate
+    FROM deliveries
+    WHERE (batter = :player1 AND bowler = :player2)
+       OR (batter = :player2 AND bowler = :player1)
+    GROUP BY batter, bowler
+    ORDER BY balls DESC
+""", player1='V Kohli', player2='JJ Bumrah')
+
+register('venue_summary', """
+    SELECT venue,
+           COUNT(*) as matches,
+           SUM(CASE WHEN win_by_runs > 0 THEN 1 ELSE 0 END) as batting_first_wins,
+           SUM(CASE WHEN win_by_wickets > 0 THEN 1 ELSE 0 END) as chasing_wins,
+           MIN(season) as first_season,
+           MAX(season) as last_season
+    FROM matches
+    WHERE venue = :venue
+    GROUP BY venue
+""", venue='Wankhede Stadium')
+
+register('team_venue_record', """
+    SELECT :team as team, :venue as venue,
+           COUNT(*) as matches_played,
+           SUM(CASE WHEN match_winner_name = :team THEN 1 ELSE 0 END) as wins,
+           ROUND(100.0 * SUM(CASE WHEN match_winner_name = :team THEN 1 ELSE 0 END) / COUNT(*), 1) as win_percentage
+    FROM matches
+    WHERE venue = :venue AND (team1_name = :team OR team2_name = :team)
+""", team='Mumbai Indians', venue='Wankhede Stadium')
+
+register('venue_run_scorers', """
+    SELECT b.batter as player,
+           COUNT(DISTINCT b.match_id) as matches,
+           SUM(b.runs) as total_runs,
+           MAX(b.runs) as highest_score,
+           ROUND(SUM(b.runs) * 100.0 / NULLIF(SUM(b.balls), 0), 1) as strike_rate
+    FROM batter_innings b
+    JOIN matches m ON m.match_id = b.match_id
+    WHERE m.venue = :venue
+    GROUP BY b.batter
+    ORDER BY total_runs DESC
+    LIMIT :limit
+""", venue='Wankhede Stadium', limit=10)
+
+register('venue_wicket_takers', """
+    SELECT b.bowler as player,
+           COUNT(DISTINCT b.match_id) as matches,
+           SUM(b.wickets) as total_wickets,
+           ROUND(SUM(b.runs_conceded) * 6.0 / NULLIF(SUM(b.legal_balls), 0), 2) as economy
+    FROM bowler_innings b
+    JOIN matches m ON m.match_id = b.match_id
+    WHERE m.venue = :venue
+    GROUP BY b.bowler
+    ORDER BY total_wickets DESC
+    LIMIT :limit
+""", venue='Wankhede Stadium', limit=10)
+
+register('venue_directory', """
+    SELECT DISTINCT venue FROM matches WHERE venue IS NOT NULL ORDER BY venue
+""")
+
+# Headroom over the registry so ad-hoc statements never evict a page query
+STATEMENT_CACHE_SIZE = max(128, 2 * len(QUERIES))
+
+# ==================== EXECUTION ====================
+
+class QueryTiming:
+    """Running call count and latency for one query id"""
+
+    __slots__ = ('calls', 'total_ms', 'max_ms', 'rows')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+
+
+_timings: Dict[str, QueryTiming] = {}
+_timings_lock = threading.Lock()
+
+
+def _bind(query_id: str, params: Optional[Dict[str, Any]]) -> Tuple[Query, Dict[str, Any]]:
+    """Look up a registered query and check its parameters"""
+    query = QUERIES[query_id]
+    params = params or {}
+    missing = query.param_names - set(params)
+    if missing:
+        raise KeyError(f"Query {query_id} is missing parameters: {', '.join(sorted(missing))}")
+    return query, params
+
+
+def _record(query_id: str, elapsed_ms: float, rows: int) -> None:
+    with _timings_lock:
+        timing = _timings.setdefault(query_id, QueryTiming())
+        timing.calls += 1
+        timing.total_ms += elapsed_ms
+        timing.max_ms = max(timing.max_ms, elapsed_ms)
+        timing.rows += rows
+
+
+def run_query(conn: sqlite3.Connection, query_id: str, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    """Execute a registered query with bound parameters and return a DataFrame"""
+    query, params = _bind(query_id, params)
+    start = time.perf_counter()
+    result = pd.read_sql_query(query.sql, conn, params=params)
+    _record(query_id, (time.perf_counter() - start) * 1000, len(result))
+    return result
+
+
+def run_scalar(conn: sqlite3.Connection, query_id: str, params: Optional[Dict[str, Any]] = None) -> Any:
+    """Execute a registered query and return the first column of the first row"""
+    query, params = _bind(query_id, params)
+    start = time.perf_counter()
+    row = conn.execute(query.sql, params).fetchone()
+    _record(query_id, (time.perf_counter() - start) * 1000, 1 if row else 0)
+    return row[0] if row else None
+
+
+def query_stats() -> pd.DataFrame:
+    """Per-query call counts and latency since process start"""
+    with _timings_lock:
+        rows: List[Dict[str, Any]] = [
+            {
+                'query_id': query_id,
+                'calls': timing.calls,
+                'avg_ms': round(timing.total_ms / timing.calls, 2),
+                'max_ms': round(timing.max_ms, 2),
+                'total_ms': round(timing.total_ms, 1),
+                'rows': timing.rows,
+            }
+            for query_id, timing in _timings.items()
+        ]
+    if not rows:
+        return pd.DataFrame(columns=['query_id', 'calls', 'avg_ms', 'max_ms', 'total_ms', 'rows'])
+    return pd.DataFrame(rows).sort_values('total_ms', ascending=False, ignore_index=True)
@@ -0,0 +1,287 @@
+"""
+League standings, the standings race and playoff results for every season.
+
+Every match carries a ``stage``: 'League' or the playoff it was (Qualifier 1,
+Eliminator, Final, ...). Cricsheet JSON names playoff stages in
+``info.event.stage``; seasons loaded without event data get their season's
+playoff format assigned to their last matches by date, once the season is
+complete (``season_is_complete``). Those stages are flagged
+``stage_inferred`` and worked out again on every refresh, so a season that was
+only partly loaded stays all-League, with no champion, until the rest of it
+arrives.
+
+``refresh_season_tables`` rebuilds, for all seasons at once (or just the
+seasons an ingest touched), from one grouped pass over ``deliveries`` and
+vectorized pandas over ``matches``:
+
+- ``team_season_nrr`` - the league-stage points table (NRR rules in
+  ``nrr_engine``);
+- ``season_standings`` - every team's record, points, NRR and position after
+  each league match, which the Season Insights page draws as a standings race;
+- ``season_results`` - league leader, champion (winner of the final) and
+  runner-up.
+"""
+
+import sqlite3
+import logging
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from nrr_engine import (
+    NRR_COLUMNS, NRR_DDL, POINTS_PER_NO_RESULT, POINTS_PER_WIN,
+    add_match_target_columns, build_nrr_frame, load_nrr_inputs, net_run_rate, season_table,
+)
+
+logger = logging.getLogger(__name__)
+
+LEAGUE_STAGE = 'League'
+
+# Playoff stages in the order they are played (used when a season has no stage data)
+PLAYOFF_FORMATS = {
+    2008: ('Semi Final', 'Semi Final', 'Final'),
+    2009: ('Semi Final', 'Semi Final', 'Final'),
+    2010: ('Semi Final', 'Semi Final', '3rd Place Play-Off', 'Final'),
+}
+DEFAULT_PLAYOFF_FORMAT = ('Qualifier 1', 'Eliminator', 'Qualifier 2', 'Final')
+
+# Scheduled matches per season, league and playoffs (used to tell a finished season from a partial one)
+SEASON_MATCHES = {
+    2008: 59, 2009: 59, 2010: 60, 2011: 74, 2012: 76, 2013: 76,
+    **{season: 60 for season in range(2014, 2022)},
+}
+DEFAULT_SEASON_MATCHES = 74
+# Matches abandoned without a ball bowled have no ball-by-ball data
+MAX_WASHOUTS = 3
+PLAYOFF_TEAMS = 4
+
+# ==================== TABLE DEFINITIONS ====================
+
+SEASON_DDL = """
+CREATE TABLE IF NOT EXISTS season_standings (
+    season        INTEGER NOT NULL,
+    match_number  INTEGER NOT NULL,
+    match_id      INTEGER NOT NULL,
+    match_date    TEXT,
+    team          TEXT    NOT NULL,
+    played        INTEGER NOT NULL DEFAULT 0,
+    wins          INTEGER NOT NULL DEFAULT 0,
+    losses        INTEGER NOT NULL DEFAULT 0,
+    no_results    INTEGER NOT NULL DEFAULT 0,
+    points        INTEGER NOT NULL DEFAULT 0,
+    nrr           REAL    NOT NULL DEFAULT 0,
+    position      INTEGER NOT NULL,
+    PRIMARY KEY (season, match_number, team)
+);
+
+CREATE TABLE IF NOT EXISTS season_results (
+    season           INTEGER PRIMARY KEY,
+    league_matches   INTEGER NOT NULL DEFAULT 0,
+    playoff_matches  INTEGER NOT NULL DEFAULT 0,
+    league_leader    TEXT,
+    champion         TEXT,
+    runner_up        TEXT,
+    final_match_id   INTEGER
+);
+"""
+
+STANDINGS_COLUMNS = (
+    'season', 'match_number', 'match_id', 'match_date', 'team',
+    'played', 'wins', 'losses', 'no_results', 'points', 'nrr', 'position',
+)
+
+RESULTS_COLUMNS = (
+    'season', 'league_matches', 'playoff_matches', 'league_leader', 'champion', 'runner_up', 'final_match_id',
+)
+
+# Running totals carried from one league match to the next
+_RUNNING_TOTALS = ('played', 'wins', 'no_results', 'runs_for', 'balls_for', 'runs_against', 'balls_against')
+
+_MATCH_ORDER = ['season', 'match_date', 'match_id']
+
+# ==================== STAGES ====================
+
+def playoff_format(season: int) -> Tuple[str, ...]:
+    return PLAYOFF_FORMATS.get(int(season), DEFAULT_PLAYOFF_FORMAT)
+
+
+def season_is_complete(season_matches: pd.DataFrame) -> bool:
+    """Whether one season's matches (in date order) are the whole season, playoffs included"""
+    # Every scheduled match is loaded, or a few washouts are missing and the teams in the
+    # would-be playoffs were all top-four sides on league wins; a league in progress fails both
+    season = int(season_matches['season'].iloc[0])
+    scheduled = SEASON_MATCHES.get(season, DEFAULT_SEASON_MATCHES)
+    if len(season_matches) >= scheduled:
+        return True
+    if len(season_matches) < scheduled - MAX_WASHOUTS:
+        return False
+    playoff_count = len(playoff_format(season))
+    league, playoffs = season_matches.iloc[:-playoff_count], season_matches.iloc[-playoff_count:]
+    teams = pd.concat([league['team1_name'], league['team2_name']]).dropna().unique()
+    wins = league['match_winner_name'].value_counts().reindex(teams, fill_value=0)
+    if len(wins) <= PLAYOFF_TEAMS:
+        return False
+    # Teams level on wins with the fourth side all count as contenders
+    contenders = set(wins[wins >= wins.sort_values(ascending=False).iloc[PLAYOFF_TEAMS - 1]].index)
+    return set(playoffs['team1_name']) | set(playoffs['team2_name']) <= contenders
+
+
+def add_stage_column(conn: sqlite3.Connection) -> None:
+    """Add matches.stage / stage_inferred if they are missing (idempotent)"""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(matches)")}
+    if 'stage' not in existing:
+        conn.execute("ALTER TABLE matches ADD COLUMN stage TEXT")
+    if 'stage_inferred' not in existing:
+        conn.execute("ALTER TABLE matches ADD COLUMN stage_inferred INTEGER NOT NULL DEFAULT 0")
+
+
+def infer_stages(matches: pd.DataFrame) -> pd.Series:
+    """Stage per match: recorded stages are kept; complete seasons with none get their playoffs inferred"""
+    ordered = matches.sort_values(_MATCH_ORDER)
+    by_season = ordered.groupby('season')
+    recorded = ordered['stage'].notna().groupby(ordered['season']).transform('any')
+    from_end = by_season.cumcount(ascending=False)  # 0 = the season's last match
+    formats = ordered['season'].map(playoff_format)
+    playoff_count = formats.map(len)
+    # A season still being played (or only partly loaded) has no playoffs yet, so no champion
+    complete = {season: season_is_complete(season_matches) for season, season_matches in by_season}
+    is_playoff = ~recorded & (from_end < playoff_count) & ordered['season'].map(complete).astype(bool)
+
+    stages = ordered['stage'].copy()
+    stages[is_playoff] = [stage_names[len(stage_names) - 1 - position]
+                          for stage_names, position in zip(formats[is_playoff], from_end[is_playoff])]
+    return stages.fillna(LEAGUE_STAGE).reindex(matches.index)
+
+# ==================== STANDINGS ====================
+
+def standings_progress(sides: pd.DataFrame, league: pd.DataFrame) -> pd.DataFrame:
+    """Every team's standing after each league match of its season (``sides`` from ``build_nrr_frame``)"""
+    league = league.sort_values(_MATCH_ORDER)
+    league = league.assign(match_number=league.groupby('season').cumcount() + 1)
+    played = sides.merge(league[['match_id', 'match_number']], on='match_id')
+    played = played.assign(played=1, wins=played['won'].astype(int), no_results=played['no_result'].astype(int))
+
+    # One row per (league match, team of that season); a team's totals carry over matches it sat out
+    teams = played[['season', 'team']].drop_duplicates()
+    grid = league[['season', 'match_number', 'match_id', 'match_date']].merge(teams, on='season')
+    grid = grid.merge(played[['season', 'match_number', 'team', *_RUNNING_TOTALS]],
+                      on=['season', 'match_number', 'team'], how='left')
+    grid = grid.sort_values(['season', 'team', 'match_number'], ignore_index=True)
+    totals = list(_RUNNING_TOTALS)
+    grid[totals] = grid[totals].fillna(0).astype(int).groupby([grid['season'], grid['team']]).cumsum()
+
+    grid['losses'] = grid['played'] - grid['wins'] - grid['no_results']
+    grid['points'] = grid['wins'] * POINTS_PER_WIN + grid['no_results'] * POINTS_PER_NO_RESULT
+    grid['nrr'] = net_run_rate(grid['runs_for'], grid['balls_for'], grid['runs_against'], grid['balls_against'])
+    # Same order as the points table: points, then NRR, then name
+    grid = grid.sort_values(['season', 'match_number', 'points', 'nrr', 'team'],
+                            ascending=[True, True, False, False, True], ignore_index=True)
+    grid['position'] = grid.groupby(['season', 'match_number']).cumcount() + 1
+    return grid[list(STANDINGS_COLUMNS)]
+
+
+def season_results(standings: pd.DataFrame, matches: pd.DataFrame) -> pd.DataFrame:
+    """League leader, champion and runner-up per season (the final is the season's last playoff match)"""
+    is_league = matches['stage'] == LEAGUE_STAGE
+    results = pd.DataFrame({
+        'league_matches': is_league.groupby(matches['season']).sum(),
+        'playoff_matches': (~is_league).groupby(matches['season']).sum(),
+    })
+
+    last_match = standings.groupby('season')['match_number'].transform('max')
+    leaders = standings[(standings['match_number'] == last_match) & (standings['position'] == 1)]
+    results['league_leader'] = leaders.set_index('season')['team']
+
+    finals = matches[~is_league].sort_values(_MATCH_ORDER).groupby('season').tail(1).set_index('season')
+    winner = finals['match_winner_name']
+    results['champion'] = winner
+    results['runner_up'] = finals['team2_name'].where(winner == finals['team1_name'], finals['team1_name']) \
+        .where(winner.notna())
+    results['final_match_id'] = finals['match_id']
+
+    results = results.reset_index().rename(columns={'index': 'season'})
+    results[['league_matches', 'playoff_matches']] = results[['league_matches', 'playoff_matches']].astype(int)
+    # NULL (not NaN) for seasons without a league table or a final
+    results = results.astype(object).where(results.notna(), None)
+    return results[list(RESULTS_COLUMNS)]
+
+# ==================== BUILD FUNCTIONS ====================
+
+def _replace_season_rows(conn: sqlite3.Connection, table: str, columns: Tuple[str, ...],
+                         frame: pd.DataFrame, seasons: Optional[list]) -> int:
+    if seasons is None:
+        conn.execute(f"DELETE FROM {table}")
+    else:
+        conn.executemany(f"DELETE FROM {table} WHERE season = ?", ((season,) for season in seasons))
+    conn.executemany(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+        frame.itertuples(index=False, name=None)
+    )
+    return len(frame)
+
+
+def refresh_season_tables(conn: sqlite3.Connection, seasons: Optional[Iterable[int]] = None) -> Dict[str, int]:
+    """Label match stages and recompute the season tables (for ``seasons``, or all) inside the caller's transaction"""
+    start = time.perf_counter()
+    seasons = None if seasons is None else sorted({int(season) for season in seasons if season is not None})
+    if seasons == []:
+        return {}
+    innings, matches = load_nrr_inputs(conn, seasons)
+
+    # Only event stages are data; inferred ones are redone from the matches loaded so far
+    inferred = matches['stage'].isna() | matches['stage_inferred'].astype(bool)
+    stages = infer_stages(matches.assign(stage=matches['stage'].mask(inferred)))
+    relabelled = inferred & (matches['stage'].ne(stages) | ~matches['stage_inferred'].astype(bool))
+    if relabelled.any():
+        conn.executemany("UPDATE matches SET stage = ?, stage_inferred = 1 WHERE match_id = ?",
+                         zip(stages[relabelled], matches.loc[relabelled, 'match_id'].astype(int).tolist()))
+    matches['stage'] = stages
+
+    league = matches[stages == LEAGUE_STAGE]
+    sides = build_nrr_frame(innings, league)
+    standings = standings_progress(sides, league)
+    counts = {
+        'team_season_nrr': _replace_season_rows(conn, 'team_season_nrr', NRR_COLUMNS, season_table(sides), seasons),
+        'season_standings': _replace_season_rows(conn, 'season_standings', STANDINGS_COLUMNS, standings, seasons),
+        'season_results': _replace_season_rows(conn, 'season_results', RESULTS_COLUMNS,
+                                               season_results(standings, matches), seasons),
+    }
+    logger.info(f"Refreshed season tables for {counts['season_results']} seasons "
+                f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return counts
+
+
+def reinfer_stored_stages(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Flag stages that earlier refreshes stored without marking them inferred, and rebuild the season tables"""
+    conn.execute("BEGIN")
+    try:
+        add_stage_column(conn)
+        # Cricsheet IPL files name their event, so their stages are data; matches loaded any
+        # other way (the CSV base load) only ever had inferred stages
+        conn.execute("""
+            UPDATE matches SET stage_inferred = 1
+            WHERE stage IS NOT NULL AND match_id NOT IN (SELECT match_id FROM ingested_files)
+        """)
+        counts = refresh_season_tables(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return counts
+
+
+def build_season_tables(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Add the match stage / target columns, create the season tables and fill them in one transaction"""
+    conn.execute("BEGIN")
+    try:
+        add_match_target_columns(conn)
+        add_stage_column(conn)
+        for statement in [stmt.strip() for stmt in (NRR_DDL + SEASON_DDL).split(';') if stmt.strip()]:
+            conn.execute(statement)
+        counts = refresh_season_tables(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return counts
@@ -0,0 +1,361 @@
+"""
+Cross-process result cache under ``st.cache_data``, keyed on the database version.
+
+``st.cache_data`` lives in one process and is lost on every deploy or worker
+restart. Loaders decorated with ``shared_cached`` also keep their pickled
+results in a backend every worker process can read:
+
+- ``SQLiteCacheBackend`` (default) - a WAL SQLite file on local disk, evicted
+  least-recently-used past a byte budget (pruned every few dozen stores;
+  reads only write when an entry's last-used time is minutes old);
+- ``RedisCacheBackend`` - any Redis-compatible server (``redis://...``, needs
+  the ``redis`` package); eviction is left to the server's ``maxmemory``
+  policy, with a TTL as a backstop.
+
+Keys include the data version (the ``meta`` stamp every ingest bumps, see
+``db_schema``), so after an ingest every older entry is unreachable and the
+SQLite backend drops them on its next write. ``DataVersionWatch`` tells a
+process when to drop its own in-memory caches for the same reason. Loaders
+registered with ``warm=`` calls are computed into the shared tier by
+``SharedCache.warm_up`` on a background thread when a worker starts, so the
+first requests after a restart read results instead of recomputing them.
+Backend errors are logged and the loader runs directly - the cache never
+breaks a page.
+"""
+
+import hashlib
+import inspect
+import pickle
+import sqlite3
+import logging
+import threading
+import time
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path("data/shared_cache.db")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_REDIS_TTL_SECONDS = 7 * 24 * 3600
+REDIS_KEY_PREFIX = "ipl-dashboard:"
+DISABLED_SETTINGS = ('', 'off', 'none', '0')
+# Hits only refresh last_used when it is older than this, so hot reads don't queue on the writer lock
+TOUCH_INTERVAL_SECONDS = 300.0
+# Stores between prunes of older-version and over-budget entries (per process)
+PRUNE_EVERY_STORES = 50
+
+SHARED_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shared_results (
+    cache_key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    data_version TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_shared_results_last_used ON shared_results(last_used);
+"""
+
+# Loaders to precompute on start: namespace -> (function, keyword arguments of each call)
+WARM_UP: Dict[str, Tuple[Callable, Tuple[Dict[str, Any], ...]]] = {}
+
+
+class WarmUpReport(NamedTuple):
+    computed: List[str]
+    cached: List[str]
+    failed: List[Tuple[str, str]]
+    elapsed_ms: float
+
+
+class DataVersionWatch:
+    """Data version a process's in-memory caches were built from"""
+
+    def __init__(self):
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._version
+
+    def update(self, version: str) -> bool:
+        """Record ``version``; True when it replaces a different one (caches are stale)"""
+        with self._lock:
+            changed = self._version is not None and version != self._version
+            self._version = version
+        return changed
+
+# ==================== BACKENDS ====================
+
+class SQLiteCacheBackend:
+    """Pickled results in a WAL SQLite file shared by every process on the host"""
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES,
+                 touch_interval: float = TOUCH_INTERVAL_SECONDS, prune_every: int = PRUNE_EVERY_STORES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        self.prune_every = max(1, prune_every)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(SHARED_CACHE_SCHEMA)
+        self._lock = threading.Lock()
+        self._stores = 0
+        self._pruned_version: Optional[str] = None
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT payload, last_used FROM shared_results WHERE cache_key = ?",
+                                     (key,)).fetchone()
+            # LRU order only needs minute precision; most hits stay read-only
+            if row is not None and now - row[1] > self.touch_interval:
+                with self._conn:
+                    self._conn.execute("UPDATE shared_results SET last_used = ? WHERE cache_key = ?", (now, key))
+        return None if row is None else row[0]
+
+    def put(self, key: str, namespace: str, version: str, payload: bytes) -> int:
+        """Store one result; returns entries evicted when this store also prunes"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO shared_results "
+                "(cache_key, namespace, data_version, payload, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, namespace, version, payload, now, now)
+            )
+            self._stores += 1
+            # Prune on the first store of a new data version, then every ``prune_every`` stores
+            if version == self._pruned_version and self._stores % self.prune_every:
+                return 0
+            self._pruned_version = version
+            return self._prune(version)
+
+    def _prune(self, version: str) -> int:
+        """Delete older-version entries, then least recently used ones past the byte budget"""
+        # Results for an older database version can never be read again
+        evicted = self._conn.execute("DELETE FROM shared_results WHERE data_version != ?", (version,)).rowcount
+        evicted += self._conn.execute("""
+            DELETE FROM shared_results WHERE cache_key IN (
+                SELECT cache_key FROM (
+                    SELECT cache_key,
+                           SUM(LENGTH(payload)) OVER (ORDER BY last_used DESC) as running_bytes
+                    FROM shared_results
+                )
+                WHERE running_bytes > ?
+            )
+        """, (self.max_bytes,)).rowcount
+        return evicted
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM shared_results")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM shared_results"
+            ).fetchone()
+        return {'backend': 'sqlite', 'entries': entries, 'size_bytes': size_bytes}
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class RedisCacheBackend:
+    """Pickled results in a Redis-compatible server shared by every host"""
+
+    def __init__(self, url: str, ttl_seconds: float = DEFAULT_REDIS_TTL_SECONDS):
+        if not REDIS_AVAILABLE:
+            raise ImportError("redis is required for a Redis shared cache: pip install redis")
+        self.ttl_seconds = ttl_seconds
+        self._client = redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(REDIS_KEY_PREFIX + key)
+
+    def put(self, key: str, namespace: str, version: str, payload: bytes) -> int:
+        # Older versions are never read again and age out under the server's eviction policy
+        self._client.set(REDIS_KEY_PREFIX + key, payload, ex=int(self.ttl_seconds))
+        return 0
+
+    def clear(self) -> None:
+        keys = list(self._client.scan_iter(match=f"{REDIS_KEY_PREFIX}*", count=500))
+        if keys:
+            self._client.delete(*keys)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'backend': 'redis', 'entries': self._client.dbsize(),
+                'size_bytes': self._client.info('memory').get('used_memory', 0)}
+
+    def close(self) -> None:
+        self._client.close()
+
+# ==================== SHARED CACHE ====================
+
+class SharedCache:
+    """Version-keyed get-or-compute over a shared backend (``backend=None`` disables it)"""
+
+    def __init__(self, backend, version: Callable[[], str]):
+        self.backend = backend
+        self.version = version
+        self._lock = threading.Lock()
+        self._counts = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'errors': 0}
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += amount
+
+    @staticmethod
+    def make_key(namespace: str, version: str, arguments: Dict[str, Any]) -> str:
+        digest = hashlib.sha1(repr(_freeze(arguments)).encode()).hexdigest()
+        return f"{namespace}:{version}:{digest}"
+
+    def _lookup(self, namespace: str, arguments: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], Any, bool]:
+        """(version, key, value, found); version and key are None when the backend is unavailable"""
+        try:
+            version = self.version()
+            key = self.make_key(namespace, version, arguments)
+            payload = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Shared cache unavailable for {namespace}: {e}")
+            self._count('errors')
+            return None, None, None, False
+        if payload is not None:
+            try:
+                value = pickle.loads(payload)
+                self._count('hits')
+                return version, key, value, True
+            except Exception as e:
+                logger.error(f"Unreadable shared cache entry {key}: {e}")
+        self._count('misses')
+        return version, key, None, False
+
+    def _store(self, namespace: str, version: str, key: str, value: Any) -> None:
+        try:
+            evicted = self.backend.put(key, namespace, version, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+            self._count('stores')
+            self._count('evictions', evicted)
+        except Exception as e:
+            logger.warning(f"Could not store {namespace} in the shared cache: {e}")
+            self._count('errors')
+
+    def get_or_compute(self, namespace: str, func: Callable[..., Any], args: tuple = (),
+                       kwargs: Optional[Dict[str, Any]] = None) -> Any:
+        """Shared result of ``func(*args, **kwargs)`` for the current database version"""
+        if self.backend is None:
+            return func(*args, **(kwargs or {}))
+        bound = _bind(func, args, kwargs or {})
+        version, key, value, found = self._lookup(namespace, bound.arguments)
+        if found:
+            return value
+        value = func(*bound.args, **bound.kwargs)
+        if key is not None:
+            self._store(namespace, version, key, value)
+        return value
+
+    # ==================== WARM-UP ====================
+
+    def warm_up(self) -> WarmUpReport:
+        """Compute every registered warm-up call that is not already in the shared tier"""
+        start = time.perf_counter()
+        computed, cached, failed = [], [], []
+        if self.backend is None:
+            return WarmUpReport(computed, cached, failed, 0.0)
+        for namespace, (func, calls) in list(WARM_UP.items()):
+            for arguments in calls:
+                label = f"{namespace}({', '.join(f'{k}={v!r}' for k, v in arguments.items())})"
+                try:
+                    bound = _bind(func, (), arguments)
+                    version, key, _, found = self._lookup(namespace, bound.arguments)
+                    if found:
+                        cached.append(label)
+                        continue
+                    value = func(*bound.args, **bound.kwargs)
+                    if key is not None:
+                        self._store(namespace, version, key, value)
+                    computed.append(label)
+                except Exception as e:
+                    logger.error(f"Shared cache warm-up failed for {label}: {e}")
+                    failed.append((label, str(e)))
+        return WarmUpReport(computed, cached, failed, (time.perf_counter() - start) * 1000)
+
+    def start_warm_up(self, prepare_thread: Optional[Callable[[threading.Thread], Any]] = None) -> threading.Thread:
+        """Run ``warm_up`` on a daemon thread (``prepare_thread`` e.g. attaches a Streamlit script context)"""
+        def run() -> None:
+            report = self.warm_up()
+            logger.info(f"Shared cache warm-up: {len(report.computed)} computed, {len(report.cached)} already "
+                        f"cached, {len(report.failed)} failed in {report.elapsed_ms:.0f} ms")
+
+        thread = threading.Thread(target=run, name='shared-cache-warm-up', daemon=True)
+        if prepare_thread is not None:
+            prepare_thread(thread)
+        thread.start()
+        return thread
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus the backend's size"""
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts['hits'] + counts['misses']
+        counts['hit_rate'] = round(counts['hits'] / lookups, 3) if lookups else 0.0
+        if self.backend is None:
+            return dict(counts, backend='off', entries=0, size_bytes=0)
+        counts.update(backend=type(self.backend).__name__, entries=0, size_bytes=0)
+        try:
+            counts.update(self.backend.stats())
+        except Exception as e:
+            logger.warning(f"Shared cache stats unavailable: {e}")
+        return counts
+
+
+def create_shared_cache(setting: str, version: Callable[[], str], path: Path = DEFAULT_CACHE_PATH,
+                        max_bytes: int = DEFAULT_MAX_BYTES) -> SharedCache:
+    """Shared cache for ``setting``: 'sqlite' (default), a ``redis://`` URL, or 'off'"""
+    setting = (setting or '').strip()
+    if setting.lower() in DISABLED_SETTINGS:
+        return SharedCache(None, version)
+    try:
+        if setting.startswith(('redis://', 'rediss://', 'unix://')):
+            return SharedCache(RedisCacheBackend(setting), version)
+        return SharedCache(SQLiteCacheBackend(path, max_bytes=max_bytes), version)
+    except Exception as e:
+        logger.error(f"Shared cache backend '{setting}' unavailable, caching in-process only: {e}")
+        return SharedCache(None, version)
+
+
+def _bind(func: Callable, args: tuple, kwargs: Dict[str, Any]) -> inspect.BoundArguments:
+    """Call arguments by name with defaults filled in, so f(5) and f(limit=5) share a key"""
+    bound = inspect.signature(func).bind(*args, **kwargs)
+    bound.apply_defaults()
+    return bound
+
+
+def _freeze(value: Any) -> Any:
+    """Order-independent form of call arguments for hashing"""
+    if isinstance(value, dict):
+        return tuple(sorted((str(key), _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def shared_cached(namespace: str, cache: Callable[[], SharedCache], warm: Sequence[Dict[str, Any]] = ()) -> Callable:
+    """Decorator routing a loader through ``cache()``; ``warm`` lists calls to precompute on start"""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return cache().get_or_compute(namespace, func, args, kwargs)
+
+        if warm:
+            WARM_UP[namespace] = (func, tuple(dict(call) for call in warm))
+        return wrapper
+    return decorator
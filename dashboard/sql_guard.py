@@ -0,0 +1,243 @@
+"""
+Guarded execution of model-generated SQL.
+
+``run_guarded`` is the only way SQL written by the AI Dashboard's model
+reaches the database:
+
+1. ``validate_sql`` accepts a single SELECT / WITH statement and rejects
+   anything that writes, attaches, or changes pragmas.
+2. An authorizer on the connection denies every action except reads while
+   the statement is prepared, as a second line of defence behind the pool's
+   ``mode=ro`` / ``query_only`` connections.
+3. ``estimate_cost`` walks ``EXPLAIN QUERY PLAN`` with table sizes from
+   ``sqlite_stat1`` and refuses statements whose nested loops would visit too
+   many rows (e.g. a cross join of ``deliveries`` with itself) before running.
+4. The statement is wrapped in an outer ``LIMIT`` and executed under a
+   progress-handler deadline, with per-value length and total result-size caps.
+
+A rejected or aborted query raises ``SqlGuardError`` with a message suitable
+for the user, and the pooled connection is returned unchanged.
+"""
+
+import re
+import sqlite3
+import logging
+import time
+from typing import Dict, List, NamedTuple, Optional, Set
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MAX_ROWS = 1000
+TIMEOUT_SECONDS = 5.0
+MAX_ESTIMATED_ROWS = 50_000_000   # row visits estimated from the query plan
+MAX_VALUE_BYTES = 1024 * 1024     # longest string/blob a query may produce
+MAX_RESULT_BYTES = 32 * 1024 * 1024
+PROGRESS_INTERVAL = 10_000        # VM instructions between deadline checks
+
+UNKNOWN_SOURCE_ROWS = 1000        # subqueries / CTEs the planner materializes
+UNKNOWN_SEARCH_ROWS = 10          # index lookups without sqlite_stat1 data
+
+# REPLACE on its own is also the string function, so only the statement form is rejected
+FORBIDDEN_KEYWORDS = (
+    'INSERT', 'UPDATE', 'DELETE', r'REPLACE\s+INTO', 'UPSERT', 'CREATE', 'DROP', 'ALTER',
+    'ATTACH', 'DETACH', 'PRAGMA', 'VACUUM', 'REINDEX', 'ANALYZE', 'BEGIN', 'COMMIT', 'ROLLBACK',
+    'SAVEPOINT', 'LOAD_EXTENSION',
+)
+
+_ALLOWED_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION,
+                    getattr(sqlite3, 'SQLITE_RECURSIVE', 33)}
+_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\[[^\]]*\]|`[^`]*`")
+_COMMENT_PATTERN = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_FORBIDDEN_PATTERN = re.compile(r"\b(" + "|".join(FORBIDDEN_KEYWORDS) + r")\b", re.IGNORECASE)
+_PLAN_SOURCE_PATTERN = re.compile(r"^(SCAN|SEARCH) (\S+)(?: USING (?:COVERING )?INDEX (\S+) \(([^)]*)\))?")
+
+
+class SqlGuardError(Exception):
+    """Generated SQL was rejected, too expensive, or aborted while running"""
+
+
+class QueryCost(NamedTuple):
+    estimated_rows: int
+    full_scans: List[str]
+    plan: List[str]
+
+
+class GuardedResult(NamedTuple):
+    data: pd.DataFrame
+    sql: str
+    cost: QueryCost
+    truncated: bool
+    elapsed_ms: float
+
+# ==================== VALIDATION ====================
+
+def validate_sql(sql: str) -> str:
+    """Single read-only statement with comments and trailing semicolons removed"""
+    cleaned = _COMMENT_PATTERN.sub(' ', sql).strip().rstrip(';').strip()
+    if not cleaned:
+        raise SqlGuardError("The generated query is empty.")
+    # Keywords inside string literals and quoted identifiers don't count
+    code = _LITERAL_PATTERN.sub("''", cleaned)
+    if ';' in code:
+        raise SqlGuardError("Only a single SQL statement can be run.")
+    if not re.match(r"(SELECT|WITH)\b", code, re.IGNORECASE):
+        raise SqlGuardError("Only SELECT queries can be run.")
+    forbidden = _FORBIDDEN_PATTERN.search(code)
+    if forbidden:
+        raise SqlGuardError(f"Queries that use {' '.join(forbidden.group(1).upper().split())} are not allowed.")
+    return cleaned
+
+
+def _authorizer(action, arg1, arg2, db_name, trigger):
+    return sqlite3.SQLITE_OK if action in _ALLOWED_ACTIONS else sqlite3.SQLITE_DENY
+
+
+def _reset_authorizer(conn: sqlite3.Connection) -> None:
+    try:
+        conn.set_authorizer(None)
+    except TypeError:  # Python < 3.11 can't remove an authorizer
+        conn.set_authorizer(lambda *args: sqlite3.SQLITE_OK)
+
+# ==================== COST ESTIMATE ====================
+
+def _table_stats(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Row counts per table and average rows per key prefix per index, from sqlite_stat1"""
+    try:
+        rows = conn.execute("SELECT tbl, idx, stat FROM sqlite_stat1").fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    stats: Dict[str, int] = {}
+    for table, index, stat in rows:
+        numbers = [int(n) for n in str(stat).split() if n.isdigit()]
+        if not numbers:
+            continue
+        stats[table.lower()] = max(stats.get(table.lower(), 0), numbers[0])
+        if index:
+            for depth, rows_per_key in enumerate(numbers[1:], start=1):
+                stats[f"{index.lower()}:{depth}"] = rows_per_key
+    return stats
+
+
+def _table_rows(conn: sqlite3.Connection, table: str, stats: Dict[str, int]) -> int:
+    if table in stats:
+        return stats[table]
+    try:
+        row = conn.execute(f'SELECT MAX(rowid) FROM "{table}"').fetchone()
+        return int(row[0] or 0)
+    except sqlite3.DatabaseError:
+        return UNKNOWN_SOURCE_ROWS
+
+
+def _resolve_alias(sql: str, name: str, tables: Set[str]) -> Optional[str]:
+    """Table behind a plan source name (``d`` in ``FROM deliveries d``), None for subqueries and CTEs"""
+    if name.lower() in tables:
+        return name.lower()
+    for match in re.finditer(r"\b([A-Za-z_]\w*)\s+(?:AS\s+)?" + re.escape(name) + r"\b", sql, re.IGNORECASE):
+        if match.group(1).lower() in tables:
+            return match.group(1).lower()
+    return None
+
+
+def estimate_cost(conn: sqlite3.Connection, sql: str) -> QueryCost:
+    """Estimate row visits from EXPLAIN QUERY PLAN; nested loops multiply"""
+    plan_rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    stats = _table_stats(conn)
+    tables = {name.lower() for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+    children: Dict[int, List[tuple]] = {}
+    for node_id, parent, _, detail in plan_rows:
+        children.setdefault(parent, []).append((node_id, detail))
+
+    full_scans: List[str] = []
+
+    def node_rows(detail: str) -> Optional[int]:
+        match = _PLAN_SOURCE_PATTERN.match(detail)
+        if not match:
+            return None
+        kind, name, index, condition = match.groups()
+        table = _resolve_alias(sql, name, tables)
+        if table is None:
+            return UNKNOWN_SOURCE_ROWS
+        if kind == 'SCAN':
+            full_scans.append(table)
+            return _table_rows(conn, table, stats)
+        if 'INTEGER PRIMARY KEY' in detail or 'rowid=' in detail:
+            return 1
+        equalities = (condition or '').count('=') - (condition or '').count('>=') - (condition or '').count('<=')
+        if index and equalities:
+            return stats.get(f"{index.lower()}:{equalities}", UNKNOWN_SEARCH_ROWS)
+        # Range-only lookups: assume a quarter of the table
+        return max(_table_rows(conn, table, stats) // 4, 1)
+
+    def group_cost(parent: int) -> int:
+        loops, total = 1, 0
+        for node_id, detail in children.get(parent, []):
+            rows = node_rows(detail)
+            if rows is not None:
+                loops *= max(rows, 1)
+                total += loops
+            total += group_cost(node_id)
+        return total
+
+    return QueryCost(group_cost(0), full_scans, [row[-1] for row in plan_rows])
+
+# ==================== EXECUTION ====================
+
+def run_guarded(conn: sqlite3.Connection, sql: str, max_rows: int = MAX_ROWS,
+                timeout: float = TIMEOUT_SECONDS, max_estimated_rows: int = MAX_ESTIMATED_ROWS) -> GuardedResult:
+    """Validate, cost-check and run generated SQL with row, time and size limits"""
+    statement = validate_sql(sql)
+    # The outer LIMIT lets SQLite stop early; one extra row tells us the result was cut
+    wrapped = f"SELECT * FROM ({statement}) LIMIT {int(max_rows) + 1}"
+
+    start = time.perf_counter()
+    deadline = start + timeout
+    original_length = conn.getlimit(sqlite3.SQLITE_LIMIT_LENGTH) if hasattr(conn, 'getlimit') else None
+    conn.set_authorizer(_authorizer)
+    try:
+        try:
+            cost = estimate_cost(conn, wrapped)
+        except sqlite3.DatabaseError as e:
+            raise SqlGuardError(f"The generated query is not valid SQL for this database: {e}") from e
+        if cost.estimated_rows > max_estimated_rows:
+            raise SqlGuardError(
+                f"The generated query is too expensive to run (about {cost.estimated_rows:,} row visits, "
+                f"limit {max_estimated_rows:,}). Try a more specific question."
+            )
+
+        if original_length is not None:
+            conn.setlimit(sqlite3.SQLITE_LIMIT_LENGTH, MAX_VALUE_BYTES)
+        conn.set_progress_handler(lambda: 1 if time.perf_counter() > deadline else 0, PROGRESS_INTERVAL)
+
+        rows, result_bytes = [], 0
+        try:
+            cursor = conn.execute(wrapped)
+            columns = [description[0] for description in cursor.description]
+            while True:
+                batch = cursor.fetchmany(256)
+                if not batch:
+                    break
+                for row in batch:
+                    result_bytes += sum(len(value) if isinstance(value, (str, bytes)) else 8 for value in row)
+                if result_bytes > MAX_RESULT_BYTES:
+                    raise SqlGuardError(f"The query result is larger than {MAX_RESULT_BYTES // (1024 * 1024)} MB.")
+                rows.extend(batch)
+        except sqlite3.OperationalError as e:
+            if 'interrupted' in str(e):
+                raise SqlGuardError(f"The query took longer than {timeout:g}s and was stopped.") from e
+            raise SqlGuardError(f"The query failed: {e}") from e
+        except sqlite3.DataError as e:
+            raise SqlGuardError(f"The query produced a value larger than {MAX_VALUE_BYTES // 1024} KB.") from e
+    finally:
+        conn.set_progress_handler(None, 0)
+        _reset_authorizer(conn)
+        if original_length is not None:
+            conn.setlimit(sqlite3.SQLITE_LIMIT_LENGTH, original_length)
+
+    truncated = len(rows) > max_rows
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info(f"Guarded query: {min(len(rows), max_rows)} rows in {elapsed_ms:.0f} ms, "
+                f"estimated {cost.estimated_rows:,} row visits")
+    return GuardedResult(pd.DataFrame(rows[:max_rows], columns=columns), statement, cost, truncated, elapsed_ms)
@@ -0,0 +1,100 @@
+"""
+Per-team metrics for the Team Analysis page, computed for every team at once.
+
+``build_team_profiles`` slices the phase cube (phase splits for all teams,
+see ``phase_cube.py``) and makes one grouped pass over the matches frame
+(results, chase/defend), so switching teams in the UI is a dictionary lookup
+instead of a round of SQL scans. Net Run Rate lives in ``nrr_engine.py``.
+"""
+
+import logging
+from typing import Dict, NamedTuple, Optional
+
+import pandas as pd
+
+from columnar_store import PHASES, batting_first_team
+from phase_cube import PhaseCube, PhaseStats
+
+logger = logging.getLogger(__name__)
+
+
+class TeamProfile(NamedTuple):
+    team: str
+    matches: int = 0
+    wins: int = 0
+    no_results: int = 0
+    chase_matches: int = 0
+    chase_wins: int = 0
+    defend_matches: int = 0
+    defend_wins: int = 0
+    batting_phases: Optional[Dict[str, PhaseStats]] = None
+    bowling_phases: Optional[Dict[str, PhaseStats]] = None
+
+    @property
+    def losses(self) -> int:
+        return self.matches - self.wins - self.no_results
+
+    @property
+    def win_pct(self) -> float:
+        return round(100.0 * self.wins / self.matches, 1) if self.matches else 0.0
+
+    @property
+    def chase_win_rate(self) -> float:
+        return round(100.0 * self.chase_wins / self.chase_matches, 1) if self.chase_matches else 0.0
+
+    @property
+    def defend_win_rate(self) -> float:
+        return round(100.0 * self.defend_wins / self.defend_matches, 1) if self.defend_matches else 0.0
+
+
+def _team_sides(matches: pd.DataFrame) -> pd.DataFrame:
+    """One row per (match, team) with whether the team batted first and won"""
+    first = batting_first_team(matches)
+    sides = pd.concat([
+        pd.DataFrame({'team': matches[column], 'batted_first': first == matches[column],
+                      'winner': matches['match_winner_name']})
+        for column in ('team1_name', 'team2_name')
+    ], ignore_index=True)
+    sides = sides[sides['team'].notna()]
+    sides['won'] = sides['winner'] == sides['team']
+    sides['no_result'] = sides['winner'].isna()
+    return sides
+
+
+def build_team_profiles(cube: PhaseCube, matches: pd.DataFrame,
+                        season: Optional[int] = None) -> Dict[str, TeamProfile]:
+    """Profiles for every team that played (optionally within one season)"""
+    if season is not None:
+        matches = matches[matches['season'] == season]
+    if matches.empty:
+        return {}
+
+    sides = _team_sides(matches)
+    record = sides.groupby('team').agg(matches=('won', 'size'), wins=('won', 'sum'),
+                                       no_results=('no_result', 'sum'))
+    # Chase / defend rates are over decided matches only
+    decided = sides[~sides['no_result']]
+    by_order = decided.groupby(['team', 'batted_first'])['won'].agg(['size', 'sum'])
+
+    batting_phases = cube.phase_stats('batting', 'batting_team', season=season)
+    bowling_phases = cube.phase_stats('bowling', 'bowling_team', season=season)
+
+    def lookup(frame: pd.DataFrame, key, column: str) -> int:
+        return int(frame.at[key, column]) if key in frame.index else 0
+
+    profiles = {}
+    for team, row in record.iterrows():
+        profiles[team] = TeamProfile(
+            team=team,
+            matches=int(row['matches']),
+            wins=int(row['wins']),
+            no_results=int(row['no_results']),
+            chase_matches=lookup(by_order, (team, False), 'size'),
+            chase_wins=lookup(by_order, (team, False), 'sum'),
+            defend_matches=lookup(by_order, (team, True), 'size'),
+            defend_wins=lookup(by_order, (team, True), 'sum'),
+            batting_phases={phase: batting_phases.get(team, {}).get(phase, PhaseStats()) for phase in PHASES},
+            bowling_phases={phase: bowling_phases.get(team, {}).get(phase, PhaseStats()) for phase in PHASES},
+        )
+    logger.info(f"Built {len(profiles)} team profiles" + (f" for {season}" if season else ""))
+    return profiles
@@ -0,0 +1,125 @@
+"""
+Watermarking for AI infographics and exported social images.
+
+Fonts are loaded once per size and the watermark text is pre-rendered once
+per (text, size) as a small RGBA sprite with its drop shadow. Watermarking an
+image then only composites the sprite into the bottom-right corner region
+instead of building and blending a full-size overlay. ``watermark_directory``
+applies the same sprite to every image in a folder on a thread pool (Pillow
+releases the GIL while decoding and encoding).
+"""
+
+import io
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEXT = "@rkjat65"
+DEFAULT_FONT_SIZE = 18
+MARGIN = 20
+SHADOW_OFFSET = 2
+TEXT_FILL = (255, 255, 255, 200)
+SHADOW_FILL = (0, 0, 0, 128)
+PNG_COMPRESS_LEVEL = 3     # zlib level; 6 (Pillow default) encodes ~3x slower for ~7% smaller files
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg', '.webp')
+FONT_CANDIDATES = ("arial.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf")
+
+
+class WatermarkReport(NamedTuple):
+    written: List[str]
+    failed: List[Tuple[str, str]]
+    elapsed_ms: float
+
+# ==================== SPRITES ====================
+
+@lru_cache(maxsize=16)
+def load_font(size: int = DEFAULT_FONT_SIZE):
+    """First available TrueType font at ``size``, else Pillow's built-in font"""
+    for candidate in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=32)
+def watermark_sprite(text: str = DEFAULT_TEXT, size: int = DEFAULT_FONT_SIZE) -> Image.Image:
+    """Text plus drop shadow on a transparent background, cropped to fit"""
+    font = load_font(size)
+    left, top, right, bottom = ImageDraw.Draw(Image.new('RGBA', (1, 1))).textbbox((0, 0), text, font=font)
+    sprite = Image.new('RGBA', (right - left + SHADOW_OFFSET, bottom - top + SHADOW_OFFSET), (255, 255, 255, 0))
+    draw = ImageDraw.Draw(sprite)
+    draw.text((SHADOW_OFFSET - left, SHADOW_OFFSET - top), text, fill=SHADOW_FILL, font=font)
+    draw.text((-left, -top), text, fill=TEXT_FILL, font=font)
+    sprite.info['ink_offset'] = (left, top)
+    return sprite
+
+# ==================== WATERMARKING ====================
+
+def apply_watermark(image: Image.Image, text: str = DEFAULT_TEXT, size: int = DEFAULT_FONT_SIZE,
+                    margin: int = MARGIN) -> Image.Image:
+    """RGB copy of ``image`` with the watermark composited into its bottom-right corner"""
+    sprite = watermark_sprite(text, size)
+    result = image.convert('RGB') if image.mode != 'RGB' else image.copy()
+    left, top = sprite.info['ink_offset']
+    # Same placement as drawing the text at (width - text width - margin, height - text height - margin)
+    x = max(image.width - sprite.width - margin + SHADOW_OFFSET + left, 0)
+    y = max(image.height - sprite.height - margin + SHADOW_OFFSET + top, 0)
+    box = (x, y, min(x + sprite.width, image.width), min(y + sprite.height, image.height))
+    # Blend against the original pixels (including their alpha) in the corner only
+    region = image.crop(box).convert('RGBA')
+    visible = sprite.crop((0, 0, box[2] - x, box[3] - y))
+    result.paste(Image.alpha_composite(region, visible).convert('RGB'), box[:2])
+    return result
+
+
+def watermark_bytes(image_bytes: bytes, text: str = DEFAULT_TEXT, size: int = DEFAULT_FONT_SIZE) -> bytes:
+    """Watermark encoded image bytes and return PNG bytes"""
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        watermarked = apply_watermark(image, text, size)
+    output = io.BytesIO()
+    watermarked.save(output, format='PNG', compress_level=PNG_COMPRESS_LEVEL)
+    return output.getvalue()
+
+
+def watermark_file(source: Path, destination: Path, text: str = DEFAULT_TEXT,
+                   size: int = DEFAULT_FONT_SIZE) -> Path:
+    """Watermark one image file, keeping its format"""
+    with Image.open(source) as image:
+        image_format = image.format or 'PNG'
+        watermarked = apply_watermark(image, text, size)
+    options = {'compress_level': PNG_COMPRESS_LEVEL} if image_format == 'PNG' else {'quality': 92}
+    watermarked.save(destination, format=image_format, **options)
+    return destination
+
+
+def watermark_directory(source_dir: Path, output_dir: Optional[Path] = None, text: str = DEFAULT_TEXT,
+                        size: int = DEFAULT_FONT_SIZE, workers: int = 4) -> WatermarkReport:
+    """Watermark every image in ``source_dir`` into ``output_dir`` (in place when None)"""
+    start = time.perf_counter()
+    source_dir = Path(source_dir)
+    output_dir = Path(output_dir) if output_dir is not None else source_dir
+    output_dir.mkdir(parents=True, exist_ok=True)
+    sources = sorted(path for path in source_dir.iterdir()
+                     if path.is_file() and path.suffix.lower() in IMAGE_SUFFIXES)
+    # Render the sprite once before the workers share it
+    watermark_sprite(text, size)
+
+    written, failed = [], []
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='watermark') as pool:
+        futures = {pool.submit(watermark_file, path, output_dir / path.name, text, size): path for path in sources}
+        for future, path in futures.items():
+            try:
+                written.append(str(future.result()))
+            except Exception as e:
+                logger.error(f"Could not watermark {path.name}: {e}")
+                failed.append((path.name, str(e)))
+    return WatermarkReport(written, failed, (time.perf_counter() - start) * 1000)
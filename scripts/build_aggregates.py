@@ -0,0 +1,54 @@
+"""
+Materialize the player innings aggregates and the season tables (points, standings race, results).
+
+Run from the project root after (re)loading ball-by-ball data:
+
+    python scripts/build_aggregates.py [--db data/cricket_analytics.db]
+"""
+import argparse
+import logging
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'dashboard'))
+
+from aggregates import build_player_innings  # noqa: E402
+from db_schema import bump_data_version  # noqa: E402
+from season_engine import build_season_tables  # noqa: E402
+from home_snapshot import DEFAULT_SNAPSHOT_PATH, write_snapshot  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', default='data/cricket_analytics.db', help='Path to the SQLite database')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    db_path = Path(args.db)
+    if not db_path.exists():
+        print(f"ERROR: database not found at {db_path}")
+        raise SystemExit(1)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        start = time.perf_counter()
+        counts = build_player_innings(conn)
+        counts.update(build_season_tables(conn))
+        with conn:
+            bump_data_version(conn)
+        elapsed = time.perf_counter() - start
+    finally:
+        conn.close()
+    # Home leaderboards are derived from the aggregates
+    write_snapshot(db_path, db_path.parent / DEFAULT_SNAPSHOT_PATH.name)
+
+    for table, rows in counts.items():
+        print(f"{table}: {rows:,} rows")
+    print(f"Done in {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Create or upgrade data/cricket_analytics.db to the current schema version.
+
+Applies pending migrations (schema, covering indexes, aggregate tables),
+runs ANALYZE, rebuilds the Home page snapshot and prints an EXPLAIN QUERY
+PLAN report for the page queries.
+
+    python scripts/create_database.py            # migrate + report
+    python scripts/create_database.py --status   # show applied version only
+    python scripts/create_database.py --check    # report only, exit 1 on full scans
+"""
+import argparse
+import logging
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'dashboard'))
+
+from db_schema import SCHEMA_VERSION, get_schema_version, migrate, query_plan_report  # noqa: E402
+from home_snapshot import DEFAULT_SNAPSHOT_PATH, write_snapshot  # noqa: E402
+
+
+def print_plan_report(conn) -> bool:
+    """Print the query plan report; return True when no page query full-scans deliveries"""
+    ok = True
+    print('\nEXPLAIN QUERY PLAN report:')
+    for entry in query_plan_report(conn):
+        status = 'FULL SCAN' if entry['full_scan'] else 'ok'
+        ok = ok and not entry['full_scan']
+        print(f"  [{status:>9}] {entry['query']}")
+        for line in entry['plan']:
+            print(f"              {line}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', default='data/cricket_analytics.db', help='Path to the SQLite database')
+    parser.add_argument('--status', action='store_true', help='Print the schema version and exit')
+    parser.add_argument('--check', action='store_true', help='Only run the query plan report')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    db_path = Path(args.db)
+    if (args.status or args.check) and not db_path.exists():
+        print(f"ERROR: database not found at {db_path}")
+        raise SystemExit(1)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        current = get_schema_version(conn)
+        print(f"Schema version: {current} (latest {SCHEMA_VERSION})")
+        if args.status:
+            return
+
+        if not args.check:
+            applied = migrate(conn)
+            if applied:
+                print(f"Applied migrations: {', '.join(str(v) for v in applied)}")
+            else:
+                print("Schema already up to date; statistics refreshed with ANALYZE")
+
+        plan_ok = print_plan_report(conn)
+    finally:
+        conn.close()
+
+    if not args.check:
+        # After the writer connection is closed, so the snapshot stamp sees the final file
+        write_snapshot(db_path, db_path.parent / DEFAULT_SNAPSHOT_PATH.name)
+        print(f"\nHome snapshot written to {db_path.parent / DEFAULT_SNAPSHOT_PATH.name}")
+
+    if not plan_ok:
+        print("\nERROR: some page queries do a full scan of deliveries")
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
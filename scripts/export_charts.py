@@ -0,0 +1,87 @@
+"""
+Export chart images listed in a manifest to generated_images/.
+
+Each chart is a registered query plus a chart spec (see chart_manifest.json).
+Queries run once on one connection, images render across a process pool, and
+charts whose data has not changed since the last run are skipped:
+
+    python scripts/export_charts.py                        # charts in scripts/chart_manifest.json
+    python scripts/export_charts.py --only hall_most_sixes --force
+    python scripts/export_charts.py --manifest social.json --out generated_images/social
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'dashboard'))
+
+from chart_batch import DEFAULT_OUTPUT_DIR, export_charts, load_manifest  # noqa: E402
+from queries import QUERIES  # noqa: E402
+
+DEFAULT_MANIFEST = Path(__file__).resolve().parent / 'chart_manifest.json'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', default='data/cricket_analytics.db', help='Path to the SQLite database')
+    parser.add_argument('--manifest', default=str(DEFAULT_MANIFEST), help='Chart manifest (JSON)')
+    parser.add_argument('--out', default=str(DEFAULT_OUTPUT_DIR), help='Output directory')
+    parser.add_argument('--only', nargs='+', metavar='NAME', help='Export only these charts')
+    parser.add_argument('--force', action='store_true', help='Re-render charts even if their data is unchanged')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Render processes (default: all cores; 1 renders in-process)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    db_path = Path(args.db)
+    if not db_path.exists():
+        print(f"ERROR: database not found at {db_path}")
+        raise SystemExit(1)
+
+    try:
+        specs = load_manifest(Path(args.manifest))
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"ERROR: invalid manifest {args.manifest}: {e}")
+        raise SystemExit(1)
+    if args.only:
+        unknown = set(args.only) - {spec.name for spec in specs}
+        if unknown:
+            print(f"ERROR: not in manifest: {', '.join(sorted(unknown))}")
+            raise SystemExit(1)
+        specs = [spec for spec in specs if spec.name in args.only]
+    unregistered = sorted({spec.query for spec in specs} - set(QUERIES))
+    if unregistered:
+        print(f"ERROR: unknown queries: {', '.join(unregistered)}")
+        raise SystemExit(1)
+
+    start = time.perf_counter()
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        report = export_charts(conn, specs, Path(args.out), workers=args.workers, force=args.force)
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"{'chart':<28} {'status':<9} {'query ms':>9} {'figure ms':>10} {'render ms':>10}  output")
+    for result in report.results:
+        outputs = ', '.join(Path(output).name for output in result.outputs) or result.detail
+        print(f"{result.name:<28} {result.status:<9} {result.query_ms:>9.1f} {result.figure_ms:>10.1f} "
+              f"{result.render_ms:>10.1f}  {outputs}")
+    html_details = {result.detail for result in report.results if result.status == 'html' and result.detail}
+    for detail in sorted(html_details):
+        print(f"  PNG unavailable, saved HTML: {detail}")
+    print(f"Charts: {report.count('rendered')} rendered, {report.count('html')} HTML fallback, "
+          f"{report.count('skipped')} unchanged, {report.count('error')} failed")
+    print(f"Queries {report.query_ms:.0f} ms, figures {report.figure_ms:.0f} ms, "
+          f"rendering {report.render_ms:.0f} ms, done in {elapsed:.2f}s")
+    if report.count('error'):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Export teams, matches and deliveries to Parquet or Arrow IPC files.
+
+The dashboard (and batch scripts) memory-map these files instead of reading
+through SQLite while the export is current. Re-run after reloading data:
+
+    python scripts/export_parquet.py                  # Parquet, deliveries partitioned by season
+    python scripts/export_parquet.py --format arrow   # Arrow IPC, zero-copy memory-mapped load
+"""
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'dashboard'))
+
+from parquet_store import DEFAULT_EXPORT_DIR, EXPORT_FORMATS, PYARROW_AVAILABLE, export_tables  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', default='data/cricket_analytics.db', help='Path to the SQLite database')
+    parser.add_argument('--out', default=str(DEFAULT_EXPORT_DIR), help='Output directory')
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='parquet', help='File format')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    db_path = Path(args.db)
+    if not db_path.exists():
+        print(f"ERROR: database not found at {db_path}")
+        raise SystemExit(1)
+    if not PYARROW_AVAILABLE:
+        print("ERROR: pyarrow is not installed (pip install pyarrow)")
+        raise SystemExit(1)
+
+    start = time.perf_counter()
+    counts = export_tables(db_path, Path(args.out), args.format)
+    elapsed = time.perf_counter() - start
+
+    for table, rows in counts.items():
+        print(f"{table}: {rows:,} rows")
+    print(f"Exported {args.format} to {args.out} in {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
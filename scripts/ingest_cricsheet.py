@@ -0,0 +1,71 @@
+"""
+Load Cricsheet ball-by-ball match files into data/cricket_analytics.db.
+
+Accepts match files, directories and Cricsheet zip archives. Only new or
+changed matches are written, and the player aggregates and Home snapshot are
+refreshed afterwards, so loading a new season does not rebuild the database:
+
+    python scripts/ingest_cricsheet.py downloads/ipl_json.zip
+    python scripts/ingest_cricsheet.py data/cricsheet/ --force   # re-load everything
+    python scripts/ingest_cricsheet.py all_json.zip --workers 16  # parallel backfill
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'dashboard'))
+
+from cricsheet_ingest import ingest, iter_sources  # noqa: E402
+from db_schema import migrate  # noqa: E402
+from home_snapshot import DEFAULT_SNAPSHOT_PATH, write_snapshot  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('sources', nargs='+', help='Match files, directories or zip archives')
+    parser.add_argument('--db', default='data/cricket_analytics.db', help='Path to the SQLite database')
+    parser.add_argument('--force', action='store_true', help='Re-load matches even if their files are unchanged')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Parser processes (default: all cores; 1 parses in-process)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    missing = [source for source in args.sources if not Path(source).exists()]
+    if missing:
+        print(f"ERROR: not found: {', '.join(missing)}")
+        raise SystemExit(1)
+
+    db_path = Path(args.db)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    try:
+        migrate(conn, analyze=False)
+        report = ingest(conn, iter_sources(args.sources), force=args.force, workers=args.workers)
+        if report.ingested:
+            conn.execute("ANALYZE")
+            conn.commit()
+    finally:
+        conn.close()
+
+    if report.ingested:
+        write_snapshot(db_path, db_path.parent / DEFAULT_SNAPSHOT_PATH.name)
+    elapsed = time.perf_counter() - start
+
+    print(f"Files: {report.files_seen:,} seen, {report.unchanged:,} unchanged, {len(report.failed):,} failed")
+    print(f"Matches loaded: {len(report.ingested):,} ({report.deliveries:,} deliveries)")
+    for name, error in report.failed:
+        print(f"  FAILED {name}: {error}")
+    print(f"Done in {elapsed:.2f}s")
+    if report.failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
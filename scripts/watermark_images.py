@@ -0,0 +1,46 @@
+"""
+Add the @rkjat65 watermark to every image in a directory.
+
+Images are processed on a thread pool with one pre-rendered watermark sprite;
+formats are kept. Writes to --out, or back in place without it:
+
+    python scripts/watermark_images.py generated_images --out generated_images/social
+    python scripts/watermark_images.py exports/ --text "@ipl_stats" --size 24
+"""
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'dashboard'))
+
+from watermark import DEFAULT_FONT_SIZE, DEFAULT_TEXT, watermark_directory  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('source', help='Directory of PNG/JPEG/WebP images')
+    parser.add_argument('--out', help='Output directory (default: overwrite the source images)')
+    parser.add_argument('--text', default=DEFAULT_TEXT, help='Watermark text')
+    parser.add_argument('--size', type=int, default=DEFAULT_FONT_SIZE, help='Font size in pixels')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Threads (default: all cores)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    source = Path(args.source)
+    if not source.is_dir():
+        print(f"ERROR: not a directory: {source}")
+        raise SystemExit(1)
+
+    report = watermark_directory(source, Path(args.out) if args.out else None, args.text, args.size, args.workers)
+    print(f"Watermarked {len(report.written):,} images in {report.elapsed_ms / 1000:.2f}s")
+    for name, error in report.failed:
+        print(f"  FAILED {name}: {error}")
+    if report.failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
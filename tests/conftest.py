@@ -0,0 +1,8 @@
+"""Shared test setup: dashboard modules are imported the way app.py imports them"""
+
+import os
+import sys
+
+DASHBOARD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dashboard')
+if DASHBOARD_DIR not in sys.path:
+    sys.path.insert(0, DASHBOARD_DIR)
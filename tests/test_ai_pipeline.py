@@ -0,0 +1,90 @@
+"""Tests for the concurrent AI pipeline, run against StubModelClient"""
+
+import threading
+import time
+
+import pytest
+
+from ai_pipeline import ModelClient, PipelineTask, StubModelClient, stream_tasks
+
+
+def test_model_client_is_abstract():
+    with pytest.raises(TypeError):
+        ModelClient()
+
+
+def test_stub_client_answers_sql_and_images():
+    client = StubModelClient(latency=0.01)
+    assert client.generate_text("Write SQL for wins") == StubModelClient.STUB_SQL
+    assert client.generate_text("Summarise this").startswith("Stub insight")
+    assert client.generate_image("Draw a chart")[:8] == b'\x89PNG\r\n\x1a\n'
+    assert client.calls == ['text', 'text', 'image']
+
+
+def test_stub_client_times_out():
+    client = StubModelClient(latency=0.2)
+    with pytest.raises(TimeoutError):
+        client.generate_text("Summarise this", timeout=0.01)
+
+
+def test_tasks_run_concurrently_and_stream_in_completion_order():
+    client = StubModelClient(latency=0.2, image_latency=0.3)
+    seen = []
+    started = time.perf_counter()
+    events = stream_tasks([
+        PipelineTask('image', lambda: client.generate_image("Draw"), timeout=5),
+        PipelineTask('insight', lambda: client.generate_text("Summarise"), timeout=5),
+    ], seen.append)
+    elapsed = time.perf_counter() - started
+
+    assert [event.name for event in seen] == ['insight', 'image']
+    assert [event.status for event in events] == ['ok', 'ok']
+    assert events[0].result.startswith("Stub insight")
+    assert events[1].elapsed_ms > events[0].elapsed_ms
+    # Run side by side, the two calls take about as long as the slower one
+    assert elapsed < 0.45
+
+
+def test_loop_thread_tasks_run_on_the_calling_thread():
+    events = stream_tasks([PipelineTask('chart', threading.get_ident, timeout=5, in_thread=False)],
+                          lambda event: None)
+    assert events[0].status == 'ok'
+    assert events[0].result == threading.get_ident()
+
+
+def test_task_timeout_and_error_are_reported():
+    client = StubModelClient(latency=0.3)
+
+    def fail():
+        raise ValueError("bad response")
+
+    events = {event.name: event for event in stream_tasks([
+        PipelineTask('slow', lambda: client.generate_text("Summarise"), timeout=0.05),
+        PipelineTask('broken', fail, timeout=5),
+    ], lambda event: None)}
+
+    assert events['slow'].status == 'timeout'
+    assert events['broken'].status == 'error'
+    assert events['broken'].result == "bad response"
+
+
+def test_deadline_times_out_unfinished_tasks():
+    client = StubModelClient(latency=0.01, image_latency=0.5)
+    events = {event.name: event for event in stream_tasks([
+        PipelineTask('insight', lambda: client.generate_text("Summarise"), timeout=5),
+        PipelineTask('image', lambda: client.generate_image("Draw"), timeout=5),
+    ], lambda event: None, deadline=0.1)}
+
+    assert events['insight'].status == 'ok'
+    assert events['image'].status == 'timeout'
+    assert 'deadline' in events['image'].result
+
+
+def test_callback_returning_false_cancels_the_rest():
+    client = StubModelClient(latency=0.01, image_latency=0.5)
+    events = stream_tasks([
+        PipelineTask('insight', lambda: client.generate_text("Summarise"), timeout=5),
+        PipelineTask('image', lambda: client.generate_image("Draw"), timeout=5),
+    ], lambda event: False)
+
+    assert [(event.name, event.status) for event in events] == [('insight', 'ok'), ('image', 'cancelled')]
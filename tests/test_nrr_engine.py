@@ -0,0 +1,109 @@
+"""Tests for Net Run Rate, checked against hand-computed tournament-rule figures"""
+
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from nrr_engine import build_nrr_frame, load_nrr_inputs, overs_to_balls, season_table
+
+MATCH_COLUMNS = ['match_id', 'season', 'team1_name', 'team2_name', 'toss_winner_name', 'toss_decision',
+                 'match_winner_name', 'target_runs', 'target_overs']
+INNINGS_COLUMNS = ['match_id', 'innings', 'runs', 'legal_balls', 'wickets']
+CHARGED_COLUMNS = ['runs_for', 'balls_for', 'runs_against', 'balls_against']
+
+
+def match(match_id, winner, target_runs=None, target_overs=None):
+    """League match between A and B in which A won the toss and batted first"""
+    return (match_id, 2023, 'A', 'B', 'A', 'bat', winner, target_runs, target_overs)
+
+
+def sides_for(matches, innings):
+    sides = build_nrr_frame(pd.DataFrame(innings, columns=INNINGS_COLUMNS),
+                            pd.DataFrame(matches, columns=MATCH_COLUMNS))
+    return sides.set_index('team')
+
+
+def nrr(table, team):
+    return table.set_index('team').loc[team, 'nrr']
+
+
+def test_overs_notation_counts_balls():
+    overs = pd.Series([20.0, 15.0, 11.3, 0.5])
+    assert overs_to_balls(overs).tolist() == [120, 90, 69, 5]
+
+
+def test_completed_match():
+    # A 180/5 (20), B 170/8 (20): A 9.00 - 8.50 = +0.500
+    sides = sides_for([match(1, 'A', 181, 20)], [(1, 1, 180, 120, 5), (1, 2, 170, 120, 8)])
+    assert sides.loc['A', CHARGED_COLUMNS].tolist() == [180, 120, 170, 120]
+    table = season_table(sides.reset_index())
+    assert nrr(table, 'A') == 0.5
+    assert nrr(table, 'B') == -0.5
+
+
+def test_side_bowled_out_is_charged_full_overs():
+    # A 150 all out in 16.4 overs is charged 20 overs: 7.50; B 151/3 in 15 overs: 10.067
+    sides = sides_for([match(2, 'B', 151, 20)], [(2, 1, 150, 100, 10), (2, 2, 151, 90, 3)])
+    assert sides.loc['A', 'balls_for'] == 120
+    assert sides.loc['B', 'balls_for'] == 90
+    table = season_table(sides.reset_index())
+    assert nrr(table, 'B') == pytest.approx(2.567)
+    assert nrr(table, 'A') == pytest.approx(-2.567)
+
+
+def test_chasing_side_bowled_out_is_charged_its_quota():
+    # B 120 all out in 18 overs chasing 161 is charged 20 overs: A 8.00 - 6.00 = +2.000
+    sides = sides_for([match(3, 'A', 161, 20)], [(3, 1, 160, 120, 6), (3, 2, 120, 108, 10)])
+    assert sides.loc['B', 'balls_for'] == 120
+    assert nrr(season_table(sides.reset_index()), 'A') == 2.0
+
+
+def test_dls_target_credits_par_to_side_batting_first():
+    # A 200/4 (20); B set 150 off 15 overs, makes 140/5 (15).
+    # A is credited 149 off 15 overs: 9.933 - 9.333 = +0.600
+    sides = sides_for([match(4, 'A', 150, 15)], [(4, 1, 200, 120, 4), (4, 2, 140, 90, 5)])
+    assert sides.loc['A', CHARGED_COLUMNS].tolist() == [149, 90, 140, 90]
+    table = season_table(sides.reset_index())
+    assert nrr(table, 'A') == pytest.approx(0.6)
+    assert nrr(table, 'B') == pytest.approx(-0.6)
+
+
+def test_season_table_points_and_no_results():
+    # Matches 1 and 2 above plus a washout:
+    # A 330 off 40 overs = 8.25, conceded 321 off 35 overs = 9.171 -> -0.921
+    sides = sides_for(
+        [match(1, 'A', 181, 20), match(2, 'B', 151, 20), match(5, None)],
+        [(1, 1, 180, 120, 5), (1, 2, 170, 120, 8), (2, 1, 150, 100, 10), (2, 2, 151, 90, 3), (5, 1, 40, 30, 1)],
+    )
+    table = season_table(sides.reset_index()).set_index('team')
+    assert table.loc['A', ['matches', 'wins', 'losses', 'no_results', 'points']].tolist() == [3, 1, 1, 1, 3]
+    assert table.loc['A', CHARGED_COLUMNS].tolist() == [330, 240, 321, 210]
+    assert table.loc['A', 'nrr'] == pytest.approx(-0.921)
+    assert table.loc['B', 'nrr'] == pytest.approx(0.921)
+
+
+def test_innings_totals_count_legal_balls_and_real_wickets():
+    conn = sqlite3.connect(':memory:')
+    conn.executescript("""
+        CREATE TABLE matches (match_id INTEGER PRIMARY KEY, season INTEGER, match_date TEXT, stage TEXT,
+                              stage_inferred INTEGER, team1_name TEXT, team2_name TEXT, toss_winner_name TEXT,
+                              toss_decision TEXT, match_winner_name TEXT, result TEXT, target_runs INTEGER,
+                              target_overs REAL, method TEXT);
+        CREATE TABLE deliveries (match_id INTEGER, innings INTEGER, total_runs INTEGER, is_wide_ball INTEGER,
+                                 is_no_ball INTEGER, is_wicket INTEGER, wicket_kind TEXT);
+    """)
+    conn.execute("INSERT INTO matches VALUES (1, 2023, '2023-04-01', 'League', 0, 'A', 'B', 'A', 'bat', 'A', "
+                 "'runs', 12, 20, NULL)")
+    conn.executemany("INSERT INTO deliveries VALUES (1, 1, ?, ?, ?, ?, ?)", [
+        (4, 0, 0, 0, None),
+        (1, 1, 0, 0, None),              # wide: a run but not a ball of the over
+        (2, 0, 1, 0, None),              # no-ball
+        (0, 0, 0, 1, 'bowled'),
+        (0, 0, 0, 1, 'retired hurt'),    # not a wicket for the batting side
+        (4, 0, 0, 0, None),
+    ])
+    innings, matches = load_nrr_inputs(conn, seasons=[2023])
+    assert innings[['runs', 'legal_balls', 'wickets']].values.tolist() == [[11, 4, 1]]
+    assert matches['match_id'].tolist() == [1]
+    assert load_nrr_inputs(conn, seasons=[2022])[1].empty
@@ -0,0 +1,84 @@
+"""Tests for the guarded executor that runs model-generated SQL"""
+
+import sqlite3
+
+import pytest
+
+from sql_guard import SqlGuardError, estimate_cost, run_guarded, validate_sql
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:')
+    conn.executescript("""
+        CREATE TABLE matches (match_id INTEGER PRIMARY KEY, season INTEGER, venue TEXT);
+        CREATE TABLE deliveries (id INTEGER PRIMARY KEY, match_id INTEGER, batter TEXT, total_runs INTEGER);
+    """)
+    conn.executemany("INSERT INTO matches VALUES (?, ?, ?)",
+                     [(match_id, 2008 + match_id % 3, f"Ground {match_id % 5}") for match_id in range(1, 31)])
+    conn.executemany("INSERT INTO deliveries (match_id, batter, total_runs) VALUES (?, ?, ?)",
+                     [(ball % 30 + 1, f"Batter {ball % 11}", ball % 7) for ball in range(3000)])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+@pytest.mark.parametrize('sql', [
+    "DELETE FROM matches",
+    "UPDATE matches SET season = 2020",
+    "REPLACE INTO matches VALUES (99, 2020, 'x')",
+    "DROP TABLE matches",
+    "PRAGMA table_info(matches)",
+    "ATTACH DATABASE 'other.db' AS other",
+    "SELECT 1; DELETE FROM matches",
+    "WITH gone AS (SELECT 1) DELETE FROM matches",
+    "EXPLAIN SELECT * FROM matches",
+    "-- only a comment",
+])
+def test_rejects_anything_but_a_single_select(sql):
+    with pytest.raises(SqlGuardError):
+        validate_sql(sql)
+
+
+def test_allows_keywords_in_literals_and_the_replace_function(conn):
+    cleaned = validate_sql("SELECT 'DROP TABLE x; DELETE' AS note;  -- trailing\n")
+    assert cleaned == "SELECT 'DROP TABLE x; DELETE' AS note"
+    sql = "SELECT REPLACE(venue, 'Ground', 'Stadium') AS venue FROM matches WHERE match_id = 1"
+    result = run_guarded(conn, sql)
+    assert result.data['venue'].tolist() == ['Stadium 1']
+
+
+def test_rejected_query_leaves_the_connection_usable(conn):
+    with pytest.raises(SqlGuardError):
+        run_guarded(conn, "SELECT * FROM no_such_table")
+    conn.execute("INSERT INTO matches VALUES (100, 2020, 'New Ground')")
+    assert conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0] == 31
+
+
+def test_outer_limit_caps_rows_and_flags_truncation(conn):
+    result = run_guarded(conn, "SELECT match_id FROM matches ORDER BY match_id", max_rows=10)
+    assert len(result.data) == 10
+    assert result.truncated
+    assert result.data['match_id'].tolist() == list(range(1, 11))
+
+    exact = run_guarded(conn, "SELECT match_id FROM matches", max_rows=30)
+    assert len(exact.data) == 30
+    assert not exact.truncated
+
+
+def test_expensive_cross_join_is_refused_before_running(conn):
+    sql = "SELECT COUNT(*) FROM deliveries a, deliveries b, deliveries c"
+    assert estimate_cost(conn, sql).estimated_rows > 3000 ** 3
+    with pytest.raises(SqlGuardError, match="too expensive"):
+        run_guarded(conn, sql)
+
+
+def test_deadline_stops_a_long_running_query(conn):
+    sql = """
+        WITH RECURSIVE counter(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM counter WHERE n < 100000000)
+        SELECT COUNT(*) FROM counter
+    """
+    with pytest.raises(SqlGuardError, match="longer than"):
+        run_guarded(conn, sql, timeout=0.05)
+    # The progress handler is removed afterwards
+    assert conn.execute("SELECT COUNT(*) FROM deliveries").fetchone()[0] == 3000